@@ -0,0 +1,209 @@
+"""Throughput benchmarks for scoring, rolling and whole games
+
+Run from the repository root:
+
+    python benchmarks/run.py              # compare against the baseline
+    python benchmarks/run.py --save       # record a new baseline
+
+Each benchmark reports operations per second, the best of several repeats.
+Comparing against the baseline fails if any benchmark is slower than the
+baseline by more than the tolerance.
+"""
+import argparse
+import collections
+import itertools
+import json
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from farkelbot import batch  # noqa: E402
+from farkelbot import constants  # noqa: E402
+from farkelbot import engine  # noqa: E402
+from farkelbot import game  # noqa: E402
+from farkelbot import points  # noqa: E402
+from farkelbot import strategy  # noqa: E402
+from farkelbot import utils  # noqa: E402
+
+BASELINE = os.path.join(ROOT, 'benchmarks', 'baseline.json')
+
+BENCHMARKS = collections.OrderedDict()
+
+
+def benchmark(operations):
+    """Register a benchmark that performs a number of operations per call"""
+    def register(function):
+        BENCHMARKS[function.__name__] = (function, operations)
+        return function
+    return register
+
+
+ALL_MULTISETS = [collections.Counter(dice)
+                 for num_dice in xrange(1, constants.NUM_DICE + 1)
+                 for dice in itertools.combinations_with_replacement(
+                     points.FACES, num_dice)]
+
+
+@benchmark(operations=len(ALL_MULTISETS))
+def score_dice():
+    for counter in ALL_MULTISETS:
+        points.score_dice(counter)
+
+
+@benchmark(operations=10000)
+def roll_and_check_farkel():
+    diceset = game.DiceSet(seed=1)
+    for _ in xrange(10000):
+        diceset.reset()
+        try:
+            diceset.roll()
+        except utils.FarkelException:
+            pass
+
+
+FREEZE_ROLLS = [
+    ([1, 2, 3, 4, 6, 6], [0]),
+    ([1, 1, 1, 2, 3, 4], [0, 1, 2]),
+    ([5, 2, 3, 4, 6, 6], [0]),
+    ([1, 2, 3, 4, 5, 6], [0, 1, 2, 3, 4, 5]),
+]
+
+
+@benchmark(operations=10000)
+def freeze_selection():
+    diceset = game.DiceSet()
+    for index in xrange(10000):
+        values, selection = FREEZE_ROLLS[index % len(FREEZE_ROLLS)]
+        diceset.reset()
+        for die, value in zip(diceset.dice, values):
+            die.value = value
+        diceset.roll_ok = False
+        diceset.freeze_selection([diceset.dice[i] for i in selection])
+
+
+@benchmark(operations=20)
+def headless_games():
+    strategies = [strategy.ThresholdStrategy(bank_threshold=300),
+                  strategy.ThresholdStrategy(bank_threshold=1000)]
+    for seed in xrange(20):
+        game.Game(2, strategies=strategies, seed=seed + 1).start()
+
+
+def _decision_games(count):
+    games = [game.Game(3, strategies=[strategy.ThresholdStrategy()] * 3,
+                       seed=seed + 1) for seed in xrange(count)]
+    for index, each in enumerate(games):
+        engine.start(each, 0)
+        # Spread the games out over their first few decisions
+        for _ in itertools.islice(engine.steps(each), index % 20):
+            pass
+    return [each for each in games if each.phase != engine.OVER]
+
+
+DECISION_GAMES = _decision_games(2000)
+BATCH_STRATEGY = batch.BatchThresholdStrategy()
+
+
+@benchmark(operations=len(DECISION_GAMES))
+def decisions():
+    for each in DECISION_GAMES:
+        engine.decide(each)
+
+
+@benchmark(operations=len(DECISION_GAMES))
+def batched_decisions():
+    batch.decide(DECISION_GAMES, BATCH_STRATEGY)
+
+
+@benchmark(operations=len(DECISION_GAMES))
+def snapshot_restore():
+    scratch = game.Game(3, strategies=[strategy.ThresholdStrategy()] * 3)
+    for each in DECISION_GAMES:
+        scratch.restore(each.snapshot())
+
+
+@benchmark(operations=1)
+def import_points():
+    # A fresh interpreter each time so nothing is already imported
+    subprocess.check_call(
+        [sys.executable, '-c', 'import farkelbot.points'], cwd=ROOT)
+
+
+@benchmark(operations=1)
+def import_game():
+    # Everything a game needs, as a spawned pool worker would import it
+    subprocess.check_call(
+        [sys.executable, '-c', 'import farkelbot.game'], cwd=ROOT)
+
+
+@benchmark(operations=1)
+def import_interpreter():
+    # Interpreter startup alone, to subtract from import_points
+    subprocess.check_call([sys.executable, '-c', 'pass'], cwd=ROOT)
+
+
+def measure(function, operations, repeats):
+    best = None
+    for _ in xrange(repeats):
+        start = time.time()
+        function()
+        elapsed = time.time() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return {'seconds': best, 'ops_per_second': operations / best}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('names', nargs='*', help='benchmarks to run')
+    parser.add_argument('--repeats', type=int, default=9)
+    parser.add_argument('--save', action='store_true',
+                        help='write the results as the new baseline')
+    parser.add_argument('--baseline', default=BASELINE)
+    parser.add_argument('--tolerance', type=float, default=0.3,
+                        help='allowed fractional slowdown from the baseline')
+    args = parser.parse_args(argv)
+
+    names = args.names or list(BENCHMARKS)
+    results = collections.OrderedDict()
+    for name in names:
+        function, operations = BENCHMARKS[name]
+        results[name] = measure(function, operations, args.repeats)
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as baseline_file:
+            baseline = json.load(baseline_file)
+
+    regressions = []
+    print('{:<24}{:>16}{:>16}{:>10}'.format('benchmark', 'ops/s',
+                                            'baseline ops/s', 'ratio'))
+    for name, result in results.items():
+        before = baseline.get(name, {}).get('ops_per_second')
+        ratio = result['ops_per_second'] / before if before else None
+        print('{:<24}{:>16.1f}{:>16}{:>10}'.format(
+            name, result['ops_per_second'],
+            '{:.1f}'.format(before) if before else '-',
+            '{:.2f}x'.format(ratio) if ratio else '-'))
+        if ratio is not None and ratio < 1 - args.tolerance:
+            regressions.append(name)
+
+    if args.save:
+        baseline.update(results)
+        with open(args.baseline, 'w') as baseline_file:
+            json.dump(baseline, baseline_file, indent=2, sort_keys=True,
+                      separators=(',', ': '))
+            baseline_file.write('\n')
+        return 0
+
+    if regressions:
+        print('Slower than baseline: {}'.format(', '.join(regressions)))
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
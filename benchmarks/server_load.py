@@ -0,0 +1,131 @@
+"""Load test for the game server with a swarm of local clients
+
+Run from the repository root:
+
+    python benchmarks/server_load.py --clients 1000 --games 5
+
+The server runs in its own process and every client plays its games
+against a bot at a table of its own. Reports moves per second across the
+swarm and percentiles of the time from a prompt to the next line after the
+client's answer, which includes the bot's moves in between.
+"""
+import argparse
+import asynchat
+import asyncore
+import multiprocessing
+import os
+import socket
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from farkelbot import keeps  # noqa: E402
+from farkelbot import points  # noqa: E402
+from farkelbot import server  # noqa: E402
+
+
+def answer(words):
+    """Keep every scoring die and bank at 300, declining inheritances"""
+    if words[0] == 'INHERIT':
+        return 'n'
+    if words[0] == 'BANK':
+        return 'b' if int(words[1]) >= 300 else 'r'
+    faces = [int(face) for face in words[1].split(',')]
+    roll_key = points.pack_dice(face for face in faces if face)
+    best = max(keeps.legal_keeps(roll_key), key=lambda keep: keep.points)
+    needed = list(points.unpack_counts(best.key))
+    indices = []
+    for index, face in enumerate(faces):
+        if face and needed[face - 1]:
+            needed[face - 1] -= 1
+            indices.append(str(index))
+    return ','.join(indices)
+
+
+class Client(asynchat.async_chat):
+
+    def __init__(self, address, table, games, socket_map, latencies):
+        asynchat.async_chat.__init__(self, map=socket_map)
+        self.create_socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.connect(address)
+        self.set_terminator('\n')
+        self.table = table
+        self.games_left = games
+        self.latencies = latencies
+        self.moves = 0
+        self._incoming = []
+        self._sent_at = None
+
+    def handle_connect(self):
+        self.socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.push('JOIN {} 2 1\n'.format(self.table))
+
+    def collect_incoming_data(self, data):
+        self._incoming.append(data)
+
+    def found_terminator(self):
+        words = ''.join(self._incoming).split()
+        self._incoming = []
+        if self._sent_at is not None:
+            self.latencies.append(time.time() - self._sent_at)
+            self._sent_at = None
+        if words[0] in ('INHERIT', 'FREEZE', 'BANK'):
+            self.moves += 1
+            self._sent_at = time.time()
+            self.push(answer(words) + '\n')
+        elif words[0] == 'OVER':
+            self.games_left -= 1
+            if self.games_left:
+                self.push('JOIN {} 2 1\n'.format(self.table))
+            else:
+                self.close()
+
+
+def serve(address, ready):
+    game_server = server.Server()
+    ready.put(game_server.listen_tcp(*address))
+    game_server.serve_forever()
+
+
+def percentile(values, fraction):
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--clients', type=int, default=1000)
+    parser.add_argument('--games', type=int, default=5,
+                        help='games played by each client')
+    parser.add_argument('--port', type=int, default=0)
+    args = parser.parse_args()
+
+    ready = multiprocessing.Queue()
+    process = multiprocessing.Process(target=serve,
+                                      args=(('127.0.0.1', args.port), ready))
+    process.daemon = True
+    process.start()
+    address = ready.get()
+
+    socket_map = {}
+    latencies = []
+    start = time.time()
+    clients = [Client(address, 'load{}'.format(index), args.games,
+                      socket_map, latencies)
+               for index in xrange(args.clients)]
+    asyncore.loop(0.05, use_poll=True, map=socket_map)
+    elapsed = time.time() - start
+    process.terminate()
+
+    latencies.sort()
+    moves = sum(client.moves for client in clients)
+    print('{} games, {} moves in {:.2f}s: {:.0f} moves/s'.format(
+        args.clients * args.games, moves, elapsed, moves / elapsed))
+    print('latency ms: p50 {:.2f}  p90 {:.2f}  p99 {:.2f}  max {:.2f}'.format(
+        *[1000 * percentile(latencies, fraction)
+          for fraction in (0.5, 0.9, 0.99, 1.0)]))
+
+
+if __name__ == '__main__':
+    main()
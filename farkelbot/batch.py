@@ -0,0 +1,478 @@
+import collections
+import itertools
+import time
+
+import numpy as np
+
+from . import constants
+from . import engine
+from . import keeps
+from . import points
+from . import ruleset
+from . import strategy
+
+
+# Bit offset of each face's count in a packed key
+SHIFTS = np.arange(len(points.FACES)) * points.COUNT_BITS
+
+# Packed key contribution of a single die, indexed by face value with zero
+# standing in for an unrolled die
+FACE_BITS = np.zeros(constants.DICE_HIGH_VAL + 1, dtype=np.int64)
+FACE_BITS[constants.DICE_LOW_VAL:] = 1 << SHIFTS
+
+
+# Number of distinct packed keys
+KEY_SPACE = 1 << (points.COUNT_BITS * len(points.FACES))
+
+
+def _build_luts(score_table=points.SCORE_TABLE):
+    score_lut = np.zeros(KEY_SPACE, dtype=np.int64)
+    remaining_lut = np.zeros(KEY_SPACE, dtype=np.int64)
+    for key, (score, remaining_key) in score_table.items():
+        score_lut[key] = score
+        remaining_lut[key] = remaining_key
+    return score_lut, remaining_lut
+
+
+def _keep_all_lut(score_lut, remaining_lut):
+    return np.where(score_lut > 0, np.arange(KEY_SPACE) - remaining_lut, 0)
+
+
+# Score and packed leftover dice indexed directly by packed key
+SCORE_LUT, REMAINING_LUT = _build_luts()
+
+# Keeping every die that scores, indexed by packed key of the roll
+KEEP_ALL_LUT = _keep_all_lut(SCORE_LUT, REMAINING_LUT)
+
+
+def _per_dice_left(thresholds):
+    thresholds = np.asarray(thresholds, dtype=np.int64)
+    if not thresholds.shape:
+        thresholds = np.repeat(thresholds, constants.NUM_DICE + 1)
+    if thresholds.shape != (constants.NUM_DICE + 1,):
+        raise ValueError("Need one threshold for each number of dice left")
+    return thresholds
+
+
+def roll_keys(faces, frozen):
+    """Packed key of each row's unfrozen dice"""
+    return np.where(frozen, 0, FACE_BITS[faces]).sum(axis=1)
+
+
+def keep_masks(faces, frozen, keep_keys):
+    """Which unfrozen dice of each row make up its packed keep
+
+    The same dice keeps.keep_indices picks, the first unfrozen die of each
+    face needed.
+    """
+    needed = (keep_keys[:, None] >> SHIFTS) & points.COUNT_MASK
+    faces = np.maximum(faces - constants.DICE_LOW_VAL, 0)
+    masks = np.zeros(frozen.shape, dtype=bool)
+    index = np.arange(len(faces))
+    for position in xrange(constants.NUM_DICE):
+        face = faces[:, position]
+        take = ~frozen[:, position] & (needed[index, face] > 0)
+        needed[index[take], face[take]] -= 1
+        masks[take, position] = True
+    return masks
+
+
+class BatchSimulator(object):
+    """Many headless games played side by side as NumPy arrays
+
+    Every unfinished game makes one roll per step. Players keep dice through
+    keep_lut, which maps the packed key of a roll to the packed key of the
+    dice to keep, then bank once their turn points reach the bank threshold
+    for the number of dice left. The previous player's dice are inherited
+    when their points reach the inherit threshold for the dice they left.
+    """
+
+    def __init__(self, num_games, num_players, bank_thresholds=300,
+                 inherit_thresholds=0, keep_lut=KEEP_ALL_LUT, seed=None):
+        self.num_games = num_games
+        self.num_players = num_players
+        self.bank_thresholds = _per_dice_left(bank_thresholds)
+        self.inherit_thresholds = _per_dice_left(inherit_thresholds)
+        self.keep_lut = keep_lut
+        self.rng = np.random.RandomState(seed)
+
+        shape = (num_games, constants.NUM_DICE)
+        self.faces = np.zeros(shape, dtype=np.int64)
+        self.frozen = np.zeros(shape, dtype=bool)
+        self.turn_points = np.zeros(num_games, dtype=np.int64)
+        self.offer_points = np.zeros(num_games, dtype=np.int64)
+
+        shape = (num_games, num_players)
+        self.scores = np.zeros(shape, dtype=np.int64)
+        self.qualified = np.zeros(shape, dtype=bool)
+        self.farkel_counts = np.zeros(shape, dtype=np.int64)
+
+        self.current = self.rng.randint(0, num_players, size=num_games)
+        self.last_turn = np.zeros(num_games, dtype=bool)
+        self.score_to_beat = np.zeros(num_games, dtype=np.int64)
+        self.turns_left = np.zeros(num_games, dtype=np.int64)
+        self.finished = np.zeros(num_games, dtype=bool)
+
+        self.steps = 0
+        self.rolls = 0
+
+    def _freeze(self, rows, keep_keys):
+        self.frozen[rows] |= keep_masks(self.faces[rows], self.frozen[rows],
+                                        keep_keys)
+
+    def _start_turn(self, rows):
+        players = self.current[rows]
+
+        # On the last turn the game ends when it comes back around to the
+        # score to beat, or once every player has had their final turn
+        last_turn = self.last_turn[rows]
+        over = last_turn & ((self.turns_left[rows] == 0) |
+                            (self.scores[rows, players] ==
+                             self.score_to_beat[rows]))
+        self.finished[rows[over]] = True
+        self.turns_left[rows[last_turn & ~over]] -= 1
+        rows = rows[~over]
+        players = players[~over]
+
+        previous = (players - 1) % self.num_players
+        offered = ((self.offer_points[rows] > 0) &
+                   self.qualified[rows, players] &
+                   self.qualified[rows, previous] &
+                   (self.scores[rows, previous] != 0))
+        dice_left = (~self.frozen[rows]).sum(axis=1)
+        inherit = offered & (self.offer_points[rows] >=
+                             self.inherit_thresholds[dice_left])
+        self.turn_points[rows] = np.where(inherit, self.offer_points[rows], 0)
+        self.frozen[rows[~inherit]] = False
+        self.offer_points[rows] = 0
+
+    def _end_turn(self, rows):
+        players = self.current[rows]
+        trigger = ~self.last_turn[rows] & (
+            self.scores[rows, players] >= constants.WIN_CONDITION)
+        triggered = rows[trigger]
+        self.last_turn[triggered] = True
+        self.score_to_beat[triggered] = self.scores[triggered,
+                                                    players[trigger]]
+        self.turns_left[triggered] = self.num_players
+        self.current[rows] = (players + 1) % self.num_players
+        self._start_turn(rows)
+
+    def step(self):
+        active = ~self.finished
+
+        # All dice frozen is a re-roll of the full set
+        self.frozen[active & self.frozen.all(axis=1)] = False
+
+        rolled = self.rng.randint(constants.DICE_LOW_VAL,
+                                  constants.DICE_HIGH_VAL + 1,
+                                  size=self.faces.shape)
+        self.faces = np.where(active[:, None] & ~self.frozen, rolled,
+                              self.faces)
+        keys = roll_keys(self.faces, self.frozen)
+        self.steps += 1
+        self.rolls += int(active.sum())
+
+        farkel = active & (SCORE_LUT[keys] == 0)
+        scoring = np.flatnonzero(active & ~farkel)
+        keep_keys = self.keep_lut[keys[scoring]]
+        self.turn_points[scoring] += SCORE_LUT[keep_keys]
+        self._freeze(scoring, keep_keys)
+
+        rows = np.flatnonzero(farkel)
+        players = self.current[rows]
+        penalized = self.qualified[rows, players]
+        rows, players = rows[penalized], players[penalized]
+        self.farkel_counts[rows, players] += 1
+        limit = self.farkel_counts[rows, players] >= constants.FARKEL_LIMIT
+        self.scores[rows[limit], players[limit]] -= constants.FARKEL_POINTS
+        self.turn_points[farkel] = 0
+        self.offer_points[farkel] = 0
+
+        dice_left = (~self.frozen).sum(axis=1)
+        rows = scoring[dice_left[scoring] > 0]
+        players = self.current[rows]
+        qualified = self.qualified[rows, players]
+        turn_points = self.turn_points[rows]
+
+        qualify = ~qualified & (turn_points >=
+                                constants.QUALIFICATION_POINTS)
+        self.qualified[rows[qualify], players[qualify]] = True
+
+        must_roll = self.last_turn[rows] & (
+            self.scores[rows, players] + turn_points <
+            self.score_to_beat[rows])
+        bank = qualified & ~must_roll & (
+            turn_points >= self.bank_thresholds[dice_left[rows]])
+        banked, bank_players = rows[bank], players[bank]
+        self.scores[banked, bank_players] += turn_points[bank]
+        self.farkel_counts[banked, bank_players] = 0
+        on_last_turn = banked[self.last_turn[banked]]
+        self.score_to_beat[on_last_turn] = self.scores[
+            on_last_turn, self.current[on_last_turn]]
+
+        ended = np.concatenate([np.flatnonzero(farkel), rows[qualify],
+                                banked])
+        self.offer_points[ended] = self.turn_points[ended]
+        self._end_turn(ended)
+
+    def winners(self):
+        """Index of the winning player of each game, -1 if nobody scored"""
+        winners = self.scores.argmax(axis=1)
+        best = self.scores[np.arange(self.num_games), winners]
+        return np.where(best > 0, winners, -1)
+
+    def run(self, max_steps=100000):
+        """Play every game to the end and return summary statistics"""
+        start = time.time()
+        self._start_turn(np.arange(self.num_games))
+        while not self.finished.all() and self.steps < max_steps:
+            self.step()
+        elapsed = time.time() - start
+        winners = self.winners()
+        return {
+            'games': self.num_games,
+            'finished': int(self.finished.sum()),
+            'seconds': elapsed,
+            'games_per_second': self.num_games / elapsed if elapsed else 0.0,
+            'rolls': self.rolls,
+            'wins': np.bincount(winners[winners >= 0],
+                                minlength=self.num_players).tolist(),
+        }
+
+
+# The current player's position in many games waiting on a decision, one
+# row per game. faces and frozen are (games, NUM_DICE) arrays, scores,
+# qualified and farkel_counts are (games, players) arrays, and current is
+# the index of the player deciding.
+States = collections.namedtuple('States', [
+    'faces', 'frozen', 'turn_points', 'scores', 'qualified',
+    'farkel_counts', 'current'])
+
+# Score of the seats padding out games with fewer players than the most
+NO_SCORE = np.iinfo(np.int64).min
+
+
+def game_states(games):
+    """Return the States of a list of Game objects"""
+    num_games = len(games)
+    num_players = max([each.num_players for each in games] or [0])
+    faces = []
+    frozen = []
+    turn_points = []
+    scores = []
+    qualified = []
+    farkel_counts = []
+    for each in games:
+        diceset = each.players[each.current].diceset
+        for die in diceset.dice:
+            faces.append(die.value or 0)
+            frozen.append(die.frozen)
+        turn_points.append(diceset.points)
+        for player in each.players:
+            scores.append(player.score)
+            qualified.append(player.qualified)
+            farkel_counts.append(player.farkel_count)
+        padding = num_players - each.num_players
+        if padding:
+            scores.extend([NO_SCORE] * padding)
+            qualified.extend([False] * padding)
+            farkel_counts.extend([0] * padding)
+    shape = (num_games, num_players)
+    return States(
+        np.array(faces, dtype=np.int64).reshape(num_games,
+                                                constants.NUM_DICE),
+        np.array(frozen, dtype=bool).reshape(num_games, constants.NUM_DICE),
+        np.array(turn_points, dtype=np.int64),
+        np.array(scores, dtype=np.int64).reshape(shape),
+        np.array(qualified, dtype=bool).reshape(shape),
+        np.array(farkel_counts, dtype=np.int64).reshape(shape),
+        np.array([each.current for each in games], dtype=np.int64))
+
+
+def _current(states, values):
+    return values[np.arange(len(states.current)), states.current]
+
+
+class BatchStrategy(object):
+    """Makes the decisions of many games in one call
+
+    reference is a Strategy making the same decisions one game at a time.
+    It also decides inheritances, which come at most once a turn.
+    """
+    reference = None
+
+    def choose_freezes(self, states):
+        """Return a mask of the dice to freeze in each game"""
+        raise NotImplementedError
+
+    def choose_banks(self, states):
+        """Return True for each game whose player should bank"""
+        raise NotImplementedError
+
+
+class BatchThresholdStrategy(BatchStrategy):
+    """strategy.ThresholdStrategy for many games at once"""
+
+    def __init__(self, bank_threshold=300, inherit_threshold=0,
+                 trailing_bonus=0, rules=None):
+        self.reference = strategy.ThresholdStrategy(
+            bank_threshold, inherit_threshold, trailing_bonus)
+        self.bank_threshold = np.array(self.reference.bank_threshold,
+                                       dtype=np.int64)
+        self.trailing_bonus = trailing_bonus
+        rules = rules or ruleset.DEFAULT
+        if rules == ruleset.DEFAULT:
+            self.keep_lut = KEEP_ALL_LUT
+        else:
+            self.keep_lut = _keep_all_lut(*_build_luts(rules.score_table))
+
+    def choose_freezes(self, states):
+        keys = roll_keys(states.faces, states.frozen)
+        return keep_masks(states.faces, states.frozen, self.keep_lut[keys])
+
+    def choose_banks(self, states):
+        dice_left = (~states.frozen).sum(axis=1)
+        own_scores = _current(states, states.scores)
+        trailing = (states.scores > own_scores[:, None]).any(axis=1)
+        threshold = (self.bank_threshold[dice_left] +
+                     np.where(trailing, self.trailing_bonus, 0))
+        return states.turn_points >= threshold
+
+
+def _keep_options(rules):
+    """Every legal keep of every roll as arrays padded to the most keeps
+
+    Returns the row of each roll's keeps indexed by packed roll key, then
+    the packed keeps, their points and the dice they leave, with a mask of
+    which entries are keeps rather than padding. Rows list keeps in
+    legal_keeps order, and row 0 is a farkel with no keeps. Keeps are
+    those legal under rules.
+    """
+    rolls = [()]
+    for num_dice in xrange(1, constants.NUM_DICE + 1):
+        for dice in itertools.combinations_with_replacement(points.FACES,
+                                                            num_dice):
+            rolls.append(keeps.legal_keeps(points.pack_dice(dice), rules))
+    rows = np.zeros(KEY_SPACE, dtype=np.int64)
+    width = max(len(options) for options in rolls)
+    keep_keys = np.zeros((len(rolls), width), dtype=np.int64)
+    keep_points = np.zeros((len(rolls), width), dtype=np.int64)
+    dice_left = np.zeros((len(rolls), width), dtype=np.int64)
+    valid = np.zeros((len(rolls), width), dtype=bool)
+    row = 0
+    for num_dice in xrange(1, constants.NUM_DICE + 1):
+        for dice in itertools.combinations_with_replacement(points.FACES,
+                                                            num_dice):
+            row += 1
+            rows[points.pack_dice(dice)] = row
+    for row, options in enumerate(rolls):
+        for column, keep in enumerate(options):
+            keep_keys[row, column] = keep.key
+            keep_points[row, column] = keep.points
+            dice_left[row, column] = keep.dice_left
+            valid[row, column] = True
+    return rows, keep_keys, keep_points, dice_left, valid
+
+
+class BatchPolicyStrategy(BatchStrategy):
+    """strategy.PolicyStrategy for many games at once
+
+    policy is a solver.TurnTable, whose values are looked up for every
+    legal keep of every game in one go, under the rules it was solved for.
+    """
+    # Keep options, keyed by rules digest
+    _options = {}
+
+    def __init__(self, policy):
+        self.reference = strategy.PolicyStrategy(policy)
+        self.policy = policy
+        digest = policy.rules.digest
+        if digest not in BatchPolicyStrategy._options:
+            BatchPolicyStrategy._options[digest] = _keep_options(policy.rules)
+        self._options = BatchPolicyStrategy._options[digest]
+
+    def _farkel_rows(self, states):
+        return np.minimum(_current(states, states.farkel_counts),
+                          self.policy.farkel_states - 1)
+
+    def _indices(self, turn_points):
+        return np.minimum(turn_points // self.policy.point_step,
+                          self.policy.max_index)
+
+    def choose_freezes(self, states):
+        rows, keep_keys, keep_points, dice_left, valid = self._options
+        options = rows[roll_keys(states.faces, states.frozen)]
+        # The last row of the table is for unqualified players
+        table_rows = np.where(_current(states, states.qualified),
+                              self._farkel_rows(states),
+                              self.policy.farkel_states)
+        left = dice_left[options]
+        # All dice frozen means a forced re-roll of the full set
+        reroll = left == 0
+        values = self.policy.table[
+            table_rows[:, None], reroll.astype(np.int64),
+            np.where(reroll, constants.NUM_DICE, left),
+            self._indices(states.turn_points[:, None] +
+                          keep_points[options])]
+        values = np.where(valid[options], values, -np.inf)
+        # argmax picks the first of equal values, as TurnTable does
+        best = keep_keys[options, values.argmax(axis=1)]
+        return keep_masks(states.faces, states.frozen, best)
+
+    def choose_banks(self, states):
+        dice_left = (~states.frozen).sum(axis=1)
+        thresholds = self.policy.table[self._farkel_rows(states), 1,
+                                       dice_left,
+                                       self._indices(states.turn_points)]
+        return (dice_left > 0) & (states.turn_points >= thresholds)
+
+
+# The freeze action for each mask of dice
+FREEZE_ACTIONS = [engine.freeze([index for index in xrange(constants.NUM_DICE)
+                                 if mask & (1 << index)])
+                  for mask in xrange(1 << constants.NUM_DICE)]
+
+
+def decide(games, batch_strategy):
+    """Return the action batch_strategy would take in each game
+
+    Freezes and banks are decided for every game in one call each, and
+    inheritances one game at a time by the reference strategy. Games that
+    are over get None.
+    """
+    actions = [None] * len(games)
+    waiting = {engine.FREEZE: [], engine.BANK_OR_ROLL: []}
+    for index, each in enumerate(games):
+        if each.phase in waiting:
+            waiting[each.phase].append(index)
+        elif each.phase == engine.INHERIT:
+            actions[index] = engine.decide(each, batch_strategy.reference)
+    freezing = waiting[engine.FREEZE]
+    if freezing:
+        masks = batch_strategy.choose_freezes(
+            game_states([games[index] for index in freezing]))
+        bits = masks.dot(1 << np.arange(constants.NUM_DICE)).tolist()
+        for index, mask in zip(freezing, bits):
+            actions[index] = FREEZE_ACTIONS[mask]
+    banking = waiting[engine.BANK_OR_ROLL]
+    if banking:
+        banks = batch_strategy.choose_banks(
+            game_states([games[index] for index in banking])).tolist()
+        for index, bank in zip(banking, banks):
+            actions[index] = engine.BANK if bank else engine.ROLL
+    return actions
+
+
+def run(games, batch_strategy):
+    """Play started games to the end with batch_strategy for every player
+
+    Each step makes one decision in every unfinished game. Returns the
+    winner of each game.
+    """
+    playing = [each for each in games if each.phase != engine.OVER]
+    while playing:
+        for each, action in zip(playing, decide(playing, batch_strategy)):
+            engine.apply(each, action)
+        playing = [each for each in playing if each.phase != engine.OVER]
+    return [engine.winner(each) for each in games]
@@ -0,0 +1,69 @@
+import collections
+
+# Eviction policies: drop the least recently used entry, or the oldest one
+LRU = 'lru'
+FIFO = 'fifo'
+
+
+class BoundedCache(object):
+    """A dict-like cache holding at most maxsize entries
+
+    Counts hits, misses and evictions so hit rates can be checked in long
+    running processes.
+    """
+
+    def __init__(self, maxsize=4096, eviction=LRU):
+        if eviction not in (LRU, FIFO):
+            raise ValueError("Unknown eviction policy {!r}".format(eviction))
+        if maxsize < 1:
+            raise ValueError("Cache must hold at least one entry")
+        self.maxsize = maxsize
+        self.eviction = eviction
+        self._entries = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key, default=None):
+        try:
+            value = self._entries[key]
+        except KeyError:
+            self.misses += 1
+            return default
+        self.hits += 1
+        if self.eviction == LRU:
+            # Move to the most recently used end
+            del self._entries[key]
+            self._entries[key] = value
+        return value
+
+    def put(self, key, value):
+        if key in self._entries:
+            del self._entries[key]
+        elif len(self._entries) >= self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+        self._entries[key] = value
+
+    def clear(self):
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'size': len(self._entries),
+            'maxsize': self.maxsize,
+            'hit_rate': float(self.hits) / lookups if lookups else 0.0,
+        }
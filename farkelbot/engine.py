@@ -0,0 +1,276 @@
+import collections
+
+from . import keeps
+from . import utils
+
+# Decisions a game can be waiting on
+INHERIT = 'inherit'
+FREEZE = 'freeze'
+BANK_OR_ROLL = 'bank_or_roll'
+OVER = 'over'
+
+Action = collections.namedtuple('Action', ['kind', 'value'])
+
+BANK = Action('bank', None)
+ROLL = Action('roll', None)
+ACCEPT_INHERIT = Action('inherit', True)
+DECLINE_INHERIT = Action('inherit', False)
+
+
+def freeze(indices):
+    return Action('freeze', tuple(sorted(indices)))
+
+
+# Something that happened in a game, passed to each of game.listeners.
+# player is the index of the player it happened to, and data depends on kind:
+#   STARTED: number of players, player is the one who starts
+#   ROLLED: the player's dice as a PackedDice
+#   FROZE: (indices frozen, turn points)
+#   BANKED: (turn points banked, banked score)
+#   FARKELED: banked score, after any farkel penalty
+#   INHERITED: (True if accepted, turn points offered)
+#   LAST_TURN: score to beat
+#   ENDED: every player's score, player is the winner or None
+Event = collections.namedtuple('Event', ['kind', 'player', 'data'])
+
+STARTED = 'started'
+ROLLED = 'rolled'
+FROZE = 'froze'
+BANKED = 'banked'
+FARKELED = 'farkeled'
+INHERITED = 'inherited'
+LAST_TURN = 'last_turn'
+ENDED = 'ended'
+
+EVENT_KINDS = (STARTED, ROLLED, FROZE, BANKED, FARKELED, INHERITED,
+               LAST_TURN, ENDED)
+
+
+def _notify(game, message):
+    if game.output:
+        game.output(message)
+
+
+def _emit(game, kind, data=None):
+    if game.listeners:
+        _dispatch(game, Event(kind, game.current, data))
+
+
+def _dispatch(game, event):
+    for listener in game.listeners:
+        listener(event)
+
+
+def current_player(game):
+    return game.players[game.current]
+
+
+def can_inherit(player, last_player, turn_points, last_score):
+    """Return True if player may inherit turn_points left by last_player,
+    whose banked score is last_score"""
+    return bool(turn_points and player.qualified and last_player.qualified and
+                last_score != 0)
+
+
+def inheritance_offered(game, player):
+    last_player = game.last_player
+    return bool(last_player and can_inherit(
+        player, last_player, last_player.diceset.points, last_player.score))
+
+
+def legal_actions(game):
+    """Return every action the current player can take"""
+    if game.phase == INHERIT:
+        return [ACCEPT_INHERIT, DECLINE_INHERIT]
+    if game.phase == BANK_OR_ROLL:
+        return [BANK, ROLL]
+    if game.phase != FREEZE:
+        return []
+    diceset = current_player(game).diceset
+    return [freeze(keeps.keep_indices(diceset.dice, keep.key))
+            for keep in keeps.legal_keeps(diceset.unfrozen_key, game.rules)]
+
+
+def start(game, starting_player):
+    """Begin a game with the player at index starting_player"""
+    game.current = starting_player
+    _emit(game, STARTED, game.num_players)
+    _begin_turn(game)
+
+
+def apply(game, action):
+    """Apply the current player's action and advance to the next decision
+
+    Invalid freezes raise a DiceSetException or DieException and leave the
+    game unchanged.
+    """
+    player = current_player(game)
+    if game.phase == INHERIT and action.kind == 'inherit':
+        _emit(game, INHERITED,
+              (action.value, game.last_player.diceset.points))
+        if action.value:
+            player.diceset.inherit_diceset(game.last_player.diceset)
+            _notify(game, "\nRoll inherited, you have {} points"
+                    .format(player.diceset.points))
+        _start_rolling(game)
+    elif game.phase == FREEZE and action.kind == 'freeze':
+        player.freeze_selection(action.value)
+        _emit(game, FROZE, (action.value, player.diceset.points))
+        _notify(game, "\nYou now have {} points".format(
+            player.diceset.points))
+        _after_freeze(game)
+    elif game.phase == BANK_OR_ROLL and action == BANK:
+        _bank(game, player)
+        if game.last_turn:
+            game.score_to_beat = player.score
+        _end_turn(game)
+    elif game.phase == BANK_OR_ROLL and action == ROLL:
+        _roll(game)
+    else:
+        raise utils.GameException(
+            "Can't {} while waiting to {}".format(action.kind, game.phase))
+
+
+def _begin_turn(game):
+    player = current_player(game)
+    player.make_active()
+
+    if game.last_turn:
+        if not game.turns_left or game.score_to_beat == player.score:
+            game.phase = OVER
+            if game.listeners:
+                best = winner(game)
+                _dispatch(game, Event(
+                    ENDED, None if best is None else game.players.index(best),
+                    tuple(each.score for each in game.players)))
+            return
+        game.turns_left -= 1
+
+    _notify(game, "---------------------------------------------")
+    _notify(game, "Player {}'s turn, you are {}qualified and have {} "
+            "banked points."
+            .format(player.name, '' if player.qualified else 'not ',
+                    player.score))
+
+    if inheritance_offered(game, player):
+        game.phase = INHERIT
+    else:
+        _start_rolling(game)
+
+
+def _start_rolling(game):
+    if game.last_player:
+        game.last_player.diceset.reset()
+    game.last_player = current_player(game)
+
+    _notify(game, "\nInitial roll!")
+    _roll(game)
+
+
+def _roll(game):
+    player = current_player(game)
+    if not player.roll():
+        _emit(game, FARKELED, player.score)
+        _notify(game, "You rolled a Farkel!\n")
+        _end_turn(game)
+    else:
+        if game.listeners:
+            _emit(game, ROLLED, player.diceset.pack())
+        if game.output:
+            game.output("You rolled the following dice: {}".format(
+                player.diceset.faces()))
+        game.phase = FREEZE
+
+
+def _after_freeze(game):
+    player = current_player(game)
+    if not player.diceset.dice_left:
+        _notify(game, "All dice frozen, re-rolling")
+        _roll(game)
+    elif not player.qualified:
+        if player.diceset.points < game.rules.QUALIFICATION_POINTS:
+            _notify(game, "\nNot qualified, must roll again")
+            _roll(game)
+        else:
+            _notify(game, "You qualified!")
+            _bank(game, player)
+            _end_turn(game)
+    elif (game.last_turn and
+          (player.score + player.diceset.points) < game.score_to_beat):
+        _notify(game, "Must beat {} points, re-rolling"
+                .format(game.score_to_beat))
+        _roll(game)
+    else:
+        game.phase = BANK_OR_ROLL
+
+
+def _bank(game, player):
+    points = player.diceset.points
+    player.bank_points()
+    _emit(game, BANKED, (points, player.score))
+
+
+def _end_turn(game):
+    player = current_player(game)
+    if player.is_win_condition_met() and not game.last_turn:
+        game.last_turn = True
+        game.score_to_beat = player.score
+        # Everyone, ending with this player, gets one more turn
+        game.turns_left = game.num_players
+        _emit(game, LAST_TURN, game.score_to_beat)
+        _notify(game,
+                "\n*********************************************\n"
+                "Player {} has over {} points, last turn!"
+                "\n*********************************************\n"
+                .format(player.name, game.rules.WIN_CONDITION))
+    game.current = (game.current + 1) % game.num_players
+    _begin_turn(game)
+
+
+def winner(game):
+    """Return the player with the best score, or None if nobody scored"""
+    best_score = 0
+    winning_player = None
+    for player in game.players:
+        if player.score > best_score:
+            best_score = player.score
+            winning_player = player
+    return winning_player
+
+
+def run(game):
+    """Ask each player's strategy for decisions until the game is over"""
+    for _ in steps(game):
+        pass
+    return winner(game)
+
+
+def decide(game, strategy=None):
+    """Return the action a strategy, by default the player's, would take"""
+    player = current_player(game)
+    strategy = strategy or player.strategy
+    if game.phase == INHERIT:
+        accept = strategy.choose_inherit(game, player, game.last_player)
+        return ACCEPT_INHERIT if accept else DECLINE_INHERIT
+    if game.phase == FREEZE:
+        return freeze(strategy.choose_freeze(game, player))
+    return BANK if strategy.choose_bank(game, player) else ROLL
+
+
+def steps(game):
+    """Ask each player's strategy for one decision at a time
+
+    A generator that applies one decision per iteration until the game is
+    over.
+    """
+    while game.phase != OVER:
+        action = decide(game)
+        if action.kind == 'freeze':
+            try:
+                apply(game, action)
+            except (utils.DiceSetException, utils.DieException) as error:
+                player = current_player(game)
+                player.strategy.invalid_freeze(game, player, error)
+        else:
+            apply(game, action)
+        yield
@@ -0,0 +1,259 @@
+import collections
+import struct
+
+from . import constants
+from . import engine
+from . import packed
+
+# A log file is a header followed by one record per event. Each record is
+# its payload length, the event kind and the player index, then a payload
+# that depends on the kind.
+MAGIC = b'FKLG'
+LOG_VERSION = 1
+
+_HEADER = struct.Struct('<4sH')
+_RECORD = struct.Struct('<BBB')
+
+_KIND_CODES = dict((kind, code)
+                   for code, kind in enumerate(engine.EVENT_KINDS))
+
+# Payloads of fixed size, by kind. ENDED holds one score per player.
+_PAYLOADS = {
+    engine.STARTED: struct.Struct('<B'),
+    engine.ROLLED: struct.Struct('<I'),
+    engine.FROZE: struct.Struct('<Bi'),
+    engine.BANKED: struct.Struct('<ii'),
+    engine.FARKELED: struct.Struct('<i'),
+    engine.INHERITED: struct.Struct('<?i'),
+    engine.LAST_TURN: struct.Struct('<i'),
+}
+
+# Player index stored for events that don't belong to a player
+NO_PLAYER = 255
+
+# Faces and frozen mask of a PackedDice, leaving out the derived face counts
+_DICE_MASK = (1 << packed.KEY_SHIFT) - 1
+
+
+def _mask(indices):
+    mask = 0
+    for index in indices:
+        mask |= 1 << index
+    return mask
+
+
+def _indices(mask):
+    return tuple(index for index in xrange(constants.NUM_DICE)
+                 if mask & (1 << index))
+
+
+def encode(event):
+    """Return the bytes of one log record"""
+    kind = event.kind
+    data = event.data
+    if kind == engine.ENDED:
+        payload = struct.pack('<{}i'.format(len(data)), *data)
+    elif kind == engine.ROLLED:
+        payload = _PAYLOADS[kind].pack(data & _DICE_MASK)
+    elif kind == engine.FROZE:
+        payload = _PAYLOADS[kind].pack(_mask(data[0]), data[1])
+    elif kind in (engine.BANKED, engine.INHERITED):
+        payload = _PAYLOADS[kind].pack(*data)
+    else:
+        payload = _PAYLOADS[kind].pack(data)
+    player = NO_PLAYER if event.player is None else event.player
+    return _RECORD.pack(len(payload), _KIND_CODES[kind], player) + payload
+
+
+def decode(code, player, payload):
+    """Return the event of one log record"""
+    kind = engine.EVENT_KINDS[code]
+    if kind == engine.ENDED:
+        data = struct.unpack('<{}i'.format(len(payload) // 4), payload)
+    else:
+        data = _PAYLOADS[kind].unpack(payload)
+        if kind == engine.ROLLED:
+            dice = packed.PackedDice(data[0])
+            data = packed.PackedDice.pack(
+                dice.faces(), [dice.is_frozen(index)
+                               for index in xrange(constants.NUM_DICE)])
+        elif kind == engine.FROZE:
+            data = (_indices(data[0]), data[1])
+        elif kind not in (engine.BANKED, engine.INHERITED):
+            data = data[0]
+    return engine.Event(kind, None if player == NO_PLAYER else player, data)
+
+
+class LogWriter(object):
+    """Writes events to a log file, buffering them into bulk writes
+
+    A LogWriter is a listener, so it can be passed in Game's listeners to
+    record every game it plays.
+    """
+
+    def __init__(self, path, buffer_size=1 << 16):
+        self.log_file = open(path, 'wb')
+        self.log_file.write(_HEADER.pack(MAGIC, LOG_VERSION))
+        self.buffer_size = buffer_size
+        self._records = []
+        self._size = 0
+
+    def __call__(self, event):
+        record = encode(event)
+        self._records.append(record)
+        self._size += len(record)
+        if self._size >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        self.log_file.write(b''.join(self._records))
+        self._records = []
+        self._size = 0
+
+    def close(self):
+        self.flush()
+        self.log_file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def read_log(path, chunk_size=1 << 16):
+    """Yield each event in a log file, reading it a chunk at a time"""
+    with open(path, 'rb') as log_file:
+        header = log_file.read(_HEADER.size)
+        if len(header) < _HEADER.size:
+            raise ValueError("{} is not a game log".format(path))
+        magic, version = _HEADER.unpack(header)
+        if magic != MAGIC or version != LOG_VERSION:
+            raise ValueError("{} is not a version {} game log".format(
+                path, LOG_VERSION))
+        data = b''
+        while True:
+            chunk = log_file.read(chunk_size)
+            if not chunk:
+                break
+            data += chunk
+            offset = 0
+            while offset + _RECORD.size <= len(data):
+                length, code, player = _RECORD.unpack_from(data, offset)
+                end = offset + _RECORD.size + length
+                if end > len(data):
+                    break
+                yield decode(code, player, data[offset + _RECORD.size:end])
+                offset = end
+            data = data[offset:]
+        if data:
+            raise ValueError("{} ends part way through a record".format(path))
+
+
+def play(game):
+    """Play a game, yielding each event as it happens"""
+    pending = collections.deque()
+    game.listeners.append(pending.append)
+    try:
+        engine.start(game, game.rng.randrange(game.num_players))
+        while pending:
+            yield pending.popleft()
+        for _ in engine.steps(game):
+            while pending:
+                yield pending.popleft()
+    finally:
+        game.listeners.remove(pending.append)
+
+
+class GameState(object):
+    """What can be known about a game from its events so far"""
+
+    def __init__(self, num_players):
+        self.num_players = num_players
+        self.scores = [0] * num_players
+        self.qualified = [False] * num_players
+        self.current = None
+        self.dice = None
+        self.turn_points = 0
+        self.last_turn = False
+        self.score_to_beat = 0
+        self.winner = None
+        self.over = False
+
+    def update(self, event):
+        kind = event.kind
+        if kind == engine.ROLLED:
+            self.current = event.player
+            self.dice = event.data
+        elif kind == engine.FROZE:
+            self.dice = self.dice.freeze(event.data[0])
+            self.turn_points = event.data[1]
+        elif kind == engine.BANKED:
+            self.qualified[event.player] = True
+            self.scores[event.player] = event.data[1]
+            self.turn_points = 0
+            self.dice = None
+        elif kind == engine.FARKELED:
+            self.scores[event.player] = event.data
+            self.turn_points = 0
+            self.dice = None
+        elif kind == engine.INHERITED:
+            self.current = event.player
+            if event.data[0]:
+                self.turn_points = event.data[1]
+        elif kind == engine.LAST_TURN:
+            self.last_turn = True
+            self.score_to_beat = event.data
+        elif kind == engine.STARTED:
+            self.current = event.player
+        elif kind == engine.ENDED:
+            self.scores = list(event.data)
+            self.winner = event.player
+            self.over = True
+
+
+def replay(events):
+    """Yield (event, state) for each event, rebuilding each game's state
+
+    The GameState is updated in place as events arrive, and a new one is
+    made for each game, so nothing but the current game is held in memory.
+    """
+    state = None
+    for event in events:
+        if event.kind == engine.STARTED:
+            state = GameState(event.data)
+        state.update(event)
+        yield event, state
+
+
+def summarize(events):
+    """Return counts and averages from a stream of events in one pass"""
+    counts = collections.Counter()
+    wins = collections.Counter()
+    banked_points = 0
+    winning_scores = 0
+    for event in events:
+        counts[event.kind] += 1
+        if event.kind == engine.BANKED:
+            banked_points += event.data[0]
+        elif event.kind == engine.INHERITED and event.data[0]:
+            counts['accepted'] += 1
+        elif event.kind == engine.ENDED and event.player is not None:
+            wins[event.player] += 1
+            winning_scores += event.data[event.player]
+    games = counts[engine.ENDED]
+    return {
+        'games': games,
+        'events': sum(counts[kind] for kind in engine.EVENT_KINDS),
+        'rolls': counts[engine.ROLLED],
+        'farkels': counts[engine.FARKELED],
+        'banks': counts[engine.BANKED],
+        'inherits_offered': counts[engine.INHERITED],
+        'inherits_accepted': counts['accepted'],
+        'last_turns': counts[engine.LAST_TURN],
+        'mean_bank': (float(banked_points) / counts[engine.BANKED]
+                      if counts[engine.BANKED] else 0.0),
+        'wins': dict(wins),
+        'mean_winning_score': (float(winning_scores) / sum(wins.values())
+                               if wins else 0.0),
+    }
@@ -1,46 +1,110 @@
-import ast
 import collections
-import itertools
-import random
 
 from . import constants
+from . import engine
+from . import keeps
+from . import packed
 from . import points
+from . import random_source
+from . import ruleset
+from . import strategy
 from . import utils
 
 
+# Packed key of a single die, indexed by face with zero for unrolled
+_FACE_KEYS = (0,) + tuple(points.pack_dice([face]) for face in points.FACES)
+
+# Everything about a player that changes during a game, dice as a PackedDice
+PlayerState = collections.namedtuple('PlayerState', [
+    'score', 'qualified', 'farkel_count', 'active', 'dice', 'points',
+    'roll_ok'])
+
+# Everything about a game that changes as it's played, with players as
+# PlayerStates and last_player as an index or None
+GameState = collections.namedtuple('GameState', [
+    'phase', 'current', 'last_player', 'last_turn', 'score_to_beat',
+    'turns_left', 'players'])
+
+
 class Die(object):
-    def __init__(self, seed=None):
-        self.reset()
-        if seed:
-            random.seed(seed)
+    def __init__(self, seed=None, rng=None, owner=None):
+        self._value = None
+        self._frozen = False
+        # The DiceSet to tell when the die changes, if any
+        self.owner = owner
+        self.rng = rng or random_source.RandomSource(seed or None)
+
+    @property
+    def value(self):
+        return self._value
+
+    @value.setter
+    def value(self, value):
+        owner = self.owner
+        if owner is not None and not self._frozen:
+            owner.unfrozen_key += (_FACE_KEYS[value or 0] -
+                                   _FACE_KEYS[self._value or 0])
+        self._value = value
+
+    @property
+    def frozen(self):
+        return self._frozen
+
+    @frozen.setter
+    def frozen(self, frozen):
+        owner = self.owner
+        if owner is not None and frozen != self._frozen:
+            if frozen:
+                owner.unfrozen_key -= _FACE_KEYS[self._value or 0]
+                owner.dice_left -= 1
+            else:
+                owner.unfrozen_key += _FACE_KEYS[self._value or 0]
+                owner.dice_left += 1
+        self._frozen = frozen
 
     def reset(self):
         self.value = None
         self.frozen = False
 
     def roll(self):
-        if self.frozen:
+        if self._frozen:
             raise utils.DieException("Die is frozen")
-        self.value = random.randint(constants.DICE_LOW_VAL,
-                                    constants.DICE_HIGH_VAL)
+        self.value = self.rng.randint(constants.DICE_LOW_VAL,
+                                      constants.DICE_HIGH_VAL)
 
     def freeze(self):
-        if not self.value:
+        if not self._value:
             raise utils.DieException("Cannot freeze an unrolled die")
-        if self.frozen:
+        if self._frozen:
             raise utils.DieException("Cannot freeze a frozen die")
         self.frozen = True
 
 
 class DiceSet(object):
-    def __init__(self, seed=None):
-        self.dice = [Die(seed) for _ in xrange(constants.NUM_DICE)]
+    """Six dice, with the packed face counts and number of the unfrozen ones
+
+    unfrozen_key and dice_left are kept up to date as the dice roll and
+    freeze, so checking the unfrozen dice never has to look at each die.
+    """
+
+    def __init__(self, seed=None, rng=None, rules=None):
+        self.rng = rng or random_source.RandomSource(seed or None)
+        self.rules = rules or ruleset.DEFAULT
+        self.dice = [Die(rng=self.rng, owner=self)
+                     for _ in xrange(constants.NUM_DICE)]
         self.points = 0
         self.reset()
 
+    @property
+    def all_frozen(self):
+        return not self.dice_left
+
     def reset(self, reset_score=True):
         for die in self.dice:
-            die.reset()
+            die._value = None
+            die._frozen = False
+        self.unfrozen_key = 0
+        self.dice_left = constants.NUM_DICE
         self.roll_ok = True
         if reset_score:
             self.points = 0
@@ -48,10 +112,13 @@ class DiceSet(object):
     def roll(self):
         if not self.roll_ok:
             raise utils.DiceSetException("Must freeze at least one die first")
-        for die in self.dice:
-            if not die.frozen:
-                die.roll()
-                self.roll_ok = False
+        values = self.rng.roll(self.dice_left)
+        if values:
+            self.roll_ok = False
+        unfrozen = [die for die in self.dice if not die._frozen]
+        for die, value in zip(unfrozen, values):
+            die._value = value
+        self.unfrozen_key = points.pack_dice(values)
         if self.check_farkel():
             self.reset()
             raise utils.FarkelException("Farkel!")
@@ -59,59 +126,85 @@ class DiceSet(object):
     def freeze_selection(self, selection_list):
         if self.roll_ok or not selection_list:
             raise utils.DiceSetException("Must freeze at least one die")
-        if any([die.frozen for die in selection_list]):
+        if any([die._frozen for die in selection_list]):
             raise utils.DiceSetException("A die is already frozen")
-        die_values = [die.value for die in selection_list]
-        roll_total_points, remaining_dice = points.score_dice(
-            collections.Counter(die_values))
+        key = points.pack_dice(die._value for die in selection_list)
+        roll_total_points, remaining_dice = self.rules.score_table[key]
         if remaining_dice:
-            raise utils.DiceSetException("Some dice didn't score!")
+            # Every die frozen has to score, even if leaving some would
+            # score more
+            roll_total_points = self.rules.full_score_table.get(key)
+            if not roll_total_points:
+                raise utils.DiceSetException("Some dice didn't score!")
         self.points += roll_total_points
         for selection in selection_list:
             selection.freeze()
         self.roll_ok = True
 
+    def legal_keeps(self):
+        return keeps.legal_keeps(self.unfrozen_key, self.rules)
+
+    def faces(self):
+        """Values of the dice, with 0 for frozen ones"""
+        return [0 if die._frozen else die._value for die in self.dice]
+
+    def pack(self):
+        return packed.PackedDice.pack([die._value for die in self.dice],
+                                      [die._frozen for die in self.dice])
+
+    def unpack(self, packed_dice):
+        faces = packed_dice
+        mask = packed_dice.frozen_mask
+        for die in self.dice:
+            die._value = (faces & packed.FACE_MASK) or None
+            die._frozen = bool(mask & 1)
+            faces >>= packed.FACE_BITS
+            mask >>= 1
+        self.unfrozen_key = packed_dice.unfrozen_key
+        self.dice_left = packed_dice.dice_left
+
     def inherit_diceset(self, diceset):
-        for index, die in enumerate(diceset.dice):
-            self.dice[index].value = die.value
-            self.dice[index].frozen = die.frozen
+        self.unpack(diceset.pack())
         self.points = diceset.points
         self.roll_ok = True
 
     def check_farkel(self):
-        die_values = [die.value for die in self.dice if not die.frozen]
-        score, remaining_dice = \
-            points.score_dice(collections.Counter(die_values))
-        if score:
-            return False
-        else:
-            return True
+        return not self.rules.score_table[self.unfrozen_key][0]
+
+    def restore(self, packed_dice, turn_points, roll_ok):
+        self.unpack(packed_dice)
+        self.points = turn_points
+        self.roll_ok = roll_ok
 
 
 class Player(object):
-    def __init__(self, seed=None, name=None):
+    def __init__(self, seed=None, name=None, strategy=None, rng=None,
+                 rules=None):
         self.qualified = False
         self.score = 0
         self.farkel_count = 0
-        self.diceset = DiceSet(seed)
+        self.rules = rules or ruleset.DEFAULT
+        self.diceset = DiceSet(seed, rng, self.rules)
         self.active = False
         self.name = name
+        self.strategy = strategy
 
     def bank_points(self):
         if self.qualified:
             self.score += self.diceset.points
             self.farkel_count = 0
         else:
-            if self.diceset.points >= constants.QUALIFICATION_POINTS:
+            if self.diceset.points >= self.rules.QUALIFICATION_POINTS:
                 self.qualified = True
             else:
                 raise utils.PlayerException(
                     "Need {} points to qualify, player has {}".format(
-                        constants.QUALIFICATION_POINTS, self.diceset.points))
+                        self.rules.QUALIFICATION_POINTS, self.diceset.points))
         self.active = False
 
     def roll(self):
-        if all([die.frozen for die in self.diceset.dice]):
+        """Roll the dice, returning False on a farkel"""
+        if not self.diceset.dice_left:
             self.diceset.reset(reset_score=False)
         try:
             self.diceset.roll()
@@ -119,14 +212,10 @@ class Player(object):
             self.active = False
             if self.qualified:
                 self.farkel_count += 1
-                if self.farkel_count >= constants.FARKEL_LIMIT:
-                    self.score -= constants.FARKEL_POINTS
-            print("You rolled a Farkel!\n")
-            return
-        dice = [die.value if not die.frozen else 0
-                for die in self.diceset.dice]
-        print("You rolled the following dice: {}".format(dice))
-        return dice
+                if self.farkel_count >= self.rules.FARKEL_LIMIT:
+                    self.score -= self.rules.FARKEL_POINTS
+            return False
+        return True
 
     def freeze_selection(self, selection_list):
         return self.diceset.freeze_selection(
@@ -143,152 +232,112 @@ class Player(object):
         return self.active
 
     def is_win_condition_met(self):
-        return self.score >= constants.WIN_CONDITION
+        return self.score >= self.rules.WIN_CONDITION
+
+    def snapshot(self):
+        diceset = self.diceset
+        return PlayerState(self.score, self.qualified, self.farkel_count,
+                           self.active, diceset.pack(), diceset.points,
+                           diceset.roll_ok)
+
+    def restore(self, state):
+        self.score = state.score
+        self.qualified = state.qualified
+        self.farkel_count = state.farkel_count
+        self.active = state.active
+        self.diceset.restore(state.dice, state.points, state.roll_ok)
+
+
+def print_message(message):
+    print(message)
 
 
 class Game(object):
-    def __init__(self, num_players):
+    def __init__(self, num_players, strategies=None, output=None, seed=None,
+                 rng=None, rules=None, listeners=None):
+        if strategies is None:
+            strategies = [strategy.InteractiveStrategy()
+                          for _ in xrange(num_players)]
+            output = output or print_message
+        if len(strategies) != num_players:
+            raise ValueError("Got {} strategies for {} players".format(
+                len(strategies), num_players))
         self.num_players = num_players
-        self.players = [Player(name=i + 1)
-                        for i in xrange(self.num_players)]
-        self.player_cycle = None
-        self.persist = itertools.cycle([True])
+        self.rng = rng or random_source.RandomSource(seed)
+        self.rules = rules or ruleset.DEFAULT
+        self.players = [Player(name=i + 1, strategy=player_strategy,
+                               rng=self.rng, rules=self.rules)
+                        for i, player_strategy in enumerate(strategies)]
+        self.output = output
+        # Called with each engine.Event as the game is played
+        self.listeners = list(listeners or [])
+        self.phase = None
+        self.current = None
         self.last_turn = False
         self.last_player = None
         self.score_to_beat = 0
+        self.turns_left = 0
 
     def start(self):
         # Determine who starts
-        starting_player = random.randint(0, self.num_players)
-
-        # Set up the player cycle
-        self.player_cycle = itertools.cycle(self.players)
-
-        # Start on randomly chosen player
-        self.player_cycle = itertools.islice(
-            self.player_cycle, starting_player, None)
-
-        while next(self.persist):
-            self.loop_through_players()
-
-        best_score = 0
-        winning_player = ''
-        for p in self.players:
-            if p.score > best_score:
-                best_score = p.score
-                winning_player = p.name
-        print("\n*********************************************\n"
-              "Player {} wins with a score of {}"
-              "\n*********************************************\n"
-              .format(winning_player, best_score))
-
-    def loop_through_players(self):
-        for player_turn in xrange(self.num_players):
-            player = self.player_cycle.next()
-            player.make_active()
-
-            if self.last_turn and self.score_to_beat == player.score:
-                return
-
-            print("---------------------------------------------")
-            print("Player {}'s turn, you are {}qualified and have {} "
-                  "banked points."
-                  .format(player.name, '' if player.qualified else 'not ',
-                          player.score))
-
-            if (self.last_player and self.last_player.diceset.points and
-                    player.qualified and self.last_player.qualified and
-                    self.last_player.score != 0):
-                inherit_choice = ''
-                while inherit_choice not in ['n', 'y']:
-                    inherit_choice = raw_input(
-                        "The last player scored {} and left {} dice. "
-                        "Would you like to inherit their score "
-                        "and dice? Type 'y' or 'n'\n".format(
-                            self.last_player.diceset.points,
-                            sum([1 for die in
-                                 self.last_player.diceset.dice
-                                 if not die.frozen]))
-                    )
-                if inherit_choice == 'y':
-                    player.diceset.inherit_diceset(
-                        self.last_player.diceset)
-                    print("\nRoll inherited, you have {} points"
-                          .format(player.diceset.points))
-            if self.last_player:
-                self.last_player.diceset.reset()
-
-            self.last_player = player
-
-            print("\nInitial roll!")
-            player.roll()
-
-            while player.is_active():
-                freeze_choice = ''
-                while not freeze_choice:
-                    freeze_choice = raw_input("\nWrite dice index (as a "
-                                              "list) to freeze\n")
-                    try:
-                        freeze_choice = ast.literal_eval(freeze_choice)
-                        player.freeze_selection(freeze_choice)
-                        print("\nYou now have {} points".format(
-                            player.diceset.points))
-                    except (ValueError, SyntaxError):
-                        freeze_choice = ''
-                    except (utils.DiceSetException, utils.DieException):
-                        print("Invalid dice selection")
-                        freeze_choice = ''
-
-                if all([die.frozen for die in player.diceset.dice]):
-                    print("All dice frozen, re-rolling")
-                    player.roll()
-                    continue
-
-                if not player.qualified:
-                    if (player.diceset.points <
-                            constants.QUALIFICATION_POINTS):
-                        print("\nNot qualified, must roll again")
-                        player.roll()
-                    else:
-                        print("You qualified!")
-                        player.bank_points()
-                    continue
-
-                if (self.last_turn and
-                    (player.score + player.diceset.points) <
-                        self.score_to_beat):
-                    print("Must beat {} points, re-rolling"
-                          .format(self.score_to_beat))
-                    player.roll()
-                    continue
-
-                bank_choice = ''
-                while bank_choice not in ['b', 'r']:
-                    bank_choice = raw_input("\nType 'b' to bank points or "
-                                            "'r' to roll\n")
-                if bank_choice == 'b':
-                    player.bank_points()
-                    if self.last_turn:
-                        self.score_to_beat = player.score
-                    continue
-                else:
-                    player.roll()
-                    continue
-
-            if player.is_win_condition_met():
-                if not self.last_turn:
-                    self.persist = iter([True, False])
-                    self.last_turn = True
-                    self.score_to_beat = player.score
-                    print(
-                        "\n*********************************************\n"
-                        "Player {} has over {} points, last turn!"
-                        "\n*********************************************\n"
-                        .format(player.name, constants.WIN_CONDITION))
-
-                    # Set up player cycle to do one more loop
-                    self.player_cycle = itertools.dropwhile(
-                        lambda x: x != player, self.player_cycle)
-                    self.player_cycle = itertools.islice(
-                        self.player_cycle, 1, None)
-                    return
+        starting_player = self.rng.randrange(self.num_players)
+
+        engine.start(self, starting_player)
+        winning_player = engine.run(self)
+
+        if winning_player and self.output:
+            self.output(
+                "\n*********************************************\n"
+                "Player {} wins with a score of {}"
+                "\n*********************************************\n"
+                .format(winning_player.name, winning_player.score))
+        return winning_player
+
+    def snapshot(self):
+        """Return the game's state as an immutable GameState
+
+        Snapshots are hashable and can be shared freely, say between the
+        nodes of a search tree, since nothing ever changes them. The rng,
+        strategies and listeners aren't part of the state.
+        """
+        last_player = self.last_player
+        return GameState(
+            self.phase, self.current,
+            None if last_player is None else self.players.index(last_player),
+            self.last_turn, self.score_to_beat, self.turns_left,
+            tuple(player.snapshot() for player in self.players))
+
+    def restore(self, state):
+        """Put the game back in a state from snapshot
+
+        The game must have as many players as the snapshot. Searching can
+        restore one scratch game to each position it looks at instead of
+        building a copy for each.
+        """
+        if len(state.players) != self.num_players:
+            raise utils.GameException(
+                "Can't restore a {}-player game into a {}-player one".format(
+                    len(state.players), self.num_players))
+        self.phase = state.phase
+        self.current = state.current
+        self.last_player = (None if state.last_player is None else
+                            self.players[state.last_player])
+        self.last_turn = state.last_turn
+        self.score_to_beat = state.score_to_beat
+        self.turns_left = state.turns_left
+        for player, player_state in zip(self.players, state.players):
+            player.restore(player_state)
+
+    def clone(self, rng=None):
+        """Return a new game in the same state with the same strategies
+
+        The copy has no output or listeners, and draws from rng, by default
+        a fresh unseeded source.
+        """
+        copy = Game(self.num_players,
+                    strategies=[player.strategy for player in self.players],
+                    rng=rng, rules=self.rules)
+        for player, original in zip(copy.players, self.players):
+            player.name = original.name
+        copy.restore(self.snapshot())
+        return copy
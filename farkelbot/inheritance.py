@@ -0,0 +1,118 @@
+"""Values for playing around the inheritance rule
+
+A qualified player can take over the turn points and unfrozen dice of the
+previous player, if they were qualified too, and then has to roll. Taking
+them is worth the expected value of rolling from there less that of
+starting fresh, which the single-turn solver already knows for every
+(turn points, dice left). The same difference is what banking leaves
+behind for the next player, so banking is worth the turn points less that
+gift whenever the next player could inherit.
+"""
+from . import constants
+from . import ruleset
+from . import solver
+
+# Solved values, keyed by (max_turn_points, weight, rules digest)
+_cache = {}
+
+
+def _inherit_gains(policy, farkel_state):
+    """Expected gain of inheriting over starting fresh, by dice left and
+    turn points index"""
+    roll_values = policy.roll_values[farkel_state]
+    fresh = roll_values[constants.NUM_DICE][0]
+    return [[value - fresh if dice_left else 0.0
+             for value in roll_values[dice_left]]
+            for dice_left in xrange(constants.NUM_DICE + 1)]
+
+
+class InheritanceValues(object):
+    """Single-turn policies and tables for inheriting and leaving turns
+
+    left_behind[dice_left][index] is what banking gives the next player to
+    inherit, taken to play the plain expected-value policy with no farkels
+    counted. inherit_gain[farkel_count][dice_left][index] is the gain from
+    inheriting over starting fresh for a player with that farkel count.
+    Indices are turn points in POINT_STEPs.
+
+    Both policies are solved for rules, the default RuleSet if None, and
+    deciding under other rules raises ValueError.
+
+    weight is how much the next player's gain costs the player banking, 1
+    when they're the only opponent. aware is the policy played when banking
+    leaves something to inherit, charging weight times left_behind for it,
+    and fresh is played otherwise.
+    """
+
+    def __init__(self, max_turn_points=None, weight=1.0, rules=None):
+        self.weight = weight
+        self.fresh = solver.TurnPolicy(max_turn_points, rules=rules)
+        self.rules = self.fresh.rules
+        self.max_index = self.fresh.max_index
+        self.left_behind = [[max(0.0, gain) for gain in row]
+                            for row in _inherit_gains(self.fresh, 0)]
+        self.aware = solver.TurnPolicy(
+            max_turn_points, bank_cost=[[weight * value for value in row]
+                                        for row in self.left_behind],
+            rules=rules)
+        self.inherit_gain = [_inherit_gains(self.aware, farkel_state)
+                             for farkel_state in
+                             xrange(self.aware.farkel_states)]
+
+    def check_rules(self, rules):
+        """Raise ValueError unless the values were solved for rules"""
+        self.fresh.check_rules(rules)
+
+    def _index(self, turn_points):
+        return min(turn_points // self.fresh.point_step, self.max_index)
+
+    def inherit_value(self, turn_points, dice_left, farkel_count=0):
+        """Expected gain of inheriting over starting fresh"""
+        farkel_state = min(farkel_count, len(self.inherit_gain) - 1)
+        return self.inherit_gain[farkel_state][dice_left][
+            self._index(turn_points)]
+
+    def left_value(self, turn_points, dice_left):
+        """What banking with turn points and dice left gives the next
+        player"""
+        return self.left_behind[dice_left][self._index(turn_points)]
+
+    def leaves_inheritance(self, game, player):
+        """Return True if the next player could inherit if player banks"""
+        following = game.players[(game.players.index(player) + 1) %
+                                 game.num_players]
+        return bool(following is not player and following.qualified and
+                    player.qualified and
+                    player.score + player.diceset.points != 0)
+
+    def _policy(self, game, player):
+        self.check_rules(player.diceset.rules)
+        if self.leaves_inheritance(game, player):
+            return self.aware
+        return self.fresh
+
+    def should_inherit(self, game, player, last_player):
+        self.check_rules(player.diceset.rules)
+        diceset = last_player.diceset
+        return self.inherit_value(diceset.points, diceset.dice_left,
+                                  player.farkel_count) > 0
+
+    def choose_keep(self, game, player):
+        diceset = player.diceset
+        return self._policy(game, player).choose_keep(
+            diceset.unfrozen_key, diceset.points, player.farkel_count,
+            player.qualified)
+
+    def should_bank(self, game, player):
+        diceset = player.diceset
+        return self._policy(game, player).should_bank(
+            diceset.dice_left, diceset.points, player.farkel_count)
+
+
+def cached_values(max_turn_points=None, weight=1.0, rules=None):
+    """Return InheritanceValues, solving them once per process"""
+    rules = rules or ruleset.DEFAULT
+    key = (max_turn_points, weight, rules.digest)
+    if key not in _cache:
+        _cache[key] = InheritanceValues(max_turn_points, weight, rules)
+    return _cache[key]
@@ -0,0 +1,250 @@
+"""Opt-in counters and timings for the game's hot paths
+
+Nothing is measured until enable is called. It replaces each function in
+HOT_PATHS with a wrapper that times it, and watches every game started
+while it's enabled. disable puts the original functions back, so the
+game runs exactly as fast as without this module once it's disabled.
+
+    recorder = instrument.enable()
+    ...play some games...
+    instrument.disable()
+    recorder.snapshot()
+    recorder.write_prometheus('farkelbot.prom')
+"""
+import bisect
+import contextlib
+import functools
+import os
+import timeit
+
+from . import constants
+from . import engine
+from . import game
+from . import keeps
+
+# Functions timed while enabled, as (owner, attribute name). Each one runs
+# on every turn of a game; scoring is the score table lookups inside roll,
+# check_farkel and freeze_selection.
+HOT_PATHS = (
+    (game.DiceSet, 'roll'),
+    (game.DiceSet, 'check_farkel'),
+    (game.DiceSet, 'freeze_selection'),
+    (game.Player, 'roll'),
+    (game.Player, 'freeze_selection'),
+    (keeps, 'keep_indices'),
+    (engine, 'decide'),
+    (engine, 'apply'),
+)
+
+# Upper bounds of the call latency buckets, in seconds
+LATENCY_BUCKETS = (1e-6, 2.5e-6, 5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4,
+                   1e-3, 1e-2, float('inf'))
+
+# Upper bounds of the rolls per turn buckets
+ROLL_BUCKETS = (1, 2, 3, 4, 5, 6, 8, 10, 15, float('inf'))
+
+_clock = timeit.default_timer
+
+# Originals of the wrapped functions, and the recorder they report to
+_originals = {}
+_recorder = None
+
+
+class Histogram(object):
+    """Counts of observed values by bucket, with their count and sum"""
+
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * len(self.buckets)
+        self.count = 0
+        self.total = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.total += value
+
+    def cumulative(self):
+        """(upper bound, count of values at most that) for each bucket"""
+        running = 0
+        result = []
+        for bound, count in zip(self.buckets, self.counts):
+            running += count
+            result.append((bound, running))
+        return result
+
+
+def _label(owner, name):
+    return '{}.{}'.format(owner.__name__.split('.')[-1], name)
+
+
+class _GameObserver(object):
+    """Turns one game's events into game stats for a Recorder"""
+
+    def __init__(self, recorder):
+        self.recorder = recorder
+        self.turn_rolls = 0
+
+    def __call__(self, event):
+        stats = self.recorder.game_stats
+        kind = event.kind
+        if kind == engine.ROLLED:
+            stats['rolls'] += 1
+            self.turn_rolls += 1
+            # A full set of dice after the first roll of a turn means every
+            # die was frozen and the player rolls them all again
+            if (self.turn_rolls > 1 and
+                    event.data.dice_left == constants.NUM_DICE):
+                stats['hot_dice'] += 1
+        elif kind == engine.FARKELED:
+            stats['rolls'] += 1
+            stats['farkels'] += 1
+            self.turn_rolls += 1
+            self._end_turn()
+        elif kind == engine.BANKED:
+            self._end_turn()
+        elif kind == engine.ENDED:
+            stats['games'] += 1
+
+    def _end_turn(self):
+        self.recorder.game_stats['turns'] += 1
+        self.recorder.rolls_per_turn.observe(self.turn_rolls)
+        self.turn_rolls = 0
+
+
+class Recorder(object):
+    """Call latencies and game stats gathered while instrumentation is on"""
+
+    def __init__(self):
+        self.calls = dict((_label(owner, name), Histogram(LATENCY_BUCKETS))
+                          for owner, name in HOT_PATHS)
+        self.rolls_per_turn = Histogram(ROLL_BUCKETS)
+        self.game_stats = dict.fromkeys(
+            ('games', 'turns', 'rolls', 'farkels', 'hot_dice'), 0)
+
+    def observe(self, game):
+        """Gather game stats from a game's events"""
+        game.listeners.append(_GameObserver(self))
+
+    def snapshot(self):
+        """Return everything recorded so far as plain dicts"""
+        stats = dict(self.game_stats)
+        stats['rolls_per_turn'] = (float(stats['rolls']) / stats['turns']
+                                   if stats['turns'] else 0.0)
+        stats['farkel_rate'] = (float(stats['farkels']) / stats['rolls']
+                                if stats['rolls'] else 0.0)
+        stats['hot_dice_rate'] = (float(stats['hot_dice']) / stats['turns']
+                                  if stats['turns'] else 0.0)
+        return {
+            'functions': dict((name, {
+                'calls': histogram.count,
+                'seconds': histogram.total,
+                'buckets': histogram.cumulative(),
+            }) for name, histogram in self.calls.items()),
+            'games': stats,
+            'rolls_per_turn': self.rolls_per_turn.cumulative(),
+        }
+
+    def prometheus(self):
+        """Return everything recorded so far in Prometheus text format"""
+        lines = [
+            '# HELP farkelbot_call_seconds Time spent in hot path functions',
+            '# TYPE farkelbot_call_seconds histogram',
+        ]
+        for name in sorted(self.calls):
+            lines.extend(_histogram_lines(
+                'farkelbot_call_seconds', self.calls[name],
+                'function="{}",'.format(name)))
+        lines.extend([
+            '# HELP farkelbot_rolls_per_turn Rolls made in each turn',
+            '# TYPE farkelbot_rolls_per_turn histogram',
+        ])
+        lines.extend(_histogram_lines('farkelbot_rolls_per_turn',
+                                      self.rolls_per_turn))
+        for name in sorted(self.game_stats):
+            metric = 'farkelbot_{}_total'.format(name)
+            lines.append('# TYPE {} counter'.format(metric))
+            lines.append('{} {}'.format(metric, self.game_stats[name]))
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self, path):
+        """Write the Prometheus text to path, replacing it in one step
+
+        Suits the node exporter's textfile collector, which must never see
+        a half written file.
+        """
+        temporary = '{}.{}.tmp'.format(path, os.getpid())
+        with open(temporary, 'w') as metrics_file:
+            metrics_file.write(self.prometheus())
+        os.rename(temporary, path)
+
+
+def _bound(value):
+    return '+Inf' if value == float('inf') else repr(value)
+
+
+def _histogram_lines(metric, histogram, labels=''):
+    bucket = '{}_bucket{{{}le="{}"}} {}'
+    lines = [bucket.format(metric, labels, _bound(bound), count)
+             for bound, count in histogram.cumulative()]
+    labels = '{{{}}}'.format(labels.rstrip(',')) if labels else ''
+    lines.append('{}_sum{} {!r}'.format(metric, labels, histogram.total))
+    lines.append('{}_count{} {}'.format(metric, labels, histogram.count))
+    return lines
+
+
+def _timed(function, histogram):
+    @functools.wraps(function)
+    def timed(*args, **kwargs):
+        start = _clock()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            histogram.observe(_clock() - start)
+    return timed
+
+
+def _observing_start(start, recorder):
+    @functools.wraps(start)
+    def observing_start(game, starting_player):
+        recorder.observe(game)
+        return start(game, starting_player)
+    return observing_start
+
+
+def enable(recorder=None):
+    """Start recording, returning the Recorder the results go to"""
+    global _recorder
+    disable()
+    _recorder = recorder or Recorder()
+    for owner, name in HOT_PATHS + ((engine, 'start'),):
+        # The class's own function, rather than an unbound method
+        _originals[owner, name] = owner.__dict__[name]
+    for owner, name in HOT_PATHS:
+        setattr(owner, name, _timed(_originals[owner, name],
+                                    _recorder.calls[_label(owner, name)]))
+    engine.start = _observing_start(_originals[engine, 'start'], _recorder)
+    return _recorder
+
+
+def disable():
+    """Stop recording and put the original functions back"""
+    global _recorder
+    for (owner, name), function in _originals.items():
+        setattr(owner, name, function)
+    _originals.clear()
+    _recorder = None
+
+
+def enabled():
+    return _recorder is not None
+
+
+@contextlib.contextmanager
+def recording(recorder=None):
+    """Record for the length of a with block, yielding the Recorder"""
+    recorder = enable(recorder)
+    try:
+        yield recorder
+    finally:
+        disable()
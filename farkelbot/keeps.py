@@ -0,0 +1,57 @@
+import collections
+import itertools
+
+from . import constants
+from . import points
+from . import ruleset
+
+# A legal selection of dice to freeze from a roll
+Keep = collections.namedtuple('Keep', ['key', 'points', 'dice_left'])
+
+# Legal keeps already worked out, keyed by rules digest then packed roll
+_keeps = {}
+
+
+def _sub_keys(key):
+    """Yield every non-empty packed sub-multiset of a packed key"""
+    ranges = [xrange(count + 1) for count in points.unpack_counts(key)]
+    for counts in itertools.product(*ranges):
+        if any(counts):
+            yield points.pack_counts(counts)
+
+
+def legal_keeps(roll_key, rules=None):
+    """Return every distinct selection of a roll in which all dice score
+
+    roll_key is the packed face counts of the rolled dice, and each Keep
+    holds the packed dice to freeze, the points they score and how many of
+    the rolled dice would be left.
+    """
+    rules = rules or ruleset.DEFAULT
+    known = _keeps.setdefault(rules.digest, {})
+    if roll_key not in known:
+        num_dice = sum(points.unpack_counts(roll_key))
+        found = []
+        full_scores = rules.full_score_table
+        for keep_key in _sub_keys(roll_key):
+            score = full_scores.get(keep_key)
+            if score:
+                found.append(Keep(
+                    keep_key, score,
+                    num_dice - sum(points.unpack_counts(keep_key))))
+        known[roll_key] = tuple(found)
+    return known[roll_key]
+
+
+def keep_indices(dice, keep_key):
+    """Return the indices of unfrozen dice matching a packed keep"""
+    needed = list(points.unpack_counts(keep_key))
+    indices = []
+    for index, die in enumerate(dice):
+        if die.frozen:
+            continue
+        face = die.value - constants.DICE_LOW_VAL
+        if needed[face]:
+            needed[face] -= 1
+            indices.append(index)
+    return indices
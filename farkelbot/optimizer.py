@@ -0,0 +1,124 @@
+import itertools
+import math
+import multiprocessing
+
+from . import tournament
+
+
+def grid(**values):
+    """Return the keyword arguments for every combination of values
+
+    grid(bank_threshold=[300, 500], trailing_bonus=[0, 200]) gives four
+    dicts, one for each pair of values.
+    """
+    names = sorted(values)
+    return [dict(zip(names, combination))
+            for combination in itertools.product(*[values[name]
+                                                   for name in names])]
+
+
+def _name(kwargs):
+    return ', '.join('{}={!r}'.format(name, kwargs[name])
+                     for name in sorted(kwargs))
+
+
+def _play(pool, tasks):
+    if pool is None:
+        return [tournament.play_shard(task) for task in tasks]
+    return pool.map(tournament.play_shard, tasks, chunksize=1)
+
+
+def _survivors(alive, wins, games, keep_fraction, z):
+    """Drop candidates that are clearly worse than the leader
+
+    A candidate is dropped once the top of its confidence interval is below
+    the bottom of the leader's. With a keep_fraction, only that fraction of
+    the best candidates is kept as well.
+    """
+    intervals = dict((index, tournament.wilson_interval(
+        wins[index], games[index], z)) for index in alive)
+    best_low = max(low for low, _ in intervals.values())
+    survivors = [index for index in alive if intervals[index][1] >= best_low]
+    if keep_fraction is not None:
+        ranked = sorted(survivors, key=lambda index: (
+            -float(wins[index]) / games[index] if games[index] else 0.0))
+        keep = max(1, int(math.ceil(len(alive) * keep_fraction)))
+        survivors = sorted(ranked[:keep])
+    return survivors
+
+
+def race(factory, candidates, opponent, games_per_round=100, max_rounds=8,
+         keep_fraction=None, processes=None, master_seed=0, shard_size=50,
+         z=1.96):
+    """Find the best keyword arguments for a strategy factory
+
+    Each round, every remaining candidate plays games_per_round more games
+    against the opponent Entrant, split into shards played across worker
+    processes. Losers are dropped after each round once their confidence
+    intervals separate from the leader's, and with a keep_fraction such as
+    0.5 this becomes successive halving. A single round with max_rounds=1 is
+    a plain grid search.
+
+    Every candidate plays the same shard seeds in a round, so they face the
+    same dice and differences come from the parameters rather than luck.
+    Returns a dict with the best keyword arguments and a result for each
+    candidate, best first.
+    """
+    entrants = [opponent] + [tournament.Entrant(_name(kwargs), factory,
+                                                kwargs)
+                             for kwargs in candidates]
+    wins = [0] * len(candidates)
+    games = [0] * len(candidates)
+    dropped = [None] * len(candidates)
+    alive = range(len(candidates))
+    rounds = 0
+
+    if processes == 1:
+        tournament._init_worker(entrants)
+        pool = None
+    else:
+        pool = multiprocessing.Pool(processes, tournament._init_worker,
+                                    (entrants,))
+    try:
+        while len(alive) > 1 and rounds < max_rounds:
+            tasks = [(index + 1, 0, min(shard_size, games_per_round - start),
+                      tournament.shard_seed(master_seed, rounds, shard))
+                     for index in alive
+                     for shard, start in enumerate(
+                         xrange(0, games_per_round, shard_size))]
+            for first, _, shard_wins, shard_games in _play(pool, tasks):
+                wins[first - 1] += shard_wins[0]
+                games[first - 1] += shard_games
+            survivors = _survivors(alive, wins, games, keep_fraction, z)
+            for index in alive:
+                if index not in survivors:
+                    dropped[index] = rounds
+            alive = survivors
+            rounds += 1
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+    results = []
+    for index, kwargs in enumerate(candidates):
+        low, high = tournament.wilson_interval(wins[index], games[index], z)
+        results.append({
+            'kwargs': kwargs,
+            'wins': wins[index],
+            'games': games[index],
+            'win_rate': (float(wins[index]) / games[index]
+                         if games[index] else 0.0),
+            'low': low,
+            'high': high,
+            'dropped': dropped[index],
+        })
+    # Candidates still in the race first, then by win rate
+    results.sort(key=lambda result: (result['dropped'] is not None,
+                                     -result['win_rate']))
+    return {
+        'best': results[0]['kwargs'],
+        'candidates': results,
+        'rounds': rounds,
+        'games': sum(games),
+    }
@@ -0,0 +1,107 @@
+from . import constants
+from . import points
+
+# Bits used to store one die's face, zero meaning unrolled
+FACE_BITS = 3
+FACE_MASK = (1 << FACE_BITS) - 1
+
+# Layout of a packed set of dice, lowest bits first: the face of each die,
+# a mask of frozen dice, then the packed face counts of the unfrozen dice
+FROZEN_SHIFT = FACE_BITS * constants.NUM_DICE
+ALL_FROZEN = (1 << constants.NUM_DICE) - 1
+KEY_SHIFT = FROZEN_SHIFT + constants.NUM_DICE
+
+# Number of dice in each frozen mask
+_FROZEN_COUNTS = tuple(bin(mask).count('1') for mask in xrange(ALL_FROZEN + 1))
+
+
+def _face_key(face):
+    return 1 << (points.COUNT_BITS * (face - constants.DICE_LOW_VAL))
+
+
+class PackedDice(int):
+    """An immutable set of dice packed into a single integer
+
+    Being an integer it is hashable and compact, so it can be used as a cache
+    key or stored in bulk. The packed face counts of the unfrozen dice are
+    kept alongside the faces so scoring them doesn't need to look at each
+    die.
+    """
+    __slots__ = ()
+
+    @classmethod
+    def pack(cls, faces, frozen=()):
+        """Pack a sequence of faces (None if unrolled) and frozen flags"""
+        bits = 0
+        mask = 0
+        key = 0
+        frozen = list(frozen) + [False] * (len(faces) - len(frozen))
+        for index, (face, is_frozen) in enumerate(zip(faces, frozen)):
+            bits |= (face or 0) << (FACE_BITS * index)
+            if is_frozen:
+                mask |= 1 << index
+            elif face:
+                key += _face_key(face)
+        return cls(bits | (mask << FROZEN_SHIFT) | (key << KEY_SHIFT))
+
+    def face(self, index):
+        """Face of a die, or None if it hasn't been rolled"""
+        return (self >> (FACE_BITS * index)) & FACE_MASK or None
+
+    def faces(self):
+        return tuple(self.face(index) for index in xrange(constants.NUM_DICE))
+
+    def is_frozen(self, index):
+        return bool(self.frozen_mask & (1 << index))
+
+    @property
+    def frozen_mask(self):
+        return (self >> FROZEN_SHIFT) & ALL_FROZEN
+
+    @property
+    def unfrozen_key(self):
+        """Packed face counts of the unfrozen dice, see points.pack_dice"""
+        return self >> KEY_SHIFT
+
+    @property
+    def dice_left(self):
+        return constants.NUM_DICE - _FROZEN_COUNTS[self.frozen_mask]
+
+    @property
+    def all_frozen(self):
+        return self.frozen_mask == ALL_FROZEN
+
+    def freeze(self, indices):
+        """Return a copy with the dice at indices frozen"""
+        mask = self.frozen_mask
+        key = self.unfrozen_key
+        for index in indices:
+            if not mask & (1 << index):
+                mask |= 1 << index
+                key -= _face_key(self.face(index))
+        return self._replace(mask, key)
+
+    def roll(self, faces):
+        """Return a copy with new faces for each unfrozen die, in order"""
+        faces = iter(faces)
+        bits = 0
+        key = 0
+        mask = self.frozen_mask
+        for index in xrange(constants.NUM_DICE):
+            if mask & (1 << index):
+                face = self.face(index)
+            else:
+                face = next(faces)
+                key += _face_key(face)
+            bits |= face << (FACE_BITS * index)
+        return PackedDice(bits | (mask << FROZEN_SHIFT) | (key << KEY_SHIFT))
+
+    def _replace(self, mask, key):
+        faces = self & ((1 << FROZEN_SHIFT) - 1)
+        return PackedDice(faces | (mask << FROZEN_SHIFT) | (key << KEY_SHIFT))
+
+    def __repr__(self):
+        return 'PackedDice({!r}, frozen={!r})'.format(
+            self.faces(),
+            tuple(self.is_frozen(index)
+                  for index in xrange(constants.NUM_DICE)))
@@ -1,83 +1,354 @@
 import collections
+import hashlib
 import itertools
 import operator
+import os
 
+from . import cache
 from . import constants
 from . import utils
 
-# Dice combinations which are unique
-SIMPLE_COMINATIONS = (
-    (collections.Counter((1,)), constants.SINGLE_ONE_POINTS),
-    (collections.Counter((5,)), constants.SINGLE_FIVE_POINTS),
-    (collections.Counter((1, 1, 1)), constants.TRIPLE_ONE_POINTS),
-    (collections.Counter((2, 2, 2)), constants.TRIPLE_TWO_POINTS),
-    (collections.Counter((3, 3, 3)), constants.TRIPLE_THREE_POINTS),
-    (collections.Counter((4, 4, 4)), constants.TRIPLE_FOUR_POINTS),
-    (collections.Counter((5, 5, 5)), constants.TRIPLE_FIVE_POINTS),
-    (collections.Counter((6, 6, 6)), constants.TRIPLE_SIX_POINTS),
-    (collections.Counter((1, 2, 3, 4, 5, 6)), constants.STRAIGHT_POINTS),
-)
-
-# Four of a kind
-QUADRUPLETS = tuple([(collections.Counter((i + 1,) * 4),
-                      constants.QUADS_POINTS)
-                     for i in range(constants.DICE_HIGH_VAL)])
-
-# Five of a kind
-QUINTUPLETS = tuple([(collections.Counter((i + 1,) * 5),
-                      constants.QUINTS_POINTS)
-                     for i in range(constants.DICE_HIGH_VAL)])
-
-# Six of a kind
-SEXTUPLETS = tuple([(collections.Counter((i + 1,) * 6),
-                     constants.SEXTUPS_POINTS)
-                    for i in range(constants.DICE_HIGH_VAL)])
-
 # Helper list of pairs, triplets, and quadruplets
 PAIRS_LIST = [(i + 1,) * 2 for i in range(constants.DICE_HIGH_VAL)]
 TRIPLETS_LIST = [(i + 1,) * 3 for i in range(constants.DICE_HIGH_VAL)]
 QUADRUPLETS_LIST = [(i + 1,) * 4 for i in range(constants.DICE_HIGH_VAL)]
 
-# Three pairs
-THREE_PAIRS = ((collections.Counter((i + j + k)), constants.THREE_PAIRS_POINTS)
-               for i, j, k in
-               itertools.product(PAIRS_LIST, PAIRS_LIST, PAIRS_LIST)
-               if (i != j and i != k and j != k))
-THREE_PAIRS = utils.remove_duplicates(THREE_PAIRS)
+
+def _of_a_kind(size, points):
+    return tuple([(collections.Counter((i + 1,) * size), points)
+                  for i in range(constants.DICE_HIGH_VAL)])
+
+
+def _pattern_groups(rules):
+    """Return each group of scoring patterns valued under a set of rules
+
+    rules is anything with the point values of the constants module as
+    attributes, such as the constants module itself or a RuleSet.
+    """
+    # Dice combinations which are unique
+    simple_combinations = (
+        (collections.Counter((1,)), rules.SINGLE_ONE_POINTS),
+        (collections.Counter((5,)), rules.SINGLE_FIVE_POINTS),
+        (collections.Counter((1, 1, 1)), rules.TRIPLE_ONE_POINTS),
+        (collections.Counter((2, 2, 2)), rules.TRIPLE_TWO_POINTS),
+        (collections.Counter((3, 3, 3)), rules.TRIPLE_THREE_POINTS),
+        (collections.Counter((4, 4, 4)), rules.TRIPLE_FOUR_POINTS),
+        (collections.Counter((5, 5, 5)), rules.TRIPLE_FIVE_POINTS),
+        (collections.Counter((6, 6, 6)), rules.TRIPLE_SIX_POINTS),
+        (collections.Counter((1, 2, 3, 4, 5, 6)), rules.STRAIGHT_POINTS),
+    )
+
+    # Three pairs, each set of faces once
+    three_pairs = tuple((collections.Counter((i + j + k)),
+                         rules.THREE_PAIRS_POINTS)
+                        for i, j, k in itertools.combinations(PAIRS_LIST, 3))
+
+    # Two triplets, each set of faces once
+    two_triplets = tuple((collections.Counter((i + j)),
+                          rules.TWO_TRIPLETS_POINTS)
+                         for i, j in itertools.combinations(TRIPLETS_LIST, 2))
+
+    # Quadruplets and a pair of another face
+    quad_plus_pair = tuple((collections.Counter((i + j)),
+                            rules.QUADS_PAIRS_POINTS)
+                           for i, j in itertools.product(QUADRUPLETS_LIST,
+                                                         PAIRS_LIST)
+                           if i[0] != j[0])
+
+    return (simple_combinations,
+            _of_a_kind(4, rules.QUADS_POINTS),
+            _of_a_kind(5, rules.QUINTS_POINTS),
+            _of_a_kind(6, rules.SEXTUPS_POINTS),
+            three_pairs,
+            two_triplets,
+            quad_plus_pair)
 
 
-# Two triplets
-TWO_TRIPLETS = ((collections.Counter((i + j)), constants.TWO_TRIPLETS_POINTS)
-                for i, j in itertools.product(TRIPLETS_LIST, TRIPLETS_LIST)
-                if i != j)
-TWO_TRIPLETS = utils.remove_duplicates(TWO_TRIPLETS)
+def _sort_patterns(all_points):
+    return sorted(all_points, key=operator.itemgetter(1), reverse=True)
 
 
-# Quadruplets and a pair
-QUAD_PLUS_PAIR = ((collections.Counter((i + j)), constants.QUADS_PAIRS_POINTS)
-                  for i, j in itertools.product(QUADRUPLETS_LIST, PAIRS_LIST)
-                  if all(x not in j for x in i))
-QUAD_PLUS_PAIR = utils.remove_duplicates(QUAD_PLUS_PAIR)
+def build_patterns(rules):
+    """Return every scoring pattern and its value, highest value first"""
+    return _sort_patterns(sum(_pattern_groups(rules), ()))
+
+
+(SIMPLE_COMINATIONS, QUADRUPLETS, QUINTUPLETS, SEXTUPLETS, THREE_PAIRS,
+ TWO_TRIPLETS, QUAD_PLUS_PAIR) = _pattern_groups(constants)
 
 # An unsorted list of all dice rolls and their values
 ALL_POINTS = SIMPLE_COMINATIONS + QUADRUPLETS + QUINTUPLETS + SEXTUPLETS + \
     THREE_PAIRS + TWO_TRIPLETS + QUAD_PLUS_PAIR
 
 # A list of of all dice rolls and their values, sorted by value
-ALL_POINTS_SORTED = sorted(
-    ALL_POINTS, key=operator.itemgetter(1), reverse=True)
+ALL_POINTS_SORTED = _sort_patterns(ALL_POINTS)
 
 
-def score_dice(dice_value_counter, score=0):
-    remaining_dice = dice_value_counter
-    for scoring_values, points in ALL_POINTS_SORTED:
-        if not scoring_values - dice_value_counter:
-            score += points
-            remaining_dice = dice_value_counter - scoring_values
-            break
-    else:
-        return score, remaining_dice
-    if not remaining_dice:
-        return score, None
+# Number of bits used to store the count of a single face in a packed key
+COUNT_BITS = 3
+COUNT_MASK = (1 << COUNT_BITS) - 1
+
+# All valid dice faces, lowest first
+FACES = tuple(range(constants.DICE_LOW_VAL, constants.DICE_HIGH_VAL + 1))
+
+
+def pack_counts(counts):
+    """Pack a sequence of face counts (lowest face first) into an int key"""
+    key = 0
+    for index, count in enumerate(counts):
+        key |= count << (COUNT_BITS * index)
+    return key
+
+
+def pack_dice(die_values):
+    """Pack an iterable of dice values into an int key of face counts
+
+    Raises a DieException for an unrolled (None) die.
+    """
+    key = 0
+    for value in die_values:
+        if value is None:
+            raise utils.DieException("Cannot pack an unrolled die")
+        key += 1 << (COUNT_BITS * (value - constants.DICE_LOW_VAL))
+    return key
+
+
+def unpack_counts(key):
+    """Unpack an int key into a tuple of face counts, lowest face first"""
+    return tuple((key >> (COUNT_BITS * index)) & COUNT_MASK
+                 for index in xrange(len(FACES)))
+
+
+def counter_to_key(dice_value_counter):
+    """Pack a Counter of dice values, or return None if it can't be packed"""
+    key = 0
+    for value, count in dice_value_counter.items():
+        if value not in FACES or not 0 <= count <= COUNT_MASK:
+            return None
+        key += count << (COUNT_BITS * (value - constants.DICE_LOW_VAL))
+    return key
+
+
+def key_to_counter(key):
+    """Unpack an int key into a Counter of dice values"""
+    return collections.Counter(
+        dict((face, count)
+             for face, count in zip(FACES, unpack_counts(key)) if count))
+
+
+def _rank(score, num_left):
+    """Order decompositions, best last
+
+    The higher score wins, then the one leaving fewer dice.
+    """
+    return (score, -num_left)
+
+
+def _packed_patterns(patterns):
+    patterns = [(pack_dice(scoring_values.elements()), points)
+                for scoring_values, points in patterns]
+    return [(unpack_counts(pattern_key), pattern_key, points)
+            for pattern_key, points in patterns]
+
+
+def build_score_table(patterns):
+    """Score every multiset of up to NUM_DICE dice against patterns
+
+    Returns a dict of (score, packed leftover dice) keyed by packed key,
+    holding the best of every way to split the dice into patterns.
+    """
+    # Every split takes some pattern and splits the rest, so building
+    # smallest multisets first makes each split of the rest a lookup of an
+    # entry that's already in the table
+    patterns = _packed_patterns(patterns)
+    table = {}
+    sizes = {}
+    for num_dice in xrange(constants.NUM_DICE + 1):
+        for dice in itertools.combinations_with_replacement(FACES, num_dice):
+            key = pack_dice(dice)
+            counts = unpack_counts(key)
+            best = (0, key)
+            best_rank = _rank(0, num_dice)
+            for pattern_counts, pattern_key, points in patterns:
+                if all(needed <= available for needed, available
+                       in zip(pattern_counts, counts)):
+                    score, remaining_key = table[key - pattern_key]
+                    rank = _rank(score + points, sizes[remaining_key])
+                    if rank > best_rank:
+                        best = (score + points, remaining_key)
+                        best_rank = rank
+            table[key] = best
+            sizes[key] = num_dice
+    return table
+
+
+def build_full_score_table(patterns):
+    """Score every multiset of up to NUM_DICE dice that patterns use up
+
+    Returns a dict of the best score of the splits leaving no dice, keyed
+    by packed key, for every multiset that has one. This is what a
+    selection of dice scores when frozen, since every frozen die must
+    score, even where a split leaving dice would score more.
+    """
+    patterns = _packed_patterns(patterns)
+    table = {0: 0}
+    for num_dice in xrange(1, constants.NUM_DICE + 1):
+        for dice in itertools.combinations_with_replacement(FACES, num_dice):
+            key = pack_dice(dice)
+            counts = unpack_counts(key)
+            best = None
+            for pattern_counts, pattern_key, points in patterns:
+                if all(needed <= available for needed, available
+                       in zip(pattern_counts, counts)):
+                    rest = table.get(key - pattern_key)
+                    if rest is not None and (best is None or
+                                             rest + points > best):
+                        best = rest + points
+            if best is not None:
+                table[key] = best
+    return table
+
+
+# Bumped whenever build_score_table changes what it returns, so a table
+# precompiled by an older version is never loaded
+TABLE_VERSION = 2
+
+# The precompiled score table for the rules in constants, written by
+# write_score_table
+TABLE_MODULE = 'score_table_data'
+
+
+def patterns_digest(patterns):
+    """Return a digest of everything the score table of patterns depends on"""
+    description = repr((TABLE_VERSION, constants.NUM_DICE, COUNT_BITS,
+                        [(sorted(scoring_values.elements()), points)
+                         for scoring_values, points in patterns]))
+    return hashlib.sha256(description).hexdigest()
+
+
+def _load_score_tables(patterns):
+    """Return the precompiled score and full score tables, building them if
+    they're missing or were built for other patterns"""
+    try:
+        precompiled = __import__(TABLE_MODULE, globals(), level=1)
+    except ImportError:
+        precompiled = None
+    if (precompiled is None or
+            precompiled.DIGEST != patterns_digest(patterns)):
+        return build_score_table(patterns), build_full_score_table(patterns)
+    return precompiled.SCORE_TABLE, precompiled.FULL_SCORE_TABLE
+
+
+def _table_lines(table):
+    lines = ['    ']
+    for key in sorted(table):
+        entry = '{}: {!r},'.format(key, table[key])
+        if len(lines[-1]) + len(entry) >= 79:
+            lines.append('    ')
+        elif lines[-1].strip():
+            lines[-1] += ' '
+        lines[-1] += entry
+    return '\n'.join(lines)
+
+
+def write_score_table(path=None):
+    """Write the precompiled score tables as a Python module
+
+    Run python -m farkelbot.points after changing the scoring rules in
+    constants or the way the table is built.
+    """
+    if path is None:
+        path = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                            TABLE_MODULE + '.py')
+    with open(path, 'w') as module_file:
+        module_file.write(
+            '# Generated by python -m farkelbot.points, do not edit\n'
+            '# The score tables for the rules in constants, see '
+            'points.SCORE_TABLE\n'
+            "DIGEST = '{}'\n\n"
+            'SCORE_TABLE = {{\n{}\n}}\n\n'
+            'FULL_SCORE_TABLE = {{\n{}\n}}\n'.format(
+                patterns_digest(ALL_POINTS_SORTED),
+                _table_lines(build_score_table(ALL_POINTS_SORTED)),
+                _table_lines(build_full_score_table(ALL_POINTS_SORTED))))
+
+
+# Score and packed leftover dice for every multiset of up to NUM_DICE dice,
+# keyed by packed face counts, and the score of every multiset that scores
+# with no dice left, see build_full_score_table
+SCORE_TABLE, FULL_SCORE_TABLE = _load_score_tables(ALL_POINTS_SORTED)
+
+
+def score_counts(key):
+    """Return the score and packed leftover dice for a packed key"""
+    return SCORE_TABLE[key]
+
+
+# Results of score_dice for counters SCORE_TABLE can't hold, with more
+# than NUM_DICE dice or faces a die can't show, keyed by dice_key
+SCORE_CACHE = cache.BoundedCache()
+
+_MISSING = object()
+
+
+def configure_score_cache(maxsize=4096, eviction=cache.LRU):
+    """Replace the score_dice cache with an empty one"""
+    global SCORE_CACHE
+    SCORE_CACHE = cache.BoundedCache(maxsize, eviction)
+    return SCORE_CACHE
+
+
+def dice_key(dice_value_counter):
+    """Return a canonical hashable key for a Counter of dice values"""
+    return tuple(sorted((value, count)
+                        for value, count in dice_value_counter.items()
+                        if count > 0))
+
+
+def _score_key(key):
+    """Return the score and leftover dice key for a dice key"""
+    result = SCORE_CACHE.get(key, _MISSING)
+    if result is not _MISSING:
+        return result
+    table_key = counter_to_key(dict(key))
+    if table_key in SCORE_TABLE:
+        points, remaining_key = SCORE_TABLE[table_key]
+        result = (points, dice_key(key_to_counter(remaining_key)))
     else:
-        return score_dice(remaining_dice, score)
+        # More dice than the table holds, try every split and cache the
+        # splits of the rest too
+        dice_value_counter = collections.Counter(dict(key))
+        result = (0, key)
+        best_rank = _rank(0, sum(dice_value_counter.values()))
+        for scoring_values, points in ALL_POINTS_SORTED:
+            if not scoring_values - dice_value_counter:
+                tail_points, remaining = _score_key(
+                    dice_key(dice_value_counter - scoring_values))
+                rank = _rank(points + tail_points,
+                             sum(count for _, count in remaining))
+                if rank > best_rank:
+                    result = (points + tail_points, remaining)
+                    best_rank = rank
+    SCORE_CACHE.put(key, result)
+    return result
+
+
+def score_dice(dice_value_counter, score=0):
+    table_key = counter_to_key(dice_value_counter)
+    if table_key in SCORE_TABLE:
+        points, remaining_key = SCORE_TABLE[table_key]
+        if not points:
+            return score, dice_value_counter
+        if not remaining_key:
+            return score + points, None
+        return score + points, key_to_counter(remaining_key)
+    points, remaining = _score_key(dice_key(dice_value_counter))
+    if not points:
+        return score, dice_value_counter
+    if not remaining:
+        return score + points, None
+    return score + points, collections.Counter(dict(remaining))
+
+
+if __name__ == '__main__':
+    write_score_table()
@@ -0,0 +1,139 @@
+import hashlib
+import itertools
+import json
+import math
+import os
+import tempfile
+
+from . import constants
+from . import points
+
+# Bump when the layout of the cache file changes
+CACHE_VERSION = 1
+
+# Where tables are cached on disk unless a directory is given. Unset, they
+# are only kept in memory.
+DEFAULT_CACHE_DIR = os.environ.get('FARKELBOT_CACHE_DIR')
+
+# Tables loaded by this process, keyed by cache directory or None
+_tables = {}
+
+
+def rules_digest():
+    """Digest of the scoring rules the tables are computed from"""
+    rules = [constants.NUM_DICE, constants.DICE_LOW_VAL,
+             constants.DICE_HIGH_VAL,
+             sorted((sorted(scoring_values.items()), value)
+                    for scoring_values, value in points.ALL_POINTS_SORTED)]
+    return hashlib.sha256(json.dumps(rules)).hexdigest()
+
+
+def _ways(key):
+    """Number of ordered rolls that make up a packed multiset"""
+    counts = points.unpack_counts(key)
+    ways = math.factorial(sum(counts))
+    for count in counts:
+        ways //= math.factorial(count)
+    return ways
+
+
+def _compute_tables():
+    weights = {}
+    scores = {}
+    for num_dice in xrange(1, constants.NUM_DICE + 1):
+        weights[num_dice] = {}
+        scores[num_dice] = {}
+        for dice in itertools.combinations_with_replacement(points.FACES,
+                                                            num_dice):
+            key = points.pack_dice(dice)
+            ways = _ways(key)
+            score, _ = points.score_counts(key)
+            weights[num_dice][key] = ways
+            scores[num_dice][score] = scores[num_dice].get(score, 0) + ways
+    return {'weights': weights, 'scores': scores}
+
+
+def _cache_path(cache_dir):
+    return os.path.join(cache_dir, 'probabilities-{}.json'.format(
+        rules_digest()[:16]))
+
+
+def _read_cache(path):
+    try:
+        with open(path) as cache_file:
+            cached = json.load(cache_file)
+    except (IOError, OSError, ValueError):
+        return None
+    if (cached.get('version') != CACHE_VERSION or
+            cached.get('rules') != rules_digest()):
+        return None
+    # JSON keys are strings
+    return dict((table, dict(
+        (int(num_dice), dict((int(key), ways) for key, ways in rows.items()))
+        for num_dice, rows in cached[table].items()))
+        for table in ('weights', 'scores'))
+
+
+def _write_cache(path, tables):
+    try:
+        if not os.path.isdir(os.path.dirname(path)):
+            os.makedirs(os.path.dirname(path))
+        handle, temp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+        with os.fdopen(handle, 'w') as cache_file:
+            json.dump(dict(tables, version=CACHE_VERSION,
+                           rules=rules_digest()), cache_file)
+        os.rename(temp_path, path)
+    except (IOError, OSError):
+        # Caching is only an optimization
+        pass
+
+
+def load_tables(cache_dir=None):
+    """Return the outcome tables, computing and caching them on first use
+
+    'weights' maps number of dice to the number of ordered rolls making up
+    each packed multiset, and 'scores' maps number of dice to the number of
+    ordered rolls with each best score. Tables are only read from and
+    written to disk with a cache_dir or FARKELBOT_CACHE_DIR.
+    """
+    cache_dir = cache_dir or DEFAULT_CACHE_DIR
+    if cache_dir not in _tables:
+        if cache_dir is None:
+            tables = _compute_tables()
+        else:
+            path = _cache_path(cache_dir)
+            tables = _read_cache(path)
+            if tables is None:
+                tables = _compute_tables()
+                _write_cache(path, tables)
+        _tables[cache_dir] = tables
+    return _tables[cache_dir]
+
+
+def _total(num_dice):
+    return float(len(points.FACES) ** num_dice)
+
+
+def roll_distribution(num_dice, cache_dir=None):
+    """Return (packed roll, probability) for each multiset of num_dice"""
+    total = _total(num_dice)
+    weights = load_tables(cache_dir)['weights'][num_dice]
+    return sorted((key, ways / total) for key, ways in weights.items())
+
+
+def score_distribution(num_dice, cache_dir=None):
+    """Return the probability of each best score from rolling num_dice"""
+    total = _total(num_dice)
+    scores = load_tables(cache_dir)['scores'][num_dice]
+    return dict((score, ways / total) for score, ways in scores.items())
+
+
+def farkel_probability(num_dice, cache_dir=None):
+    """Return the probability that rolling num_dice doesn't score"""
+    return score_distribution(num_dice, cache_dir).get(0, 0.0)
+
+
+def expected_score(num_dice, cache_dir=None):
+    """Return the expected best score from rolling num_dice"""
+    return sum(score * probability for score, probability
+               in score_distribution(num_dice, cache_dir).items())
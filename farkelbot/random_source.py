@@ -0,0 +1,118 @@
+import random
+
+from . import constants
+from . import utils
+
+# Number of distinct faces on a die
+NUM_FACES = constants.DICE_HIGH_VAL - constants.DICE_LOW_VAL + 1
+
+
+class RandomSource(object):
+    """Dice rolls from a random.Random generator
+
+    roll() draws faces one at a time with randint, so a seeded source rolls
+    the same faces as seeding the global random module did.
+    """
+
+    def __init__(self, seed=None, generator=None):
+        self.generator = generator or random.Random(seed)
+
+    def randrange(self, stop):
+        return self.generator.randrange(stop)
+
+    def randint(self, low, high):
+        return self.generator.randint(low, high)
+
+    def roll(self, count):
+        """Return a list of count rolled faces"""
+        return [self.generator.randint(constants.DICE_LOW_VAL,
+                                       constants.DICE_HIGH_VAL)
+                for _ in xrange(count)]
+
+
+class FastRandomSource(RandomSource):
+    """Dice rolls drawn in bulk, a single random integer per roll
+
+    A uniform integer below NUM_FACES ** count has a uniform, independent
+    face in each of its base NUM_FACES digits.
+    """
+
+    def roll(self, count):
+        draw = self.generator.randrange(NUM_FACES ** count)
+        faces = []
+        for _ in xrange(count):
+            draw, face = divmod(draw, NUM_FACES)
+            faces.append(face + constants.DICE_LOW_VAL)
+        return faces
+
+
+class NumpyRandomSource(RandomSource):
+    """Dice rolls drawn in bulk from a NumPy RandomState"""
+
+    def __init__(self, seed=None, generator=None):
+        if generator is None:
+            import numpy
+            generator = numpy.random.RandomState(seed)
+        self.generator = generator
+
+    def randrange(self, stop):
+        return int(self.generator.randint(0, stop))
+
+    def randint(self, low, high):
+        return int(self.generator.randint(low, high + 1))
+
+    def roll(self, count):
+        return self.generator.randint(constants.DICE_LOW_VAL,
+                                      constants.DICE_HIGH_VAL + 1,
+                                      size=count).tolist()
+
+
+class RecordingSource(object):
+    """Records every draw from another source so it can be replayed"""
+
+    def __init__(self, source):
+        self.source = source
+        self.faces = []
+        self.choices = []
+
+    def randrange(self, stop):
+        value = self.source.randrange(stop)
+        self.choices.append(value)
+        return value
+
+    def randint(self, low, high):
+        value = self.source.randint(low, high)
+        self.faces.append(value)
+        return value
+
+    def roll(self, count):
+        faces = self.source.roll(count)
+        self.faces.extend(faces)
+        return faces
+
+
+class ReplaySource(object):
+    """Replays the faces and choices, e.g. of who starts, of a recording"""
+
+    def __init__(self, faces, choices=()):
+        self.faces = list(faces)
+        self.choices = list(choices)
+        self.position = 0
+        self.choice_position = 0
+
+    def randrange(self, stop):
+        if self.choice_position >= len(self.choices):
+            raise utils.DieException("Ran out of recorded choices")
+        value = self.choices[self.choice_position]
+        self.choice_position += 1
+        return value
+
+    def randint(self, low, high):
+        return self.roll(1)[0]
+
+    def roll(self, count):
+        if self.position + count > len(self.faces):
+            raise utils.DieException("Ran out of recorded rolls")
+        faces = self.faces[self.position:self.position + count]
+        self.position += count
+        return faces
@@ -0,0 +1,407 @@
+"""Self-play training of a value function for games with any number of
+players
+
+Exact solvers stop at two players, so this learns instead. A small neural
+network scores positions from the point of view of one player, as the
+probability of winning from there. RLStrategy makes every decision by
+comparing the positions each choice leads to, banking against rolling on
+or one keep against another, and exploring at random some of the time.
+
+Worker processes play games against themselves and write the positions
+they chose, labelled with whether that player went on to win, straight
+into a ReplayBuffer in shared memory. The network's weights are shared the
+same way, so only seeds and counts pass through the pool's pipes. Between
+rounds of self-play the learner trains on minibatches sampled from the
+buffer, and every so often saves a checkpoint and plays it against
+baseline bots.
+
+    history = rl.train('checkpoints', iterations=50)
+    bot = rl.RLStrategy(rl.ValueFunction.load(history[-1]['checkpoint']))
+"""
+import multiprocessing
+import os
+
+import numpy as np
+
+from . import constants
+from . import engine
+from . import game
+from . import keeps
+from . import random_source
+from . import ruleset
+from . import strategy
+from . import tournament
+
+# Features of a position, from the point of view of the player deciding,
+# with points as fractions of the win condition:
+#   banked score, turn points and their total, dice left to roll, whether
+#   the player has qualified, farkels towards the limit, whether the turn
+#   is over, points and dice the next player could inherit, the best and
+#   mean opponent scores, the fraction of opponents qualified, the number
+#   of opponents, whether it's the last turn and by how much the player
+#   beats the score to beat if so
+FEATURES = ('score', 'turn_points', 'total', 'dice_left', 'qualified',
+            'farkels', 'turn_over', 'left_points', 'left_dice',
+            'best_opponent', 'mean_opponent', 'opponents_qualified',
+            'opponents', 'last_turn', 'lead_to_beat')
+NUM_FEATURES = len(FEATURES)
+
+# Most players a table is expected to seat, to scale the number of opponents
+MAX_PLAYERS = 8
+
+# Bump when the layout of saved checkpoints changes
+CHECKPOINT_VERSION = 2
+
+
+def _sigmoid(values):
+    return 1.0 / (1.0 + np.exp(-np.clip(values, -30, 30)))
+
+
+class ValueFunction(object):
+    """A one hidden layer network giving the probability of winning
+
+    Every weight lives in the flat params array, which can be a view of
+    shared memory so worker processes see the learner's updates.
+    """
+
+    def __init__(self, hidden=32, params=None, seed=0):
+        self.hidden = hidden
+        if params is None:
+            params = np.zeros(self.num_params(hidden))
+            rng = np.random.RandomState(seed)
+            params[:NUM_FEATURES * hidden] = rng.normal(
+                0, 1 / np.sqrt(NUM_FEATURES), NUM_FEATURES * hidden)
+            params[-hidden - 1:-1] = rng.normal(0, 1 / np.sqrt(hidden),
+                                                hidden)
+        self.params = params
+        self._velocity = np.zeros_like(params)
+
+    @staticmethod
+    def num_params(hidden):
+        return NUM_FEATURES * hidden + hidden + hidden + 1
+
+    def _layers(self, params):
+        hidden = self.hidden
+        split = NUM_FEATURES * hidden
+        return (params[:split].reshape(NUM_FEATURES, hidden),
+                params[split:split + hidden],
+                params[split + hidden:split + 2 * hidden],
+                params[-1:])
+
+    def predict(self, features):
+        """Win probabilities for a 2d array of feature rows"""
+        weights, biases, output_weights, output_bias = self._layers(
+            self.params)
+        activations = np.tanh(np.dot(features, weights) + biases)
+        return _sigmoid(np.dot(activations, output_weights) + output_bias)
+
+    def train(self, features, outcomes, learning_rate=0.05, momentum=0.9):
+        """Take one gradient step on a minibatch, returning its log loss"""
+        weights, biases, output_weights, output_bias = self._layers(
+            self.params)
+        activations = np.tanh(np.dot(features, weights) + biases)
+        predicted = _sigmoid(np.dot(activations, output_weights) +
+                             output_bias)
+        # Gradient of the mean log loss through the sigmoid output
+        error = (predicted - outcomes) / len(outcomes)
+        gradient = np.zeros_like(self.params)
+        (weight_gradient, bias_gradient, output_weight_gradient,
+         output_bias_gradient) = self._layers(gradient)
+        output_weight_gradient[:] = np.dot(activations.T, error)
+        output_bias_gradient[:] = error.sum()
+        hidden_error = np.outer(error, output_weights) * (1 - activations ** 2)
+        weight_gradient[:] = np.dot(features.T, hidden_error)
+        bias_gradient[:] = hidden_error.sum(axis=0)
+        self._velocity *= momentum
+        self._velocity -= learning_rate * gradient
+        self.params += self._velocity
+        predicted = np.clip(predicted, 1e-7, 1 - 1e-7)
+        return float(-np.mean(outcomes * np.log(predicted) +
+                              (1 - outcomes) * np.log(1 - predicted)))
+
+    def save(self, path):
+        with open(path, 'wb') as checkpoint:
+            np.savez(checkpoint, version=CHECKPOINT_VERSION,
+                     hidden=self.hidden, params=self.params)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as checkpoint:
+            if int(checkpoint['version']) != CHECKPOINT_VERSION:
+                raise ValueError("Unknown checkpoint version in {}"
+                                 .format(path))
+            return cls(int(checkpoint['hidden']),
+                       np.array(checkpoint['params']))
+
+
+class ReplayBuffer(object):
+    """A ring of labelled positions in shared memory
+
+    Built before the worker processes are forked, which then write to the
+    same memory. Each row is a position's features followed by its
+    outcome, 1 if the player won and 0 otherwise.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self._raw = multiprocessing.RawArray(
+            'd', capacity * (NUM_FEATURES + 1))
+        # Rows ever written, so the next one goes at written % capacity
+        self._written = multiprocessing.Value('l', 0)
+        self._rows = None
+
+    @property
+    def rows(self):
+        # Made lazily, so each process gets a view of its own
+        if self._rows is None:
+            self._rows = np.frombuffer(self._raw).reshape(
+                self.capacity, NUM_FEATURES + 1)
+        return self._rows
+
+    def __len__(self):
+        return min(self._written.value, self.capacity)
+
+    def add(self, features, outcomes):
+        """Write rows of features and outcomes, overwriting the oldest"""
+        count = len(outcomes)
+        with self._written.get_lock():
+            start = self._written.value
+            self._written.value += count
+        slots = np.arange(start, start + count) % self.capacity
+        self.rows[slots, :NUM_FEATURES] = features
+        self.rows[slots, NUM_FEATURES] = outcomes
+
+    def sample(self, size, rng):
+        """Return features and outcomes of size random rows"""
+        rows = self.rows[rng.randint(0, len(self), size)]
+        return rows[:, :NUM_FEATURES], rows[:, NUM_FEATURES]
+
+
+def features(game, player, score, turn_points, dice_left, turn_over=False,
+             left_points=0, left_dice=0):
+    """Feature row of a position player could be in
+
+    score, turn_points and dice_left are the player's after a decision,
+    and turn_over is True once they bank. left_points and left_dice are
+    what the next player could inherit.
+    """
+    opponents = [other for other in game.players if other is not player]
+    opponent_scores = [other.score for other in opponents] or [0]
+    total = score + turn_points
+    scale = float(game.rules.WIN_CONDITION)
+    row = np.empty(NUM_FEATURES)
+    row[:] = (
+        score / scale, turn_points / scale, total / scale,
+        float(dice_left) / constants.NUM_DICE, player.qualified,
+        float(player.farkel_count) / game.rules.FARKEL_LIMIT, turn_over,
+        left_points / scale, float(left_dice) / constants.NUM_DICE,
+        max(opponent_scores) / scale,
+        float(sum(opponent_scores)) / len(opponent_scores) / scale,
+        float(sum(other.qualified for other in opponents)) /
+        max(1, len(opponents)),
+        len(opponents) / float(MAX_PLAYERS - 1), game.last_turn,
+        (total - game.score_to_beat) / scale if game.last_turn else 0.0)
+    return row
+
+
+def _next_player(game, player):
+    return game.players[(game.players.index(player) + 1) % game.num_players]
+
+
+class RLStrategy(strategy.Strategy):
+    """Picks whichever choice leads to the position a ValueFunction likes
+    best
+
+    With probability epsilon a choice is made at random instead. Every
+    chosen position is kept in positions until the trainer takes them.
+    """
+
+    def __init__(self, value_function, epsilon=0.0, rng=None):
+        self.value_function = value_function
+        self.epsilon = epsilon
+        self.rng = rng or np.random.RandomState()
+        self.positions = []
+
+    def _choose(self, rows):
+        rows = np.array(rows)
+        if self.epsilon and self.rng.random_sample() < self.epsilon:
+            choice = self.rng.randint(len(rows))
+        else:
+            choice = int(np.argmax(self.value_function.predict(rows)))
+        self.positions.append(rows[choice])
+        return choice
+
+    def choose_inherit(self, game, player, last_player):
+        diceset = last_player.diceset
+        return self._choose([
+            features(game, player, player.score, 0, constants.NUM_DICE),
+            features(game, player, player.score, diceset.points,
+                     diceset.dice_left)]) == 1
+
+    def choose_freeze(self, game, player):
+        diceset = player.diceset
+        options = keeps.legal_keeps(diceset.unfrozen_key, game.rules)
+        choice = self._choose([
+            features(game, player, player.score,
+                     diceset.points + keep.points,
+                     keep.dice_left or constants.NUM_DICE)
+            for keep in options])
+        return keeps.keep_indices(diceset.dice, options[choice].key)
+
+    def choose_bank(self, game, player):
+        diceset = player.diceset
+        following = _next_player(game, player)
+        # What the engine would offer the next player once this one banks
+        inheritable = following is not player and engine.can_inherit(
+            following, player, diceset.points,
+            player.score + diceset.points)
+        return self._choose([
+            features(game, player, player.score, diceset.points,
+                     diceset.dice_left),
+            features(game, player, player.score + diceset.points, 0,
+                     constants.NUM_DICE, turn_over=True,
+                     left_points=diceset.points if inheritable else 0,
+                     left_dice=diceset.dice_left if inheritable else 0),
+        ]) == 1
+
+
+def play_games(value_function, num_games, num_players, epsilon, seed,
+               rules=None):
+    """Play self-play games, returning the chosen positions and outcomes"""
+    rng = random_source.RandomSource(seed)
+    explore = np.random.RandomState(
+        tournament.shard_seed(seed, 'explore') % 2 ** 32)
+    rows = []
+    outcomes = []
+    for _ in xrange(num_games):
+        bots = [RLStrategy(value_function, epsilon, explore)
+                for _ in xrange(num_players)]
+        g = game.Game(num_players, strategies=bots, rng=rng, rules=rules)
+        winner = g.start()
+        for player, bot in zip(g.players, bots):
+            rows.extend(bot.positions)
+            outcomes.extend([float(player is winner)] * len(bot.positions))
+    return (np.array(rows).reshape(-1, NUM_FEATURES),
+            np.array(outcomes))
+
+
+# The shared buffer and weights, and the rules, of the current worker
+_worker = None
+
+
+def _init_worker(buffer, shared_params, hidden, rules):
+    global _worker
+    _worker = (buffer, ValueFunction(hidden, np.frombuffer(shared_params)),
+               rules)
+
+
+def self_play_shard(task):
+    """Play a shard of games with the shared weights into the shared buffer
+
+    Returns how many games were played and positions recorded.
+    """
+    num_games, num_players, epsilon, seed = task
+    buffer, value_function, rules = _worker
+    rows, outcomes = play_games(value_function, num_games, num_players,
+                                epsilon, seed, rules)
+    buffer.add(rows, outcomes)
+    return num_games, len(outcomes)
+
+
+def win_rate(value_function, num_players=2, num_games=200, seed=0,
+             opponent=strategy.ThresholdStrategy, rules=None):
+    """Play a greedy RLStrategy against opponent bots, rotating its seat
+
+    Returns the wins, games and a confidence interval of the win rate,
+    which is 1 / num_players for an even match.
+    """
+    rng = random_source.RandomSource(seed)
+    bot = RLStrategy(value_function)
+    wins = 0
+    for game_index in xrange(num_games):
+        seat = game_index % num_players
+        bots = [opponent() for _ in xrange(num_players)]
+        bots[seat] = bot
+        g = game.Game(num_players, strategies=bots, rng=rng, rules=rules)
+        wins += g.start() is g.players[seat]
+        del bot.positions[:]
+    low, high = tournament.wilson_interval(wins, num_games)
+    return {'wins': wins, 'games': num_games,
+            'win_rate': float(wins) / num_games, 'low': low, 'high': high}
+
+
+def _checkpoint_path(directory, iteration):
+    return os.path.join(directory, 'value-{:05d}.npz'.format(iteration))
+
+
+def train(directory, iterations=20, games_per_iteration=64,
+          num_players=(2, 3, 4), hidden=32, epsilon=0.1,
+          buffer_size=200000, batch_size=256, steps_per_iteration=200,
+          learning_rate=0.05, checkpoint_every=5, eval_games=200,
+          processes=None, master_seed=0, shard_size=8, rules=None):
+    """Train a ValueFunction by self-play, saving checkpoints to directory
+
+    Each iteration plays games_per_iteration games, cycling through the
+    table sizes in num_players, in shards across worker processes, then
+    takes steps_per_iteration training steps on the replay buffer. Every
+    checkpoint_every iterations, and after the last, the weights are saved
+    and played against ThresholdStrategy bots at each table size. Returns
+    a dict for each checkpoint with its path, the recent training loss and
+    win rates by table size.
+    """
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+    rules = rules or ruleset.DEFAULT
+    buffer = ReplayBuffer(buffer_size)
+    shared_params = multiprocessing.RawArray(
+        'd', ValueFunction.num_params(hidden))
+    learner = ValueFunction(hidden, np.frombuffer(shared_params))
+    learner.params[:] = ValueFunction(hidden,
+                                      seed=master_seed % 2 ** 32).params
+    sample_rng = np.random.RandomState(
+        tournament.shard_seed(master_seed, 'sample') % 2 ** 32)
+    if processes == 1:
+        _init_worker(buffer, shared_params, hidden, rules)
+        pool = None
+    else:
+        pool = multiprocessing.Pool(processes, _init_worker,
+                                    (buffer, shared_params, hidden, rules))
+    history = []
+    losses = []
+    try:
+        for iteration in xrange(1, iterations + 1):
+            tasks = [(min(shard_size, games_per_iteration - start),
+                      num_players[shard % len(num_players)], epsilon,
+                      tournament.shard_seed(master_seed, iteration, shard))
+                     for shard, start in enumerate(
+                         xrange(0, games_per_iteration, shard_size))]
+            # Workers only read the weights while the learner waits here
+            if pool is None:
+                map(self_play_shard, tasks)
+            else:
+                pool.map(self_play_shard, tasks, chunksize=1)
+            for _ in xrange(steps_per_iteration):
+                losses.append(learner.train(
+                    *buffer.sample(batch_size, sample_rng),
+                    learning_rate=learning_rate))
+            if iteration % checkpoint_every and iteration != iterations:
+                continue
+            path = _checkpoint_path(directory, iteration)
+            learner.save(path)
+            history.append({
+                'iteration': iteration,
+                'checkpoint': path,
+                'positions': len(buffer),
+                'loss': float(np.mean(losses[-steps_per_iteration:])),
+                'win_rates': dict(
+                    (players, win_rate(learner, players, eval_games,
+                                       tournament.shard_seed(
+                                           master_seed, 'eval', players),
+                                       rules=rules))
+                    for players in sorted(set(num_players))),
+            })
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+    return history
@@ -0,0 +1,106 @@
+import hashlib
+import json
+
+from . import constants
+from . import points
+
+# Rules that can be changed, each defaulting to its value in constants
+RULE_NAMES = (
+    'FARKEL_LIMIT',
+    'SINGLE_ONE_POINTS',
+    'SINGLE_FIVE_POINTS',
+    'TRIPLE_ONE_POINTS',
+    'TRIPLE_TWO_POINTS',
+    'TRIPLE_THREE_POINTS',
+    'TRIPLE_FOUR_POINTS',
+    'TRIPLE_FIVE_POINTS',
+    'TRIPLE_SIX_POINTS',
+    'QUADS_POINTS',
+    'QUINTS_POINTS',
+    'SEXTUPS_POINTS',
+    'STRAIGHT_POINTS',
+    'QUADS_PAIRS_POINTS',
+    'THREE_PAIRS_POINTS',
+    'TWO_TRIPLETS_POINTS',
+    'FARKEL_POINTS',
+    'QUALIFICATION_POINTS',
+    'WIN_CONDITION',
+)
+
+# Compiled scoring tables shared by equal rule sets, keyed by digest
+_score_tables = {}
+_full_score_tables = {}
+
+
+class RuleSet(object):
+    """A variant of the house rules
+
+    Rules are attributes named like those in constants, so a RuleSet can be
+    used wherever the constants module is read. The dice themselves are the
+    same in every variant. The scoring table is compiled on first use and
+    shared by every RuleSet with the same rules.
+    """
+    DICE_LOW_VAL = constants.DICE_LOW_VAL
+    DICE_HIGH_VAL = constants.DICE_HIGH_VAL
+    NUM_DICE = constants.NUM_DICE
+
+    def __init__(self, **rules):
+        unknown = set(rules) - set(RULE_NAMES)
+        if unknown:
+            raise ValueError("Unknown rules: {}".format(
+                ', '.join(sorted(unknown))))
+        for name in RULE_NAMES:
+            setattr(self, name, rules.get(name, getattr(constants, name)))
+        self.digest = hashlib.sha256(
+            json.dumps(self.as_dict(), sort_keys=True)).hexdigest()
+        self._score_table = None
+        self._full_score_table = None
+
+    def as_dict(self):
+        return dict((name, getattr(self, name)) for name in RULE_NAMES)
+
+    def __eq__(self, other):
+        return isinstance(other, RuleSet) and self.digest == other.digest
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash(self.digest)
+
+    def __repr__(self):
+        changed = ', '.join(
+            '{}={!r}'.format(name, getattr(self, name))
+            for name in RULE_NAMES
+            if getattr(self, name) != getattr(constants, name))
+        return 'RuleSet({})'.format(changed)
+
+    @property
+    def score_table(self):
+        """Score and packed leftover dice keyed by packed key"""
+        if self._score_table is None:
+            if self.digest not in _score_tables:
+                _score_tables[self.digest] = points.build_score_table(
+                    points.build_patterns(self))
+            self._score_table = _score_tables[self.digest]
+        return self._score_table
+
+    @property
+    def full_score_table(self):
+        """Score of every packed key that scores with no dice left"""
+        if self._full_score_table is None:
+            if self.digest not in _full_score_tables:
+                _full_score_tables[self.digest] = (
+                    points.build_full_score_table(points.build_patterns(self)))
+            self._full_score_table = _full_score_tables[self.digest]
+        return self._full_score_table
+
+    def score_counts(self, key):
+        """Return the score and packed leftover dice for a packed key"""
+        return self.score_table[key]
+
+
+# The rules in constants
+DEFAULT = RuleSet()
+_score_tables[DEFAULT.digest] = points.SCORE_TABLE
+_full_score_tables[DEFAULT.digest] = points.FULL_SCORE_TABLE
@@ -0,0 +1,300 @@
+# Generated by python -m farkelbot.points, do not edit
+# The score tables for the rules in constants, see points.SCORE_TABLE
+DIGEST = '45ac9aa4ab382f38839f199af1df965d1c9873c3fda1e84e5e9a51aa5c888cf7'
+
+SCORE_TABLE = {
+    0: (0, 0), 1: (100, 0), 2: (200, 0), 3: (300, 0), 4: (1000, 0),
+    5: (2000, 0), 6: (3000, 0), 8: (0, 8), 9: (100, 8), 10: (200, 8),
+    11: (300, 8), 12: (1000, 8), 13: (2000, 8), 16: (0, 16), 17: (100, 16),
+    18: (200, 16), 19: (300, 16), 20: (1500, 0), 24: (200, 0), 25: (300, 0),
+    26: (400, 0), 27: (2500, 0), 32: (1000, 0), 33: (1100, 0), 34: (1500, 0),
+    40: (2000, 0), 41: (2100, 0), 48: (3000, 0), 64: (0, 64), 65: (100, 64),
+    66: (200, 64), 67: (300, 64), 68: (1000, 64), 69: (2000, 64), 72: (0, 72),
+    73: (100, 72), 74: (200, 72), 75: (300, 72), 76: (1000, 72), 80: (0, 80),
+    81: (100, 80), 82: (200, 80), 83: (300, 80), 88: (200, 64), 89: (300, 64),
+    90: (400, 64), 96: (1000, 64), 97: (1100, 64), 104: (2000, 64),
+    128: (0, 128), 129: (100, 128), 130: (200, 128), 131: (300, 128),
+    132: (1500, 0), 136: (0, 136), 137: (100, 136), 138: (200, 136),
+    139: (300, 136), 144: (0, 144), 145: (100, 144), 146: (1500, 0),
+    152: (200, 128), 153: (300, 128), 160: (1500, 0), 192: (300, 0),
+    193: (400, 0), 194: (500, 0), 195: (2500, 0), 200: (300, 8), 201: (400, 8),
+    202: (500, 8), 208: (300, 16), 209: (400, 16), 216: (2500, 0),
+    256: (1000, 0), 257: (1100, 0), 258: (1500, 0), 264: (1000, 8),
+    265: (1100, 8), 272: (1500, 0), 320: (2000, 0), 321: (2100, 0),
+    328: (2000, 8), 384: (3000, 0), 512: (0, 512), 513: (100, 512),
+    514: (200, 512), 515: (300, 512), 516: (1000, 512), 517: (2000, 512),
+    520: (0, 520), 521: (100, 520), 522: (200, 520), 523: (300, 520),
+    524: (1000, 520), 528: (0, 528), 529: (100, 528), 530: (200, 528),
+    531: (300, 528), 536: (200, 512), 537: (300, 512), 538: (400, 512),
+    544: (1000, 512), 545: (1100, 512), 552: (2000, 512), 576: (0, 576),
+    577: (100, 576), 578: (200, 576), 579: (300, 576), 580: (1000, 576),
+    584: (0, 584), 585: (100, 584), 586: (200, 584), 587: (300, 584),
+    592: (0, 592), 593: (100, 592), 594: (200, 592), 600: (200, 576),
+    601: (300, 576), 608: (1000, 576), 640: (0, 640), 641: (100, 640),
+    642: (200, 640), 643: (300, 640), 648: (0, 648), 649: (100, 648),
+    650: (200, 648), 656: (0, 656), 657: (100, 656), 664: (200, 640),
+    704: (300, 512), 705: (400, 512), 706: (500, 512), 712: (300, 520),
+    713: (400, 520), 720: (300, 528), 768: (1000, 512), 769: (1100, 512),
+    776: (1000, 520), 832: (2000, 512), 1024: (0, 1024), 1025: (100, 1024),
+    1026: (200, 1024), 1027: (300, 1024), 1028: (1500, 0), 1032: (0, 1032),
+    1033: (100, 1032), 1034: (200, 1032), 1035: (300, 1032), 1040: (0, 1040),
+    1041: (100, 1040), 1042: (1500, 0), 1048: (200, 1024), 1049: (300, 1024),
+    1056: (1500, 0), 1088: (0, 1088), 1089: (100, 1088), 1090: (200, 1088),
+    1091: (300, 1088), 1096: (0, 1096), 1097: (100, 1096), 1098: (200, 1096),
+    1104: (0, 1104), 1105: (100, 1104), 1112: (200, 1088), 1152: (0, 1152),
+    1153: (100, 1152), 1154: (1500, 0), 1160: (0, 1160), 1161: (100, 1160),
+    1168: (1500, 0), 1216: (300, 1024), 1217: (400, 1024), 1224: (300, 1032),
+    1280: (1500, 0), 1536: (400, 0), 1537: (500, 0), 1538: (600, 0),
+    1539: (2500, 0), 1544: (400, 8), 1545: (500, 8), 1546: (600, 8),
+    1552: (400, 16), 1553: (500, 16), 1560: (2500, 0), 1600: (400, 64),
+    1601: (500, 64), 1602: (600, 64), 1608: (400, 72), 1609: (500, 72),
+    1616: (400, 80), 1664: (400, 128), 1665: (500, 128), 1672: (400, 136),
+    1728: (2500, 0), 2048: (1000, 0), 2049: (1100, 0), 2050: (1500, 0),
+    2056: (1000, 8), 2057: (1100, 8), 2064: (1500, 0), 2112: (1000, 64),
+    2113: (1100, 64), 2120: (1000, 72), 2176: (1500, 0), 2560: (2000, 0),
+    2561: (2100, 0), 2568: (2000, 8), 2624: (2000, 64), 3072: (3000, 0),
+    4096: (50, 0), 4097: (150, 0), 4098: (250, 0), 4099: (350, 0),
+    4100: (1050, 0), 4101: (2050, 0), 4104: (50, 8), 4105: (150, 8),
+    4106: (250, 8), 4107: (350, 8), 4108: (1050, 8), 4112: (50, 16),
+    4113: (150, 16), 4114: (250, 16), 4115: (350, 16), 4120: (250, 0),
+    4121: (350, 0), 4122: (450, 0), 4128: (1050, 0), 4129: (1150, 0),
+    4136: (2050, 0), 4160: (50, 64), 4161: (150, 64), 4162: (250, 64),
+    4163: (350, 64), 4164: (1050, 64), 4168: (50, 72), 4169: (150, 72),
+    4170: (250, 72), 4171: (350, 72), 4176: (50, 80), 4177: (150, 80),
+    4178: (250, 80), 4184: (250, 64), 4185: (350, 64), 4192: (1050, 64),
+    4224: (50, 128), 4225: (150, 128), 4226: (250, 128), 4227: (350, 128),
+    4232: (50, 136), 4233: (150, 136), 4234: (250, 136), 4240: (50, 144),
+    4241: (150, 144), 4248: (250, 128), 4288: (350, 0), 4289: (450, 0),
+    4290: (550, 0), 4296: (350, 8), 4297: (450, 8), 4304: (350, 16),
+    4352: (1050, 0), 4353: (1150, 0), 4360: (1050, 8), 4416: (2050, 0),
+    4608: (50, 512), 4609: (150, 512), 4610: (250, 512), 4611: (350, 512),
+    4612: (1050, 512), 4616: (50, 520), 4617: (150, 520), 4618: (250, 520),
+    4619: (350, 520), 4624: (50, 528), 4625: (150, 528), 4626: (250, 528),
+    4632: (250, 512), 4633: (350, 512), 4640: (1050, 512), 4672: (50, 576),
+    4673: (150, 576), 4674: (250, 576), 4675: (350, 576), 4680: (50, 584),
+    4681: (150, 584), 4682: (250, 584), 4688: (50, 592), 4689: (150, 592),
+    4696: (250, 576), 4736: (50, 640), 4737: (150, 640), 4738: (250, 640),
+    4744: (50, 648), 4745: (150, 648), 4752: (50, 656), 4800: (350, 512),
+    4801: (450, 512), 4808: (350, 520), 4864: (1050, 512), 5120: (50, 1024),
+    5121: (150, 1024), 5122: (250, 1024), 5123: (350, 1024), 5128: (50, 1032),
+    5129: (150, 1032), 5130: (250, 1032), 5136: (50, 1040), 5137: (150, 1040),
+    5144: (250, 1024), 5184: (50, 1088), 5185: (150, 1088), 5186: (250, 1088),
+    5192: (50, 1096), 5193: (150, 1096), 5200: (50, 1104), 5248: (50, 1152),
+    5249: (150, 1152), 5256: (50, 1160), 5312: (350, 1024), 5632: (450, 0),
+    5633: (550, 0), 5634: (650, 0), 5640: (450, 8), 5641: (550, 8),
+    5648: (450, 16), 5696: (450, 64), 5697: (550, 64), 5704: (450, 72),
+    5760: (450, 128), 6144: (1050, 0), 6145: (1150, 0), 6152: (1050, 8),
+    6208: (1050, 64), 6656: (2050, 0), 8192: (100, 0), 8193: (200, 0),
+    8194: (300, 0), 8195: (400, 0), 8196: (1500, 0), 8200: (100, 8),
+    8201: (200, 8), 8202: (300, 8), 8203: (400, 8), 8208: (100, 16),
+    8209: (200, 16), 8210: (1500, 0), 8216: (300, 0), 8217: (400, 0),
+    8224: (1500, 0), 8256: (100, 64), 8257: (200, 64), 8258: (300, 64),
+    8259: (400, 64), 8264: (100, 72), 8265: (200, 72), 8266: (300, 72),
+    8272: (100, 80), 8273: (200, 80), 8280: (300, 64), 8320: (100, 128),
+    8321: (200, 128), 8322: (1500, 0), 8328: (100, 136), 8329: (200, 136),
+    8336: (1500, 0), 8384: (400, 0), 8385: (500, 0), 8392: (400, 8),
+    8448: (1500, 0), 8704: (100, 512), 8705: (200, 512), 8706: (300, 512),
+    8707: (400, 512), 8712: (100, 520), 8713: (200, 520), 8714: (300, 520),
+    8720: (100, 528), 8721: (200, 528), 8728: (300, 512), 8768: (100, 576),
+    8769: (200, 576), 8770: (300, 576), 8776: (100, 584), 8777: (200, 584),
+    8784: (100, 592), 8832: (100, 640), 8833: (200, 640), 8840: (100, 648),
+    8896: (400, 512), 9216: (100, 1024), 9217: (200, 1024), 9218: (1500, 0),
+    9224: (100, 1032), 9225: (200, 1032), 9232: (1500, 0), 9280: (100, 1088),
+    9281: (200, 1088), 9288: (100, 1096), 9344: (1500, 0), 9728: (500, 0),
+    9729: (600, 0), 9736: (500, 8), 9792: (500, 64), 10240: (1500, 0),
+    12288: (500, 0), 12289: (600, 0), 12290: (700, 0), 12291: (2500, 0),
+    12296: (500, 8), 12297: (600, 8), 12298: (700, 8), 12304: (500, 16),
+    12305: (600, 16), 12312: (2500, 0), 12352: (500, 64), 12353: (600, 64),
+    12354: (700, 64), 12360: (500, 72), 12361: (600, 72), 12368: (500, 80),
+    12416: (500, 128), 12417: (600, 128), 12424: (500, 136), 12480: (2500, 0),
+    12800: (500, 512), 12801: (600, 512), 12802: (700, 512), 12808: (500, 520),
+    12809: (600, 520), 12816: (500, 528), 12864: (500, 576), 12865: (600, 576),
+    12872: (500, 584), 12928: (500, 640), 13312: (500, 1024),
+    13313: (600, 1024), 13320: (500, 1032), 13376: (500, 1088),
+    13824: (2500, 0), 16384: (1000, 0), 16385: (1100, 0), 16386: (1500, 0),
+    16392: (1000, 8), 16393: (1100, 8), 16400: (1500, 0), 16448: (1000, 64),
+    16449: (1100, 64), 16456: (1000, 72), 16512: (1500, 0), 16896: (1000, 512),
+    16897: (1100, 512), 16904: (1000, 520), 16960: (1000, 576),
+    17408: (1500, 0), 20480: (2000, 0), 20481: (2100, 0), 20488: (2000, 8),
+    20544: (2000, 64), 20992: (2000, 512), 24576: (3000, 0), 32768: (0, 32768),
+    32769: (100, 32768), 32770: (200, 32768), 32771: (300, 32768),
+    32772: (1000, 32768), 32773: (2000, 32768), 32776: (0, 32776),
+    32777: (100, 32776), 32778: (200, 32776), 32779: (300, 32776),
+    32780: (1000, 32776), 32784: (0, 32784), 32785: (100, 32784),
+    32786: (200, 32784), 32787: (300, 32784), 32792: (200, 32768),
+    32793: (300, 32768), 32794: (400, 32768), 32800: (1000, 32768),
+    32801: (1100, 32768), 32808: (2000, 32768), 32832: (0, 32832),
+    32833: (100, 32832), 32834: (200, 32832), 32835: (300, 32832),
+    32836: (1000, 32832), 32840: (0, 32840), 32841: (100, 32840),
+    32842: (200, 32840), 32843: (300, 32840), 32848: (0, 32848),
+    32849: (100, 32848), 32850: (200, 32848), 32856: (200, 32832),
+    32857: (300, 32832), 32864: (1000, 32832), 32896: (0, 32896),
+    32897: (100, 32896), 32898: (200, 32896), 32899: (300, 32896),
+    32904: (0, 32904), 32905: (100, 32904), 32906: (200, 32904),
+    32912: (0, 32912), 32913: (100, 32912), 32920: (200, 32896),
+    32960: (300, 32768), 32961: (400, 32768), 32962: (500, 32768),
+    32968: (300, 32776), 32969: (400, 32776), 32976: (300, 32784),
+    33024: (1000, 32768), 33025: (1100, 32768), 33032: (1000, 32776),
+    33088: (2000, 32768), 33280: (0, 33280), 33281: (100, 33280),
+    33282: (200, 33280), 33283: (300, 33280), 33284: (1000, 33280),
+    33288: (0, 33288), 33289: (100, 33288), 33290: (200, 33288),
+    33291: (300, 33288), 33296: (0, 33296), 33297: (100, 33296),
+    33298: (200, 33296), 33304: (200, 33280), 33305: (300, 33280),
+    33312: (1000, 33280), 33344: (0, 33344), 33345: (100, 33344),
+    33346: (200, 33344), 33347: (300, 33344), 33352: (0, 33352),
+    33353: (100, 33352), 33354: (200, 33352), 33360: (0, 33360),
+    33361: (100, 33360), 33368: (200, 33344), 33408: (0, 33408),
+    33409: (100, 33408), 33410: (200, 33408), 33416: (0, 33416),
+    33417: (100, 33416), 33424: (0, 33424), 33472: (300, 33280),
+    33473: (400, 33280), 33480: (300, 33288), 33536: (1000, 33280),
+    33792: (0, 33792), 33793: (100, 33792), 33794: (200, 33792),
+    33795: (300, 33792), 33800: (0, 33800), 33801: (100, 33800),
+    33802: (200, 33800), 33808: (0, 33808), 33809: (100, 33808),
+    33816: (200, 33792), 33856: (0, 33856), 33857: (100, 33856),
+    33858: (200, 33856), 33864: (0, 33864), 33865: (100, 33864),
+    33872: (0, 33872), 33920: (0, 33920), 33921: (100, 33920),
+    33928: (0, 33928), 33984: (300, 33792), 34304: (400, 32768),
+    34305: (500, 32768), 34306: (600, 32768), 34312: (400, 32776),
+    34313: (500, 32776), 34320: (400, 32784), 34368: (400, 32832),
+    34369: (500, 32832), 34376: (400, 32840), 34432: (400, 32896),
+    34816: (1000, 32768), 34817: (1100, 32768), 34824: (1000, 32776),
+    34880: (1000, 32832), 35328: (2000, 32768), 36864: (50, 32768),
+    36865: (150, 32768), 36866: (250, 32768), 36867: (350, 32768),
+    36868: (1050, 32768), 36872: (50, 32776), 36873: (150, 32776),
+    36874: (250, 32776), 36875: (350, 32776), 36880: (50, 32784),
+    36881: (150, 32784), 36882: (250, 32784), 36888: (250, 32768),
+    36889: (350, 32768), 36896: (1050, 32768), 36928: (50, 32832),
+    36929: (150, 32832), 36930: (250, 32832), 36931: (350, 32832),
+    36936: (50, 32840), 36937: (150, 32840), 36938: (250, 32840),
+    36944: (50, 32848), 36945: (150, 32848), 36952: (250, 32832),
+    36992: (50, 32896), 36993: (150, 32896), 36994: (250, 32896),
+    37000: (50, 32904), 37001: (150, 32904), 37008: (50, 32912),
+    37056: (350, 32768), 37057: (450, 32768), 37064: (350, 32776),
+    37120: (1050, 32768), 37376: (50, 33280), 37377: (150, 33280),
+    37378: (250, 33280), 37379: (350, 33280), 37384: (50, 33288),
+    37385: (150, 33288), 37386: (250, 33288), 37392: (50, 33296),
+    37393: (150, 33296), 37400: (250, 33280), 37440: (50, 33344),
+    37441: (150, 33344), 37442: (250, 33344), 37448: (50, 33352),
+    37449: (1500, 0), 37456: (50, 33360), 37504: (50, 33408),
+    37505: (150, 33408), 37512: (50, 33416), 37568: (350, 33280),
+    37888: (50, 33792), 37889: (150, 33792), 37890: (250, 33792),
+    37896: (50, 33800), 37897: (150, 33800), 37904: (50, 33808),
+    37952: (50, 33856), 37953: (150, 33856), 37960: (50, 33864),
+    38016: (50, 33920), 38400: (450, 32768), 38401: (550, 32768),
+    38408: (450, 32776), 38464: (450, 32832), 38912: (1050, 32768),
+    40960: (100, 32768), 40961: (200, 32768), 40962: (300, 32768),
+    40963: (400, 32768), 40968: (100, 32776), 40969: (200, 32776),
+    40970: (300, 32776), 40976: (100, 32784), 40977: (200, 32784),
+    40984: (300, 32768), 41024: (100, 32832), 41025: (200, 32832),
+    41026: (300, 32832), 41032: (100, 32840), 41033: (200, 32840),
+    41040: (100, 32848), 41088: (100, 32896), 41089: (200, 32896),
+    41096: (100, 32904), 41152: (400, 32768), 41472: (100, 33280),
+    41473: (200, 33280), 41474: (300, 33280), 41480: (100, 33288),
+    41481: (200, 33288), 41488: (100, 33296), 41536: (100, 33344),
+    41537: (200, 33344), 41544: (100, 33352), 41600: (100, 33408),
+    41984: (100, 33792), 41985: (200, 33792), 41992: (100, 33800),
+    42048: (100, 33856), 42496: (500, 32768), 45056: (500, 32768),
+    45057: (600, 32768), 45058: (700, 32768), 45064: (500, 32776),
+    45065: (600, 32776), 45072: (500, 32784), 45120: (500, 32832),
+    45121: (600, 32832), 45128: (500, 32840), 45184: (500, 32896),
+    45568: (500, 33280), 45569: (600, 33280), 45576: (500, 33288),
+    45632: (500, 33344), 46080: (500, 33792), 49152: (1000, 32768),
+    49153: (1100, 32768), 49160: (1000, 32776), 49216: (1000, 32832),
+    49664: (1000, 33280), 53248: (2000, 32768), 65536: (0, 65536),
+    65537: (100, 65536), 65538: (200, 65536), 65539: (300, 65536),
+    65540: (1500, 0), 65544: (0, 65544), 65545: (100, 65544),
+    65546: (200, 65544), 65547: (300, 65544), 65552: (0, 65552),
+    65553: (100, 65552), 65554: (1500, 0), 65560: (200, 65536),
+    65561: (300, 65536), 65568: (1500, 0), 65600: (0, 65600),
+    65601: (100, 65600), 65602: (200, 65600), 65603: (300, 65600),
+    65608: (0, 65608), 65609: (100, 65608), 65610: (200, 65608),
+    65616: (0, 65616), 65617: (100, 65616), 65624: (200, 65600),
+    65664: (0, 65664), 65665: (100, 65664), 65666: (1500, 0),
+    65672: (0, 65672), 65673: (100, 65672), 65680: (1500, 0),
+    65728: (300, 65536), 65729: (400, 65536), 65736: (300, 65544),
+    65792: (1500, 0), 66048: (0, 66048), 66049: (100, 66048),
+    66050: (200, 66048), 66051: (300, 66048), 66056: (0, 66056),
+    66057: (100, 66056), 66058: (200, 66056), 66064: (0, 66064),
+    66065: (100, 66064), 66072: (200, 66048), 66112: (0, 66112),
+    66113: (100, 66112), 66114: (200, 66112), 66120: (0, 66120),
+    66121: (100, 66120), 66128: (0, 66128), 66176: (0, 66176),
+    66177: (100, 66176), 66184: (0, 66184), 66240: (300, 66048),
+    66560: (0, 66560), 66561: (100, 66560), 66562: (1500, 0),
+    66568: (0, 66568), 66569: (100, 66568), 66576: (1500, 0),
+    66624: (0, 66624), 66625: (100, 66624), 66632: (0, 66632),
+    66688: (1500, 0), 67072: (400, 65536), 67073: (500, 65536),
+    67080: (400, 65544), 67136: (400, 65600), 67584: (1500, 0),
+    69632: (50, 65536), 69633: (150, 65536), 69634: (250, 65536),
+    69635: (350, 65536), 69640: (50, 65544), 69641: (150, 65544),
+    69642: (250, 65544), 69648: (50, 65552), 69649: (150, 65552),
+    69656: (250, 65536), 69696: (50, 65600), 69697: (150, 65600),
+    69698: (250, 65600), 69704: (50, 65608), 69705: (150, 65608),
+    69712: (50, 65616), 69760: (50, 65664), 69761: (150, 65664),
+    69768: (50, 65672), 69824: (350, 65536), 70144: (50, 66048),
+    70145: (150, 66048), 70146: (250, 66048), 70152: (50, 66056),
+    70153: (150, 66056), 70160: (50, 66064), 70208: (50, 66112),
+    70209: (150, 66112), 70216: (50, 66120), 70272: (50, 66176),
+    70656: (50, 66560), 70657: (150, 66560), 70664: (50, 66568),
+    70720: (50, 66624), 71168: (450, 65536), 73728: (100, 65536),
+    73729: (200, 65536), 73730: (1500, 0), 73736: (100, 65544),
+    73737: (200, 65544), 73744: (1500, 0), 73792: (100, 65600),
+    73793: (200, 65600), 73800: (100, 65608), 73856: (1500, 0),
+    74240: (100, 66048), 74241: (200, 66048), 74248: (100, 66056),
+    74304: (100, 66112), 74752: (1500, 0), 77824: (500, 65536),
+    77825: (600, 65536), 77832: (500, 65544), 77888: (500, 65600),
+    78336: (500, 66048), 81920: (1500, 0), 98304: (600, 0), 98305: (700, 0),
+    98306: (800, 0), 98307: (2500, 0), 98312: (600, 8), 98313: (700, 8),
+    98314: (800, 8), 98320: (600, 16), 98321: (700, 16), 98328: (2500, 0),
+    98368: (600, 64), 98369: (700, 64), 98370: (800, 64), 98376: (600, 72),
+    98377: (700, 72), 98384: (600, 80), 98432: (600, 128), 98433: (700, 128),
+    98440: (600, 136), 98496: (2500, 0), 98816: (600, 512), 98817: (700, 512),
+    98818: (800, 512), 98824: (600, 520), 98825: (700, 520), 98832: (600, 528),
+    98880: (600, 576), 98881: (700, 576), 98888: (600, 584), 98944: (600, 640),
+    99328: (600, 1024), 99329: (700, 1024), 99336: (600, 1032),
+    99392: (600, 1088), 99840: (2500, 0), 102400: (650, 0), 102401: (750, 0),
+    102402: (850, 0), 102408: (650, 8), 102409: (750, 8), 102416: (650, 16),
+    102464: (650, 64), 102465: (750, 64), 102472: (650, 72),
+    102528: (650, 128), 102912: (650, 512), 102913: (750, 512),
+    102920: (650, 520), 102976: (650, 576), 103424: (650, 1024),
+    106496: (700, 0), 106497: (800, 0), 106504: (700, 8), 106560: (700, 64),
+    107008: (700, 512), 110592: (2500, 0), 131072: (1000, 0),
+    131073: (1100, 0), 131074: (1500, 0), 131080: (1000, 8), 131081: (1100, 8),
+    131088: (1500, 0), 131136: (1000, 64), 131137: (1100, 64),
+    131144: (1000, 72), 131200: (1500, 0), 131584: (1000, 512),
+    131585: (1100, 512), 131592: (1000, 520), 131648: (1000, 576),
+    132096: (1500, 0), 135168: (1050, 0), 135169: (1150, 0), 135176: (1050, 8),
+    135232: (1050, 64), 135680: (1050, 512), 139264: (1500, 0),
+    163840: (2000, 0), 163841: (2100, 0), 163848: (2000, 8),
+    163904: (2000, 64), 164352: (2000, 512), 167936: (2050, 0),
+    196608: (3000, 0),
+}
+
+FULL_SCORE_TABLE = {
+    0: 0, 1: 100, 2: 200, 3: 300, 4: 1000, 5: 2000, 6: 3000, 20: 1500, 24: 200,
+    25: 300, 26: 400, 27: 2500, 32: 1000, 33: 1100, 34: 1500, 40: 2000,
+    41: 2100, 48: 3000, 132: 1500, 146: 1500, 160: 1500, 192: 300, 193: 400,
+    194: 500, 195: 2500, 216: 2500, 256: 1000, 257: 1100, 258: 1500, 272: 1500,
+    320: 2000, 321: 2100, 384: 3000, 1028: 1500, 1042: 1500, 1056: 1500,
+    1154: 1500, 1168: 1500, 1280: 1500, 1536: 400, 1537: 500, 1538: 600,
+    1539: 2500, 1560: 2500, 1728: 2500, 2048: 1000, 2049: 1100, 2050: 1500,
+    2064: 1500, 2176: 1500, 2560: 2000, 2561: 2100, 3072: 3000, 4096: 50,
+    4097: 150, 4098: 250, 4099: 350, 4100: 1050, 4101: 2050, 4120: 250,
+    4121: 350, 4122: 450, 4128: 1050, 4129: 1150, 4136: 2050, 4288: 350,
+    4289: 450, 4290: 550, 4352: 1050, 4353: 1150, 4416: 2050, 5632: 450,
+    5633: 550, 5634: 650, 6144: 1050, 6145: 1150, 6656: 2050, 8192: 100,
+    8193: 200, 8194: 300, 8195: 400, 8196: 1500, 8210: 1500, 8216: 300,
+    8217: 400, 8224: 1500, 8322: 1500, 8336: 1500, 8384: 400, 8385: 500,
+    8448: 1500, 9218: 1500, 9232: 1500, 9344: 1500, 9728: 500, 9729: 600,
+    10240: 1500, 12288: 500, 12289: 600, 12290: 700, 12291: 2500, 12312: 2500,
+    12480: 2500, 13824: 2500, 16384: 1000, 16385: 1100, 16386: 1500,
+    16400: 1500, 16512: 1500, 17408: 1500, 20480: 2000, 20481: 2100,
+    24576: 3000, 37449: 1500, 65540: 1500, 65554: 1500, 65568: 1500,
+    65666: 1500, 65680: 1500, 65792: 1500, 66562: 1500, 66576: 1500,
+    66688: 1500, 67584: 1500, 73730: 1500, 73744: 1500, 73856: 1500,
+    74752: 1500, 81920: 1500, 98304: 600, 98305: 700, 98306: 800, 98307: 2500,
+    98328: 2500, 98496: 2500, 99840: 2500, 102400: 650, 102401: 750,
+    102402: 850, 106496: 700, 106497: 800, 110592: 2500, 131072: 1000,
+    131073: 1100, 131074: 1500, 131088: 1500, 131200: 1500, 132096: 1500,
+    135168: 1050, 135169: 1150, 139264: 1500, 163840: 2000, 163841: 2100,
+    167936: 2050, 196608: 3000,
+}
@@ -0,0 +1,404 @@
+"""A multi-table game server for bots and remote players
+
+Every table is a Game driven one decision at a time by the engine, so one
+asyncore event loop can host thousands of them. Bots decide inline as soon
+as it's their turn, or with a batch_strategy once per poll for every
+table waiting on a bot, and remote players are sent a prompt and have
+move_timeout seconds to answer before the fallback strategy moves for them.
+
+The protocol is one line per message. A client joins a table with
+
+    JOIN <table> <players> [<bots>]
+
+which creates the table on first use with that many players, the last
+<bots> of them bots, and starts the game once every other seat is taken.
+The server answers with SEATED <table> <seat>, then sends EVENT lines as
+the game is played, one of
+
+    INHERIT <points> <dice left>   answer y or n
+    FREEZE <dice>                  answer the indices to freeze, e.g. 0,2
+    BANK <turn points>             answer b to bank or r to roll
+
+when it's the client's move, and OVER <winner> <scores> at the end, after
+which the client can JOIN again. Dice are listed by index with 0 for frozen
+dice. Invalid answers get an ERROR line and the same prompt again, and a
+TIMEOUT line is sent when the fallback strategy moves instead.
+"""
+import asynchat
+import asyncore
+import heapq
+import os
+import socket
+import time
+
+from . import batch
+from . import engine
+from . import game
+from . import keeps
+from . import packed
+from . import random_source
+from . import strategy
+from . import utils
+
+
+def _field(value):
+    if isinstance(value, packed.PackedDice):
+        return ','.join('0' if value.is_frozen(index) else str(face)
+                        for index, face in enumerate(value.faces()))
+    if isinstance(value, tuple):
+        return ','.join(str(item) for item in value) or '-'
+    return str(value)
+
+
+def format_event(event):
+    """Return the EVENT line for an engine.Event"""
+    data = event.data
+    if event.kind in (engine.FROZE, engine.BANKED, engine.INHERITED):
+        fields = [_field(item) for item in data]
+    elif event.kind == engine.ENDED:
+        fields = [str(score) for score in data]
+    else:
+        fields = [_field(data)]
+    player = '-' if event.player is None else str(event.player)
+    return ' '.join(['EVENT', event.kind, player] + fields)
+
+
+def parse_action(phase, line):
+    """Return the engine action for a player's answer, or None if invalid"""
+    answer = line.strip().lower()
+    if phase == engine.INHERIT and answer in ('y', 'n'):
+        return engine.ACCEPT_INHERIT if answer == 'y' else \
+            engine.DECLINE_INHERIT
+    if phase == engine.BANK_OR_ROLL and answer in ('b', 'r'):
+        return engine.BANK if answer == 'b' else engine.ROLL
+    if phase == engine.FREEZE:
+        try:
+            indices = [int(index)
+                       for index in answer.replace(',', ' ').split()]
+        except ValueError:
+            return None
+        if indices:
+            return engine.freeze(indices)
+    return None
+
+
+class Seat(object):
+    """A remote player's place at a table"""
+
+    def __init__(self, table, index, connection):
+        self.table = table
+        self.index = index
+        self.connection = connection
+        # Incremented with each prompt, so stale timeouts can be ignored
+        self.prompt_id = 0
+        self.waiting = False
+
+    def send(self, line):
+        if self.connection is not None:
+            self.connection.send_line(line)
+
+
+class Table(object):
+    """A game hosted by the server"""
+
+    def __init__(self, server, name, num_players, num_bots):
+        self.server = server
+        self.name = name
+        self.num_players = num_players
+        self.num_bots = num_bots
+        self.seats = []
+        self.game = None
+
+    @property
+    def full(self):
+        return len(self.seats) + self.num_bots >= self.num_players
+
+    def join(self, connection):
+        seat = Seat(self, len(self.seats), connection)
+        self.seats.append(seat)
+        connection.seat = seat
+        seat.send('SEATED {} {}'.format(self.name, seat.index))
+        if self.full:
+            self.start()
+        return seat
+
+    def start(self):
+        strategies = ([strategy.Strategy() for _ in self.seats] +
+                      [self.server.bot_factory()
+                       for _ in xrange(self.num_bots)])
+        self.game = game.Game(self.num_players, strategies=strategies,
+                              rng=random_source.RandomSource(),
+                              listeners=[self.broadcast])
+        engine.start(self.game,
+                     self.game.rng.randrange(self.num_players))
+        self.advance()
+
+    def broadcast(self, event):
+        line = format_event(event)
+        for seat in self.seats:
+            seat.send(line)
+
+    def _seat(self, player_index):
+        if player_index < len(self.seats):
+            return self.seats[player_index]
+        return None
+
+    def _apply(self, action):
+        """Apply an action, returning False if it was an invalid freeze"""
+        try:
+            engine.apply(self.game, action)
+        except (utils.DiceSetException, utils.DieException):
+            if action.kind != 'freeze':
+                raise
+            return False
+        return True
+
+    def _fallback(self):
+        if self._apply(engine.decide(self.game, self.server.fallback)):
+            return
+        # The fallback strategy froze dice it can't, so freeze the first
+        # legal keep rather than asking it again forever. engine.apply
+        # raises if even that fails.
+        diceset = self.game.players[self.game.current].diceset
+        keep = diceset.legal_keeps()[0]
+        engine.apply(self.game, engine.freeze(
+            keeps.keep_indices(diceset.dice, keep.key)))
+
+    def advance(self):
+        """Play bot moves until a remote player has to decide"""
+        g = self.game
+        while g.phase != engine.OVER:
+            seat = self._seat(g.current)
+            if seat is None and self.server.batch_strategy is not None:
+                self.server.bots_waiting.append(self)
+                return
+            elif seat is None:
+                if not self._apply(engine.decide(g)):
+                    self._fallback()
+            elif seat.connection is None:
+                self._fallback()
+            else:
+                self.prompt(seat)
+                return
+        self.finish()
+
+    def prompt(self, seat):
+        self._send_prompt(seat)
+        seat.waiting = True
+        seat.prompt_id += 1
+        self.server.set_timeout(seat)
+
+    def _send_prompt(self, seat):
+        g = self.game
+        player = g.players[seat.index]
+        if g.phase == engine.INHERIT:
+            diceset = g.last_player.diceset
+            seat.send('INHERIT {} {}'.format(
+                diceset.points, diceset.dice_left))
+        elif g.phase == engine.FREEZE:
+            seat.send('FREEZE {}'.format(_field(player.diceset.pack())))
+        else:
+            seat.send('BANK {}'.format(player.diceset.points))
+
+    def receive(self, seat, line):
+        if not seat.waiting:
+            seat.send('ERROR not your move')
+            return
+        action = parse_action(self.game.phase, line)
+        if action is None or not self._apply(action):
+            # The same prompt again, with the deadline it already had
+            seat.send('ERROR invalid move')
+            self._send_prompt(seat)
+            return
+        seat.waiting = False
+        self.advance()
+
+    def timeout(self, seat):
+        seat.waiting = False
+        seat.send('TIMEOUT')
+        self._fallback()
+        self.advance()
+
+    def leave(self, seat):
+        seat.connection = None
+        if seat.waiting:
+            self.timeout(seat)
+
+    def finish(self):
+        self.server.finished(self)
+        winner = engine.winner(self.game)
+        scores = ' '.join(str(player.score) for player in self.game.players)
+        for seat in self.seats:
+            seat.send('OVER {} {}'.format(
+                '-' if winner is None else self.game.players.index(winner),
+                scores))
+            if seat.connection is not None:
+                seat.connection.seat = None
+
+
+class _Connection(asynchat.async_chat):
+
+    def __init__(self, sock, server):
+        asynchat.async_chat.__init__(self, sock, map=server.socket_map)
+        if sock.family == socket.AF_INET:
+            # Prompts are small and latency matters more than packet count
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.server = server
+        self.seat = None
+        self.set_terminator('\n')
+        self._incoming = []
+
+    def collect_incoming_data(self, data):
+        self._incoming.append(data)
+
+    def found_terminator(self):
+        line = ''.join(self._incoming).strip()
+        self._incoming = []
+        if line:
+            self.server.handle_line(self, line)
+
+    def send_line(self, line):
+        self.push(line + '\n')
+
+    def handle_close(self):
+        self.server.disconnected(self)
+        self.close()
+
+
+class _Listener(asyncore.dispatcher):
+
+    def __init__(self, server, family, address):
+        asyncore.dispatcher.__init__(self, map=server.socket_map)
+        self.server = server
+        self.create_socket(family, socket.SOCK_STREAM)
+        if family != socket.AF_UNIX:
+            self.set_reuse_addr()
+        self.bind(address)
+        self.listen(1024)
+
+    def handle_accept(self):
+        pair = self.accept()
+        if pair is not None:
+            _Connection(pair[0], self.server)
+
+
+class Server(object):
+    """Hosts tables for clients connecting over TCP or Unix sockets"""
+
+    def __init__(self, move_timeout=30.0,
+                 bot_factory=strategy.ThresholdStrategy, fallback=None,
+                 batch_strategy=None):
+        self.move_timeout = move_timeout
+        self.bot_factory = bot_factory
+        self.batch_strategy = batch_strategy
+        self.bots_waiting = []
+        self.fallback = fallback or strategy.ThresholdStrategy()
+        self.socket_map = {}
+        self.tables = {}
+        self.games_finished = 0
+        self.running = False
+        self._timeouts = []
+        self._unix_paths = []
+
+    def listen_tcp(self, host='127.0.0.1', port=0):
+        """Accept TCP connections, returning the address listened on"""
+        listener = _Listener(self, socket.AF_INET, (host, port))
+        return listener.socket.getsockname()
+
+    def listen_unix(self, path):
+        """Accept connections on a Unix socket at path"""
+        if os.path.exists(path):
+            os.unlink(path)
+        _Listener(self, socket.AF_UNIX, path)
+        self._unix_paths.append(path)
+        return path
+
+    def handle_line(self, connection, line):
+        if connection.seat is not None:
+            connection.seat.table.receive(connection.seat, line)
+            return
+        words = line.split()
+        command = words[0].upper()
+        if command == 'QUIT':
+            connection.close_when_done()
+        elif command == 'JOIN' and len(words) in (3, 4):
+            try:
+                num_players = int(words[2])
+                num_bots = int(words[3]) if len(words) == 4 else 0
+            except ValueError:
+                connection.send_line('ERROR bad JOIN')
+                return
+            self.join(connection, words[1], num_players, num_bots)
+        else:
+            connection.send_line('ERROR expected JOIN or QUIT')
+
+    def join(self, connection, name, num_players, num_bots):
+        table = self.tables.get(name)
+        if table is None:
+            if not 0 <= num_bots < num_players:
+                connection.send_line('ERROR need a seat for a player')
+                return
+            table = self.tables[name] = Table(self, name, num_players,
+                                              num_bots)
+        elif table.full:
+            connection.send_line('ERROR table {} is full'.format(name))
+            return
+        table.join(connection)
+
+    def disconnected(self, connection):
+        if connection.seat is not None:
+            connection.seat.table.leave(connection.seat)
+            connection.seat = None
+
+    def finished(self, table):
+        self.games_finished += 1
+        del self.tables[table.name]
+
+    def set_timeout(self, seat):
+        heapq.heappush(self._timeouts, (time.time() + self.move_timeout,
+                                        seat.prompt_id, seat))
+
+    def _expire(self):
+        now = time.time()
+        while self._timeouts and self._timeouts[0][0] <= now:
+            _, prompt_id, seat = heapq.heappop(self._timeouts)
+            if seat.waiting and seat.prompt_id == prompt_id:
+                seat.table.timeout(seat)
+
+    def poll(self, timeout=0.05):
+        """Handle whatever network traffic and timeouts are due"""
+        if self._timeouts:
+            timeout = max(0.0, min(timeout,
+                                   self._timeouts[0][0] - time.time()))
+        asyncore.loop(timeout, use_poll=True, map=self.socket_map, count=1)
+        self._expire()
+        self.play_bots()
+
+    def play_bots(self):
+        """Make the batch_strategy's moves until every table waits on a player
+
+        Each round is one batch.decide call for every table waiting on a bot.
+        """
+        while self.bots_waiting:
+            waiting, self.bots_waiting = self.bots_waiting, []
+            actions = batch.decide([table.game for table in waiting],
+                                   self.batch_strategy)
+            for table, action in zip(waiting, actions):
+                if not table._apply(action):
+                    table._fallback()
+                table.advance()
+
+    def serve_forever(self, tick=0.05):
+        """Serve until stop is called, e.g. from another thread"""
+        self.running = True
+        while self.running:
+            self.poll(tick)
+
+    def stop(self):
+        self.running = False
+
+    def close(self):
+        asyncore.close_all(self.socket_map)
+        for path in self._unix_paths:
+            if os.path.exists(path):
+                os.unlink(path)
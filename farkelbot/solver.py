@@ -0,0 +1,352 @@
+import fractions
+
+import numpy as np
+
+from . import constants
+from . import keeps
+from . import points
+from . import probability
+from . import ruleset
+from . import tables
+
+
+def point_step(rules=None):
+    """Return the largest step that every score under rules is a multiple
+    of"""
+    rules = rules or ruleset.DEFAULT
+    return reduce(fractions.gcd,
+                  [value for _, value in points.build_patterns(rules)] +
+                  [rules.QUALIFICATION_POINTS])
+
+
+# The point step of the rules in constants
+POINT_STEP = point_step()
+
+
+def _best_keeps(roll_key, rules=None):
+    """Return the best scoring keep for each number of dice kept
+
+    The result maps number of dice kept to a (points, keep key) tuple. Only
+    selections in which every die scores are legal to keep, and for a given
+    number of dice kept more points is never worse.
+    """
+    num_dice = sum(points.unpack_counts(roll_key))
+    best = {}
+    for keep in keeps.legal_keeps(roll_key, rules):
+        num_kept = num_dice - keep.dice_left
+        if num_kept not in best or keep.points > best[num_kept][0]:
+            best[num_kept] = (keep.points, keep.key)
+    return best
+
+
+def roll_outcomes(rules=None):
+    """Group the rolls of each number of dice by what can be kept from them
+
+    Rolls with the same (dice kept, points) options are equivalent, so
+    solvers only need to value each group once. Returns a dict mapping
+    number of dice to sorted (options, probability) tuples, where options
+    holds (number of dice kept, points in point steps) and is empty for a
+    farkel, and a dict mapping each packed roll that scores to its number
+    of dice, options and the packed keep for each number of dice kept.
+    """
+    step = point_step(rules)
+    outcomes = {}
+    roll_keeps = {}
+    for num_dice in xrange(1, constants.NUM_DICE + 1):
+        grouped = {}
+        for roll_key, roll_probability in probability.roll_distribution(
+                num_dice):
+            best_keeps = _best_keeps(roll_key, rules)
+            options = tuple(sorted(
+                (num_kept, score // step)
+                for num_kept, (score, _) in best_keeps.items()))
+            grouped[options] = grouped.get(options, 0.0) + roll_probability
+            if best_keeps:
+                roll_keeps[roll_key] = (
+                    num_dice, options,
+                    dict((num_kept, keep_key) for num_kept, (_, keep_key)
+                         in best_keeps.items()))
+        outcomes[num_dice] = sorted(grouped.items())
+    return outcomes, roll_keeps
+
+
+def _farkel_penalty(farkel_count, rules):
+    if farkel_count + 1 >= rules.FARKEL_LIMIT:
+        return rules.FARKEL_POINTS
+    return 0
+
+
+class TurnPolicy(object):
+    """Expected-value-maximizing policy for a single turn
+
+    Qualified players maximize the expected change in banked score, unqualified
+    players maximize the probability of qualifying this turn. Turn points are
+    tracked in multiples of point_step up to max_turn_points, by default the
+    win condition, beyond which they're clamped. Everything is solved for
+    rules, by default ruleset.DEFAULT.
+
+    bank_cost, if given, is subtracted from the points banked and is indexed
+    by dice left then turn points index, such as the value of what banking
+    leaves the next player to inherit.
+    """
+
+    def __init__(self, max_turn_points=None, tolerance=1e-6, bank_cost=None,
+                 rules=None):
+        self.rules = rules or ruleset.DEFAULT
+        self.point_step = point_step(self.rules)
+        self.max_index = ((max_turn_points or self.rules.WIN_CONDITION) //
+                          self.point_step)
+        self.tolerance = tolerance
+        self.bank_cost = bank_cost
+        self.farkel_states = max(self.rules.FARKEL_LIMIT, 1)
+        self.iterations = 0
+        self._group_outcomes()
+        self._solve()
+        self._build_keep_table()
+
+    def _group_outcomes(self):
+        self.outcomes, self.roll_keeps = roll_outcomes(self.rules)
+
+    def _index(self, turn_points):
+        return min(turn_points // self.point_step, self.max_index)
+
+    def check_rules(self, rules):
+        """Raise ValueError unless the policy was solved for rules"""
+        if rules is not self.rules and rules.digest != self.rules.digest:
+            raise ValueError("Turn policy was solved for different rules")
+
+    def _after_keep(self, values, roll_values, dice_left, index):
+        # All dice frozen means a forced re-roll of the full set
+        index = min(index, self.max_index)
+        if dice_left:
+            return values[dice_left][index]
+        return roll_values[constants.NUM_DICE][index]
+
+    def _roll_value(self, values, roll_values, num_dice, index, farkel_value):
+        total = 0.0
+        for options, weight in self.outcomes[num_dice]:
+            if not options:
+                total += weight * farkel_value
+                continue
+            total += weight * max(
+                self._after_keep(values, roll_values, num_dice - num_kept,
+                                 index + steps)
+                for num_kept, steps in options)
+        return total
+
+    def _update(self, values, roll_values, farkel_value, decide, index):
+        delta = 0.0
+        for num_dice in xrange(1, constants.NUM_DICE + 1):
+            roll_value = self._roll_value(
+                values, roll_values, num_dice, index, farkel_value)
+            delta = max(delta, abs(roll_value - roll_values[num_dice][index]))
+            roll_values[num_dice][index] = roll_value
+            values[num_dice][index] = decide(num_dice, index, roll_value)
+        return delta
+
+    def _solve_table(self, values, roll_values, farkel_value, decide):
+        # Clamped turn points at the cap depend on themselves through hot
+        # dice, so they're iterated to convergence. Every other state only
+        # depends on states with more points, so a single backward sweep is
+        # exact once the cap is solved.
+        delta = None
+        while delta is None or delta > self.tolerance:
+            self.iterations += 1
+            delta = self._update(values, roll_values, farkel_value, decide,
+                                 self.max_index)
+        for index in xrange(self.max_index - 1, -1, -1):
+            self._update(values, roll_values, farkel_value, decide, index)
+
+    def _solve(self):
+        size = self.max_index + 1
+        num_states = constants.NUM_DICE + 1
+
+        # Value of choosing to bank or roll with a number of dice left
+        self.values = [[[self._bank_value(num_dice, index)
+                         for index in xrange(size)]
+                        for num_dice in xrange(num_states)]
+                       for _ in xrange(self.farkel_states)]
+        # Value of rolling a number of dice
+        self.roll_values = [[[0.0] * size for _ in xrange(num_states)]
+                            for _ in xrange(self.farkel_states)]
+        # Probability of qualifying, unqualified players can't choose to bank
+        qualify_index = self.rules.QUALIFICATION_POINTS // self.point_step
+        self.qualify_values = [[0.0] * size for _ in xrange(num_states)]
+        self.qualify_roll_values = [[0.0] * size for _ in xrange(num_states)]
+
+        def bank_or_roll(num_dice, index, roll_value):
+            return max(self._bank_value(num_dice, index), roll_value)
+
+        def qualify_or_roll(num_dice, index, roll_value):
+            return 1.0 if index >= qualify_index else roll_value
+
+        self._solve_table(self.qualify_values, self.qualify_roll_values, 0.0,
+                          qualify_or_roll)
+        for farkel_count in xrange(self.farkel_states):
+            self._solve_table(self.values[farkel_count],
+                              self.roll_values[farkel_count],
+                              -_farkel_penalty(farkel_count, self.rules),
+                              bank_or_roll)
+
+    def _bank_value(self, dice_left, index):
+        if self.bank_cost is None:
+            return index * self.point_step
+        return index * self.point_step - self.bank_cost[dice_left][index]
+
+    def _best_num_kept(self, values, roll_values, num_dice, options, index):
+        best_value = None
+        best_num_kept = None
+        for num_kept, steps in options:
+            value = self._after_keep(values, roll_values, num_dice - num_kept,
+                                     index + steps)
+            if best_value is None or value > best_value:
+                best_value = value
+                best_num_kept = num_kept
+        return best_num_kept
+
+    def _build_keep_table(self):
+        # Number of dice to keep for each group of equivalent rolls, indexed
+        # by farkel count (with unqualified last) and turn points index
+        self.keep_table = {}
+        for num_dice, outcomes in self.outcomes.items():
+            for options, _ in outcomes:
+                if not options:
+                    continue
+                tables = [[self._best_num_kept(
+                    self.values[farkel_count],
+                    self.roll_values[farkel_count], num_dice, options,
+                    index) for index in xrange(self.max_index + 1)]
+                    for farkel_count in xrange(self.farkel_states)]
+                tables.append([self._best_num_kept(
+                    self.qualify_values, self.qualify_roll_values, num_dice,
+                    options, index)
+                    for index in xrange(self.max_index + 1)])
+                self.keep_table[num_dice, options] = tables
+
+    def _farkel_state(self, farkel_count):
+        return min(farkel_count, self.farkel_states - 1)
+
+    def choose_keep(self, roll_key, turn_points, farkel_count=0,
+                    qualified=True):
+        """Return the packed dice to keep from a roll, or None on a farkel"""
+        if roll_key not in self.roll_keeps:
+            return None
+        num_dice, options, keep_keys = self.roll_keeps[roll_key]
+        tables = self.keep_table[num_dice, options]
+        if qualified:
+            table = tables[self._farkel_state(farkel_count)]
+        else:
+            table = tables[-1]
+        return keep_keys[table[self._index(turn_points)]]
+
+    def should_bank(self, dice_left, turn_points, farkel_count=0):
+        """Return True if a qualified player should bank rather than roll"""
+        if not dice_left:
+            return False
+        farkel_state = self._farkel_state(farkel_count)
+        index = self._index(turn_points)
+        bank_value = turn_points
+        if self.bank_cost is not None:
+            bank_value -= self.bank_cost[dice_left][index]
+        return bank_value >= self.roll_values[farkel_state][dice_left][index]
+
+    def expected_value(self, farkel_count=0):
+        """Expected change in banked score for a qualified player's turn"""
+        return self.roll_values[self._farkel_state(farkel_count)][
+            constants.NUM_DICE][0]
+
+    def qualify_probability(self):
+        """Probability that an unqualified player qualifies this turn"""
+        return self.qualify_roll_values[constants.NUM_DICE][0]
+
+    def save(self, path):
+        """Write the solved values to a table file for TurnTable
+
+        The table is indexed by farkel count with unqualified last, then
+        value to bank or roll or value of rolling, then dice left and turn
+        points index. TurnTable only compares turn points with the value of
+        rolling, so a policy with a bank_cost can't be saved.
+        """
+        if self.bank_cost is not None:
+            raise ValueError("Can't save a policy with a bank cost")
+        rows = [(self.values[farkel_count], self.roll_values[farkel_count])
+                for farkel_count in xrange(self.farkel_states)]
+        rows.append((self.qualify_values, self.qualify_roll_values))
+        tables.save(path, np.array(rows, dtype=np.float32),
+                    self.rules.digest)
+
+
+class TurnTable(object):
+    """A TurnPolicy saved with TurnPolicy.save, memory-mapped from disk
+
+    Makes the same decisions as the policy it was saved from without
+    solving anything, and processes mapping the same file share its pages.
+    Raises ValueError if the table was solved for rules other than rules,
+    by default ruleset.DEFAULT.
+    """
+
+    def __init__(self, path, rules=None):
+        self.rules = rules or ruleset.DEFAULT
+        self.point_step = point_step(self.rules)
+        self.table = tables.load(path, self.rules.digest)
+        self.farkel_states = self.table.shape[0] - 1
+        self.max_index = self.table.shape[-1] - 1
+
+    def _index(self, turn_points):
+        return min(turn_points // self.point_step, self.max_index)
+
+    def check_rules(self, rules):
+        """Raise ValueError unless the table was solved for rules"""
+        if rules is not self.rules and rules.digest != self.rules.digest:
+            raise ValueError("Turn table was solved for different rules")
+
+    def _row(self, farkel_count, qualified):
+        if not qualified:
+            return self.table[-1]
+        return self.table[min(farkel_count, self.farkel_states - 1)]
+
+    def _after_keep(self, row, dice_left, turn_points):
+        # All dice frozen means a forced re-roll of the full set
+        if dice_left:
+            return row[0, dice_left, self._index(turn_points)]
+        return row[1, constants.NUM_DICE, self._index(turn_points)]
+
+    def choose_keep(self, roll_key, turn_points, farkel_count=0,
+                    qualified=True):
+        """Return the packed dice to keep from a roll, or None on a farkel"""
+        row = self._row(farkel_count, qualified)
+        best_value = None
+        best_key = None
+        for keep in keeps.legal_keeps(roll_key, self.rules):
+            value = self._after_keep(row, keep.dice_left,
+                                     turn_points + keep.points)
+            if best_value is None or value > best_value:
+                best_value = value
+                best_key = keep.key
+        return best_key
+
+    def should_bank(self, dice_left, turn_points, farkel_count=0):
+        """Return True if a qualified player should bank rather than roll"""
+        if not dice_left:
+            return False
+        row = self._row(farkel_count, True)
+        return turn_points >= row[1, dice_left, self._index(turn_points)]
+
+    def value(self, player):
+        """Return the value of a player's position after freezing dice
+
+        This is the expected change in banked score for a qualified player,
+        and the probability of qualifying this turn otherwise.
+        """
+        self.check_rules(player.diceset.rules)
+        row = self._row(player.farkel_count, player.qualified)
+        return float(self._after_keep(row, player.diceset.dice_left,
+                                      player.diceset.points))
+
+    def expected_value(self, farkel_count=0):
+        """Expected change in banked score for a qualified player's turn"""
+        return float(self._row(farkel_count, True)[1, constants.NUM_DICE, 0])
+
+    def qualify_probability(self):
+        """Probability that an unqualified player qualifies this turn"""
+        return float(self.table[-1][1, constants.NUM_DICE, 0])
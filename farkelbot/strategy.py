@@ -0,0 +1,161 @@
+import ast
+
+from . import constants
+from . import keeps
+
+
+class Strategy(object):
+    """Makes a player's decisions during a game"""
+
+    def choose_inherit(self, game, player, last_player):
+        """Return True to inherit the last player's points and dice"""
+        return False
+
+    def choose_freeze(self, game, player):
+        """Return a list of dice indices to freeze"""
+        raise NotImplementedError
+
+    def choose_bank(self, game, player):
+        """Return True to bank points, False to roll again"""
+        raise NotImplementedError
+
+    def invalid_freeze(self, game, player, error):
+        """Handle a selection from choose_freeze that couldn't be frozen"""
+        raise error
+
+
+class InteractiveStrategy(Strategy):
+    """Asks for each decision on the console"""
+
+    def choose_inherit(self, game, player, last_player):
+        inherit_choice = ''
+        while inherit_choice not in ['n', 'y']:
+            inherit_choice = raw_input(
+                "The last player scored {} and left {} dice. "
+                "Would you like to inherit their score "
+                "and dice? Type 'y' or 'n'\n".format(
+                    last_player.diceset.points,
+                    last_player.diceset.dice_left)
+            )
+        return inherit_choice == 'y'
+
+    def choose_freeze(self, game, player):
+        while True:
+            freeze_choice = raw_input("\nWrite dice index (as a "
+                                      "list) to freeze\n")
+            try:
+                freeze_choice = ast.literal_eval(freeze_choice)
+            except (ValueError, SyntaxError):
+                continue
+            if freeze_choice:
+                return freeze_choice
+
+    def choose_bank(self, game, player):
+        bank_choice = ''
+        while bank_choice not in ['b', 'r']:
+            bank_choice = raw_input("\nType 'b' to bank points or "
+                                    "'r' to roll\n")
+        return bank_choice == 'b'
+
+    def invalid_freeze(self, game, player, error):
+        print("Invalid dice selection")
+
+
+class ThresholdStrategy(Strategy):
+    """Keeps every scoring die and banks once enough points are held
+
+    bank_threshold is either one threshold or a sequence of them indexed by
+    the number of dice left. trailing_bonus is added to the threshold while
+    another player has banked more points.
+    """
+
+    def __init__(self, bank_threshold=300, inherit_threshold=0,
+                 trailing_bonus=0):
+        if isinstance(bank_threshold, (int, long)):
+            bank_threshold = (bank_threshold,) * (constants.NUM_DICE + 1)
+        if len(bank_threshold) != constants.NUM_DICE + 1:
+            raise ValueError("Need one threshold for each number of dice left")
+        self.bank_threshold = tuple(bank_threshold)
+        self.inherit_threshold = inherit_threshold
+        self.trailing_bonus = trailing_bonus
+
+    def choose_inherit(self, game, player, last_player):
+        return last_player.diceset.points >= self.inherit_threshold
+
+    def choose_freeze(self, game, player):
+        roll_key = player.diceset.unfrozen_key
+        _, remaining_key = player.diceset.rules.score_table[roll_key]
+        return keeps.keep_indices(player.diceset.dice,
+                                  roll_key - remaining_key)
+
+    def choose_bank(self, game, player):
+        threshold = self.bank_threshold[player.diceset.dice_left]
+        if any(other.score > player.score for other in game.players):
+            threshold += self.trailing_bonus
+        return player.diceset.points >= threshold
+
+
+class PolicyStrategy(Strategy):
+    """Plays a single-turn policy from solver.TurnPolicy or TurnTable
+
+    Raises ValueError when asked to play under rules other than those the
+    policy was solved for.
+    """
+
+    def __init__(self, policy):
+        self.policy = policy
+
+    def choose_freeze(self, game, player):
+        self.policy.check_rules(player.diceset.rules)
+        keep_key = self.policy.choose_keep(
+            player.diceset.unfrozen_key, player.diceset.points,
+            player.farkel_count, player.qualified)
+        return keeps.keep_indices(player.diceset.dice, keep_key)
+
+    def choose_bank(self, game, player):
+        self.policy.check_rules(player.diceset.rules)
+        return self.policy.should_bank(player.diceset.dice_left,
+                                       player.diceset.points,
+                                       player.farkel_count)
+
+
+class WinProbabilityStrategy(Strategy):
+    """Makes the decision most likely to win a two-player game
+
+    tables is a winprob.WinProbability of solved win probabilities.
+    """
+
+    def __init__(self, tables):
+        self.tables = tables
+
+    def choose_inherit(self, game, player, last_player):
+        return self.tables.should_inherit(game, player, last_player)
+
+    def choose_freeze(self, game, player):
+        return keeps.keep_indices(player.diceset.dice,
+                                  self.tables.choose_keep(game, player))
+
+    def choose_bank(self, game, player):
+        return self.tables.should_bank(game, player)
+
+
+class InheritanceStrategy(Strategy):
+    """Plays for points with an eye on the next player's inheritance
+
+    values is an inheritance.InheritanceValues. Inherits whenever that beats
+    starting fresh, and banks as if the points the next player could
+    inherit came out of its own.
+    """
+
+    def __init__(self, values):
+        self.values = values
+
+    def choose_inherit(self, game, player, last_player):
+        return self.values.should_inherit(game, player, last_player)
+
+    def choose_freeze(self, game, player):
+        return keeps.keep_indices(player.diceset.dice,
+                                  self.values.choose_keep(game, player))
+
+    def choose_bank(self, game, player):
+        return self.values.should_bank(game, player)
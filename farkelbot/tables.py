@@ -0,0 +1,95 @@
+import binascii
+import os
+import struct
+
+import numpy as np
+
+# A table file is a fixed header, the shape as little-endian uint64s, then
+# the array in C order starting at a multiple of ALIGNMENT bytes
+MAGIC = b'FKBT'
+FORMAT_VERSION = 1
+ALIGNMENT = 64
+
+# Magic, format version, number of dimensions, sha256 of the rules the
+# table was solved for, and NumPy dtype string
+_HEADER = struct.Struct('<4sHH32s8s')
+
+
+def _data_offset(ndim):
+    size = _HEADER.size + 8 * ndim
+    return -(-size // ALIGNMENT) * ALIGNMENT
+
+
+def _write_file(path, shape, rules_digest, dtype):
+    """Write the header of a table of zeros to a new file at path"""
+    with open(path, 'wb') as table_file:
+        table_file.write(_HEADER.pack(
+            MAGIC, FORMAT_VERSION, len(shape),
+            binascii.unhexlify(rules_digest), dtype.str.encode('ascii')))
+        table_file.write(struct.pack('<{}Q'.format(len(shape)), *shape))
+        table_file.truncate(_data_offset(len(shape)) +
+                            dtype.itemsize * int(np.prod(shape)))
+
+
+def _temporary_path(path):
+    return '{}.{}.tmp'.format(path, os.getpid())
+
+
+def create(path, shape, rules_digest, dtype=np.float32):
+    """Create a table of zeros and return it memory-mapped for writing
+
+    rules_digest is the hex digest of the rules the table is solved for,
+    such as RuleSet.digest. An existing table at path is replaced with a
+    rename rather than truncated, so processes that still have it mapped
+    keep reading the old one.
+    """
+    dtype = np.dtype(dtype)
+    temporary = _temporary_path(path)
+    _write_file(temporary, shape, rules_digest, dtype)
+    os.rename(temporary, path)
+    return np.memmap(path, dtype, 'r+', _data_offset(len(shape)),
+                     tuple(shape))
+
+
+def save(path, array, rules_digest):
+    """Write an array to a table file, replacing it in one step"""
+    temporary = _temporary_path(path)
+    _write_file(temporary, array.shape, rules_digest, array.dtype)
+    table = np.memmap(temporary, array.dtype, 'r+',
+                      _data_offset(array.ndim), array.shape)
+    table[...] = array
+    table.flush()
+    del table
+    os.rename(temporary, path)
+
+
+def read_header(path):
+    """Return the shape, dtype and rules digest of a table file"""
+    with open(path, 'rb') as table_file:
+        header = table_file.read(_HEADER.size)
+        if len(header) < _HEADER.size:
+            raise ValueError("{} is not a table file".format(path))
+        magic, version, ndim, digest, dtype = _HEADER.unpack(header)
+        if magic != MAGIC:
+            raise ValueError("{} is not a table file".format(path))
+        if version != FORMAT_VERSION:
+            raise ValueError("{} has table format version {}, expected {}"
+                             .format(path, version, FORMAT_VERSION))
+        shape = struct.unpack('<{}Q'.format(ndim),
+                              table_file.read(8 * ndim))
+    return (tuple(int(size) for size in shape),
+            np.dtype(dtype.rstrip(b'\0').decode('ascii')),
+            binascii.hexlify(digest).decode('ascii'))
+
+
+def load(path, rules_digest=None, mode='r'):
+    """Memory-map a table file
+
+    The pages are shared with every other process mapping the same file
+    read-only, so nothing is copied into each process. Raises ValueError if
+    the table was solved for rules other than rules_digest.
+    """
+    shape, dtype, digest = read_header(path)
+    if rules_digest is not None and digest != rules_digest:
+        raise ValueError("{} was solved for different rules".format(path))
+    return np.memmap(path, dtype, mode, _data_offset(len(shape)), shape)
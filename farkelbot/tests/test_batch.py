@@ -0,0 +1,111 @@
+import numpy as np
+
+from .. import batch
+from .. import constants
+from .. import engine
+from .. import game
+from .. import points
+from .. import ruleset
+from .. import solver
+
+
+def test_lookup_tables():
+    key = points.pack_dice([1, 5, 2, 2, 4, 6])
+    assert(batch.SCORE_LUT[key] == (constants.SINGLE_ONE_POINTS +
+                                    constants.SINGLE_FIVE_POINTS))
+    assert(batch.KEEP_ALL_LUT[key] == points.pack_dice([1, 5]))
+
+
+def test_freeze():
+    simulator = batch.BatchSimulator(2, 2, seed=1)
+    simulator.faces[:] = [[5, 1, 2, 1, 4, 6], [2, 2, 2, 3, 3, 3]]
+    simulator.frozen[0, 1] = True
+    simulator._freeze(np.arange(2),
+                      np.array([points.pack_dice([1, 5]),
+                                points.pack_dice([3, 3, 3])]))
+    assert(simulator.frozen.tolist() ==
+           [[True, True, False, True, False, False],
+            [False, False, False, True, True, True]])
+
+
+def test_run():
+    simulator = batch.BatchSimulator(500, 3, seed=42)
+    results = simulator.run()
+    assert(results['finished'] == 500)
+    assert(sum(results['wins']) == 500)
+    assert(results['games_per_second'] > 0)
+    assert((simulator.scores.max(axis=1) >= constants.WIN_CONDITION).all())
+    assert(simulator.qualified.any(axis=1).all())
+
+
+def test_keep_masks():
+    faces = np.array([[5, 1, 2, 1, 4, 6], [2, 2, 2, 3, 3, 3]])
+    frozen = np.zeros(faces.shape, dtype=bool)
+    frozen[0, 1] = True
+    masks = batch.keep_masks(faces, frozen,
+                             np.array([points.pack_dice([1, 5]),
+                                       points.pack_dice([3, 3, 3])]))
+    assert(masks.tolist() ==
+           [[True, False, False, True, False, False],
+            [False, False, False, True, True, True]])
+    assert((batch.roll_keys(faces, frozen) ==
+            [points.pack_dice([5, 2, 1, 4, 6]),
+             points.pack_dice([2, 2, 2, 3, 3, 3])]).all())
+
+
+def check_equivalence(batch_strategy, num_players, num_games=40,
+                      rules=None):
+    """Play games in lockstep, comparing each batched decision with the
+    reference strategy's decision for the same game"""
+    games = [game.Game(num_players, strategies=[batch_strategy.reference] *
+                       num_players, seed=seed + 1, rules=rules)
+             for seed in xrange(num_games)]
+    for each in games:
+        engine.start(each, 0)
+    decisions = 0
+    playing = games
+    while playing:
+        actions = batch.decide(playing, batch_strategy)
+        for each, action in zip(playing, actions):
+            assert(action == engine.decide(each))
+            engine.apply(each, action)
+        decisions += len(playing)
+        playing = [each for each in playing if each.phase != engine.OVER]
+    return decisions
+
+
+def test_threshold_equivalence():
+    assert(check_equivalence(batch.BatchThresholdStrategy(
+        bank_threshold=[0, 200, 300, 400, 500, 600, 700],
+        inherit_threshold=300, trailing_bonus=200), 3) > 1000)
+
+
+def test_policy_equivalence(tmpdir):
+    path = str(tmpdir.join('turn.table'))
+    solver.TurnPolicy(max_turn_points=2000).save(path)
+    assert(check_equivalence(
+        batch.BatchPolicyStrategy(solver.TurnTable(path)), 2) > 1000)
+
+
+def test_policy_rules(tmpdir):
+    # Three pairs outscore any split of them, so the keeps differ from the
+    # default rules
+    rules = ruleset.RuleSet(THREE_PAIRS_POINTS=750)
+    path = str(tmpdir.join('turn.table'))
+    solver.TurnPolicy(max_turn_points=2000, rules=rules).save(path)
+    policy = batch.BatchPolicyStrategy(solver.TurnTable(path, rules))
+    rows, keep_keys, keep_points = policy._options[:3]
+    three_pairs = points.pack_dice([1, 1, 5, 5, 3, 3])
+    assert(750 in keep_points[rows[three_pairs]])
+    assert(check_equivalence(policy, 2, rules=rules) > 1000)
+
+
+def test_run_games():
+    games = [game.Game(2, strategies=[None, None], seed=seed + 1)
+             for seed in xrange(10)]
+    for each in games:
+        engine.start(each, 1)
+    winners = batch.run(games, batch.BatchThresholdStrategy())
+    assert(all(each.phase == engine.OVER for each in games))
+    assert(all(winner.score >= constants.WIN_CONDITION
+               for winner in winners))
@@ -0,0 +1,60 @@
+import collections
+
+import pytest
+
+from .. import cache
+from .. import points
+
+
+def test_lru_eviction():
+    lru = cache.BoundedCache(maxsize=2)
+    lru.put('a', 1)
+    lru.put('b', 2)
+    assert(lru.get('a') == 1)
+    lru.put('c', 3)
+    # 'b' was least recently used
+    assert('b' not in lru)
+    assert(lru.get('b') is None)
+    assert(lru.stats()['hits'] == 1)
+    assert(lru.stats()['misses'] == 1)
+    assert(lru.stats()['evictions'] == 1)
+    assert(lru.stats()['hit_rate'] == 0.5)
+
+
+def test_fifo_eviction():
+    fifo = cache.BoundedCache(maxsize=2, eviction=cache.FIFO)
+    fifo.put('a', 1)
+    fifo.put('b', 2)
+    assert(fifo.get('a') == 1)
+    fifo.put('c', 3)
+    # 'a' was inserted first, however recently it was used
+    assert('a' not in fifo)
+    assert(len(fifo) == 2)
+
+    with pytest.raises(ValueError):
+        cache.BoundedCache(eviction='random')
+
+
+def test_score_cache():
+    score_cache = points.SCORE_CACHE
+    try:
+        points.configure_score_cache(maxsize=8)
+        dice = collections.Counter([1, 1, 1, 1, 1, 5, 5, 5, 2, 2, 3])
+        assert(points.score_dice(dice) ==
+               (2700, collections.Counter([2, 2, 3])))
+        misses = points.SCORE_CACHE.misses
+        hits = points.SCORE_CACHE.hits
+        assert(points.score_dice(dice, score=100) ==
+               (2800, collections.Counter([2, 2, 3])))
+        assert(points.SCORE_CACHE.misses == misses)
+        assert(points.SCORE_CACHE.hits == hits + 1)
+        # Counters the score table holds never touch the cache
+        assert(points.score_dice(collections.Counter([1, 5, 5, 2, 3, 3])) ==
+               (200, collections.Counter([2, 3, 3])))
+        assert(points.SCORE_CACHE.misses == misses)
+        assert(points.SCORE_CACHE.hits == hits + 1)
+        # Key order doesn't matter
+        assert(points.dice_key(collections.Counter([2, 1, 2])) ==
+               points.dice_key(collections.Counter([1, 2, 2])))
+    finally:
+        points.SCORE_CACHE = score_cache
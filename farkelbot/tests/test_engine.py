@@ -0,0 +1,106 @@
+import pytest
+
+from .. import constants
+from .. import engine
+from .. import game
+from .. import random_source
+from .. import strategy
+from .. import utils
+
+
+def set_dice(player, values):
+    for die, value in zip(player.diceset.dice, values):
+        die.value = value
+        die.frozen = False
+    player.diceset.roll_ok = False
+
+
+def scripted_game(faces):
+    return game.Game(2, strategies=[strategy.ThresholdStrategy()] * 2,
+                     rng=random_source.ReplaySource(faces))
+
+
+def test_legal_freezes():
+    g = game.Game(2, strategies=[strategy.ThresholdStrategy()] * 2)
+    g.current = 0
+    g.phase = engine.FREEZE
+    set_dice(g.players[0], [1, 5, 2, 2, 4, 6])
+    assert(sorted(engine.legal_actions(g)) == [engine.freeze([0]),
+                                               engine.freeze([0, 1]),
+                                               engine.freeze([1])])
+
+    # Only the matching decision can be applied
+    with pytest.raises(utils.GameException):
+        engine.apply(g, engine.BANK)
+
+    # An invalid freeze leaves the game waiting on the same decision
+    with pytest.raises(utils.DiceSetException):
+        engine.apply(g, engine.freeze([2]))
+    assert(g.phase == engine.FREEZE)
+
+
+def test_qualify_ends_turn():
+    # The next player's first roll scores
+    g = scripted_game([1, 2, 3, 4, 6, 6])
+    g.current = 0
+    g.phase = engine.FREEZE
+    set_dice(g.players[0], [1, 1, 1, 2, 3, 4])
+    engine.apply(g, engine.freeze([0, 1, 2]))
+    assert(g.players[0].qualified)
+    assert(g.players[0].score == 0)
+    assert(g.current == 1)
+    assert(g.phase == engine.FREEZE)
+
+
+def test_bank_or_roll():
+    # The next player's first roll scores
+    g = scripted_game([1, 2, 3, 4, 6, 6])
+    g.current = 0
+    g.phase = engine.FREEZE
+    g.players[0].qualified = True
+    set_dice(g.players[0], [1, 5, 2, 2, 4, 6])
+    engine.apply(g, engine.freeze([0, 1]))
+    assert(engine.legal_actions(g) == [engine.BANK, engine.ROLL])
+    engine.apply(g, engine.BANK)
+    assert(g.players[0].score == (constants.SINGLE_ONE_POINTS +
+                                  constants.SINGLE_FIVE_POINTS))
+    assert(g.current == 1)
+    assert(g.phase == engine.FREEZE)
+
+
+def test_headless_game():
+    g = game.Game(3, strategies=[strategy.ThresholdStrategy(bank_threshold=b)
+                                 for b in (300, 500, 1000)], seed=7)
+    winner = g.start()
+    assert(g.phase == engine.OVER)
+    assert(winner.score >= constants.WIN_CONDITION)
+    assert(winner.score == max(p.score for p in g.players))
+
+
+def test_snapshot_restore():
+    rng = random_source.RecordingSource(random_source.RandomSource(5))
+    g = game.Game(3, strategies=[strategy.ThresholdStrategy()] * 3, rng=rng)
+    engine.start(g, 1)
+    for step, _ in enumerate(engine.steps(g)):
+        if step == 40:
+            break
+    assert(g.phase != engine.OVER)
+    state = g.snapshot()
+    assert(hash(state) == hash(g.snapshot()))
+    # Every legal action can be tried from the same state
+    for action in engine.legal_actions(g):
+        engine.apply(g, action)
+        g.restore(state)
+        assert(g.snapshot() == state)
+
+    # The rest of the game plays out the same from a restored state
+    rolled = len(rng.faces)
+    winner = engine.run(g)
+    clone = g.clone(random_source.ReplaySource(rng.faces[rolled:]))
+    clone.restore(state)
+    assert(clone.players.index(engine.run(clone)) ==
+           g.players.index(winner))
+    assert(clone.snapshot() == g.snapshot())
+
+    with pytest.raises(utils.GameException):
+        game.Game(2, strategies=[None, None]).restore(state)
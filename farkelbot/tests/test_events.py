@@ -0,0 +1,47 @@
+from .. import engine
+from .. import events
+from .. import game
+from .. import strategy
+
+
+def new_game(seed, listeners=None):
+    return game.Game(2, strategies=[strategy.ThresholdStrategy(),
+                                    strategy.ThresholdStrategy(1000)],
+                     seed=seed, listeners=listeners)
+
+
+def test_log_round_trip(tmpdir):
+    path = str(tmpdir.join('games.log'))
+    recorded = []
+    players = []
+    # A small buffer so records are split across writes and reads
+    with events.LogWriter(path, buffer_size=100) as writer:
+        for seed in xrange(1, 4):
+            g = new_game(seed, [writer, recorded.append])
+            g.start()
+            players.append(g.players)
+    assert(list(events.read_log(path, chunk_size=7)) == recorded)
+
+    states = [state for event, state in events.replay(
+        events.read_log(path)) if event.kind == engine.ENDED]
+    assert(len(states) == 3)
+    for state, game_players in zip(states, players):
+        assert(state.scores == [player.score for player in game_players])
+
+    summary = events.summarize(events.read_log(path))
+    assert(summary['games'] == 3)
+    assert(sum(summary['wins'].values()) == 3)
+    assert(summary['events'] == len(recorded))
+
+
+def test_replay_tracks_state():
+    g = new_game(5)
+    for event, state in events.replay(events.play(g)):
+        if event.kind == engine.ROLLED:
+            assert(state.dice == g.players[event.player].diceset.pack())
+        elif event.kind == engine.BANKED:
+            assert(state.scores[event.player] ==
+                   g.players[event.player].score)
+    assert(state.over)
+    assert(g.players[state.winner] is engine.winner(g))
+    assert(not g.listeners)
@@ -2,6 +2,8 @@ import pytest
 
 from .. import constants
 from .. import game
+from .. import keeps
+from .. import points
 from .. import utils
 
 
@@ -35,6 +37,12 @@ def test_die():
     assert(not die.value)
 
 
+def test_one_strategy_per_player():
+    with pytest.raises(ValueError):
+        game.Game(3, strategies=[None, None])
+    assert(len(game.Game(2, strategies=[None, None]).players) == 2)
+
+
 def test_diceset():
     diceset = game.DiceSet(seed=42)
 
@@ -237,3 +245,41 @@ def test_triple_farkel_and_score():
     assert(player.score ==
            (starting_points - constants.FARKEL_POINTS * 2 +
             constants.SINGLE_FIVE_POINTS))
+
+
+def check_unfrozen_state(diceset):
+    unfrozen = [die for die in diceset.dice if not die.frozen]
+    assert(diceset.dice_left == len(unfrozen))
+    assert(diceset.unfrozen_key ==
+           points.pack_dice(die.value for die in unfrozen if die.value))
+
+
+def test_unfrozen_state():
+    diceset = game.DiceSet(seed=7)
+    check_unfrozen_state(diceset)
+    for _ in xrange(50):
+        try:
+            diceset.roll()
+        except utils.FarkelException:
+            check_unfrozen_state(diceset)
+            continue
+        check_unfrozen_state(diceset)
+        diceset.freeze_selection(
+            [diceset.dice[index] for index in keeps.keep_indices(
+                diceset.dice, diceset.legal_keeps()[0].key)])
+        check_unfrozen_state(diceset)
+        if diceset.all_frozen:
+            diceset.reset(reset_score=False)
+
+    # Dice changed one at a time keep the set up to date too
+    diceset.dice[0].value = 5
+    diceset.dice[1].frozen = True
+    diceset.dice[1].value = 2
+    diceset.dice[2].reset()
+    check_unfrozen_state(diceset)
+    assert(not diceset.check_farkel())
+
+    inherited = game.DiceSet()
+    inherited.inherit_diceset(diceset)
+    check_unfrozen_state(inherited)
+    assert(inherited.unfrozen_key == diceset.unfrozen_key)
@@ -0,0 +1,82 @@
+import pytest
+
+from .. import constants
+from .. import game
+from .. import inheritance
+from .. import ruleset
+from .. import solver
+from .. import strategy
+
+MAX_TURN_POINTS = 2000
+
+
+@pytest.fixture(scope='module')
+def values():
+    return inheritance.cached_values(MAX_TURN_POINTS)
+
+
+def test_inherit_value(values):
+    assert(inheritance.cached_values(MAX_TURN_POINTS) is values)
+    # Points with plenty of dice are worth taking, and no dice never are
+    assert(values.inherit_value(500, 5) > 0)
+    assert(values.inherit_value(500, 0) == 0)
+    assert(values.inherit_value(1000, 4) > values.inherit_value(300, 4))
+    assert(values.left_value(1000, 4) > values.left_value(500, 4) > 0)
+    # Inheriting 50 points with one die is worse than a fresh start
+    assert(values.inherit_value(50, 1) < 0)
+    assert(values.left_value(50, 1) == 0)
+
+
+def test_should_inherit(values):
+    g = game.Game(2, seed=1)
+    player, last_player = g.players
+    last_player.diceset.points = 500
+    assert(values.should_inherit(g, player, last_player) ==
+           (values.inherit_value(500, last_player.diceset.dice_left) > 0))
+
+
+def test_leaves_inheritance(values):
+    g = game.Game(2, seed=1)
+    player, following = g.players
+    assert(not values.leaves_inheritance(g, player))
+    player.qualified = following.qualified = True
+    player.diceset.points = 300
+    assert(values.leaves_inheritance(g, player))
+    alone = game.Game(1, seed=1)
+    assert(not values.leaves_inheritance(alone, alone.players[0]))
+
+
+def test_banks_later_when_leaving_points(values):
+    index = 400 // solver.POINT_STEP
+    for dice_left in xrange(1, constants.NUM_DICE + 1):
+        assert(values.aware.values[0][dice_left][index] <=
+               values.fresh.values[0][dice_left][index])
+    # Somewhere the fresh policy banks the aware one rolls on
+    assert(any(values.fresh.should_bank(dice_left, turn_points, 0) and
+               not values.aware.should_bank(dice_left, turn_points, 0)
+               for dice_left in xrange(1, constants.NUM_DICE + 1)
+               for turn_points in xrange(300, MAX_TURN_POINTS,
+                                         solver.POINT_STEP)))
+
+
+def test_strategy_plays(values):
+    for seed in xrange(5):
+        g = game.Game(2, strategies=[
+            strategy.InheritanceStrategy(values),
+            strategy.ThresholdStrategy()], seed=seed + 1)
+        assert(g.start() is not None)
+
+
+def test_rules_must_match(values):
+    assert(values.rules is ruleset.DEFAULT)
+    rules = ruleset.RuleSet(THREE_PAIRS_POINTS=750)
+    g = game.Game(2, strategies=[strategy.InheritanceStrategy(values),
+                                 strategy.ThresholdStrategy()],
+                  seed=1, rules=rules)
+    player, last_player = g.players
+    with pytest.raises(ValueError):
+        values.should_inherit(g, player, last_player)
+    with pytest.raises(ValueError):
+        values.should_bank(g, player)
+    with pytest.raises(ValueError):
+        g.start()
@@ -0,0 +1,55 @@
+from .. import engine
+from .. import game
+from .. import instrument
+from .. import keeps
+from .. import strategy
+
+
+def play(seed):
+    return game.Game(2, strategies=[strategy.ThresholdStrategy(),
+                                    strategy.ThresholdStrategy(1000)],
+                     seed=seed).start()
+
+
+def test_disabled_restores_originals():
+    roll = game.DiceSet.__dict__['roll']
+    keep_indices = keeps.keep_indices
+    with instrument.recording():
+        assert(instrument.enabled())
+        assert(game.DiceSet.__dict__['roll'] is not roll)
+    assert(not instrument.enabled())
+    assert(game.DiceSet.__dict__['roll'] is roll)
+    assert(keeps.keep_indices is keep_indices)
+    assert(engine.decide.__name__ == 'decide')
+
+
+def test_recording(tmpdir):
+    with instrument.recording() as recorder:
+        for seed in xrange(1, 6):
+            play(seed)
+    play(6)
+
+    snapshot = recorder.snapshot()
+    functions = snapshot['functions']
+    # Every hot path runs while games are played
+    assert(all(function['calls'] for function in functions.values()))
+    assert(functions['Player.roll']['calls'] ==
+           functions['DiceSet.roll']['calls'] > 0)
+    assert(functions['DiceSet.roll']['buckets'][-1][1] ==
+           functions['DiceSet.roll']['calls'])
+    stats = snapshot['games']
+    assert(stats['games'] == 5)
+    assert(stats['rolls'] == functions['DiceSet.roll']['calls'])
+    assert(0 < stats['farkel_rate'] < 1)
+    assert(0 < stats['hot_dice_rate'] < 1)
+    assert(stats['rolls_per_turn'] >= 1)
+    assert(snapshot['rolls_per_turn'][-1][1] == stats['turns'])
+
+    path = str(tmpdir.join('farkelbot.prom'))
+    recorder.write_prometheus(path)
+    with open(path) as metrics_file:
+        text = metrics_file.read()
+    assert('farkelbot_games_total 5\n' in text)
+    assert('farkelbot_call_seconds_count{{function="DiceSet.roll"}} {}\n'
+           .format(stats['rolls']) in text)
+    assert('farkelbot_rolls_per_turn_bucket{le="+Inf"}' in text)
@@ -0,0 +1,40 @@
+from .. import constants
+from .. import game
+from .. import keeps
+from .. import points
+
+
+def test_legal_keeps():
+    found = keeps.legal_keeps(points.pack_dice([1, 1, 5, 2, 3, 4]))
+    assert(sorted(found) == sorted([
+        keeps.Keep(points.pack_dice([1]), constants.SINGLE_ONE_POINTS, 5),
+        keeps.Keep(points.pack_dice([5]), constants.SINGLE_FIVE_POINTS, 5),
+        keeps.Keep(points.pack_dice([1, 1]),
+                   2 * constants.SINGLE_ONE_POINTS, 4),
+        keeps.Keep(points.pack_dice([1, 5]),
+                   constants.SINGLE_ONE_POINTS +
+                   constants.SINGLE_FIVE_POINTS, 4),
+        keeps.Keep(points.pack_dice([1, 1, 5]),
+                   2 * constants.SINGLE_ONE_POINTS +
+                   constants.SINGLE_FIVE_POINTS, 3),
+    ]))
+
+    # Farkels have nothing to keep
+    assert(keeps.legal_keeps(points.pack_dice([2, 3, 4, 6, 2, 3])) == ())
+
+
+def test_legal_keeps_straight():
+    found = keeps.legal_keeps(points.pack_dice([1, 2, 3, 4, 5, 6]))
+    assert(keeps.Keep(points.pack_dice([1, 2, 3, 4, 5, 6]),
+                      constants.STRAIGHT_POINTS, 0) in found)
+    assert(len(found) == 4)
+
+
+def test_keep_indices():
+    diceset = game.DiceSet()
+    for die, value in zip(diceset.dice, [5, 1, 2, 1, 4, 6]):
+        die.value = value
+    diceset.dice[1].frozen = True
+    assert(keeps.keep_indices(diceset.dice, points.pack_dice([1, 5])) ==
+           [0, 3])
+    assert(len(diceset.legal_keeps()) == 3)
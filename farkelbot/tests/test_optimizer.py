@@ -0,0 +1,36 @@
+import pytest
+
+from .. import optimizer
+from .. import strategy
+from .. import tournament
+
+OPPONENT = tournament.Entrant('opponent', strategy.ThresholdStrategy,
+                              {'bank_threshold': 300})
+
+
+def test_grid():
+    assert(optimizer.grid(bank_threshold=[300, 500], trailing_bonus=[0]) ==
+           [{'bank_threshold': 300, 'trailing_bonus': 0},
+            {'bank_threshold': 500, 'trailing_bonus': 0}])
+
+
+def test_race_drops_losers():
+    candidates = optimizer.grid(bank_threshold=[400, 5000])
+    inline = optimizer.race(strategy.ThresholdStrategy, candidates, OPPONENT,
+                            games_per_round=40, max_rounds=4, processes=1,
+                            master_seed=3, shard_size=20)
+    pooled = optimizer.race(strategy.ThresholdStrategy, candidates, OPPONENT,
+                            games_per_round=40, max_rounds=4, processes=2,
+                            master_seed=3, shard_size=20)
+    assert(inline == pooled)
+    assert(inline['best'] == {'bank_threshold': 400})
+    reckless = inline['candidates'][1]
+    assert(reckless['dropped'] is not None)
+    assert(reckless['high'] < inline['candidates'][0]['low'])
+
+
+def test_threshold_per_dice_left():
+    bot = strategy.ThresholdStrategy(bank_threshold=range(0, 700, 100))
+    assert(bot.bank_threshold[6] == 600)
+    with pytest.raises(ValueError):
+        strategy.ThresholdStrategy(bank_threshold=[300, 400])
@@ -0,0 +1,47 @@
+from .. import game
+from .. import packed
+from .. import points
+
+
+def test_pack():
+    dice = packed.PackedDice.pack([5, 1, 2, 1, 4, 6],
+                                  [False, True, False, False, False, False])
+    assert(dice.faces() == (5, 1, 2, 1, 4, 6))
+    assert(dice.is_frozen(1) and not dice.is_frozen(0))
+    assert(dice.dice_left == 5)
+    assert(dice.unfrozen_key == points.pack_dice([5, 2, 1, 4, 6]))
+    assert(not dice.all_frozen)
+
+    # Packed dice are immutable values
+    assert(dice == packed.PackedDice.pack(dice.faces(), [False, True]))
+    assert(len(set([dice, packed.PackedDice.pack(dice.faces(),
+                                                 [False, True])])) == 1)
+
+    unrolled = packed.PackedDice.pack([None] * 6)
+    assert(unrolled.faces() == (None,) * 6)
+    assert(unrolled.unfrozen_key == 0)
+
+
+def test_freeze_and_roll():
+    dice = packed.PackedDice.pack([5, 1, 2, 1, 4, 6])
+    frozen = dice.freeze([0, 1, 3])
+    assert(frozen.unfrozen_key == points.pack_dice([2, 4, 6]))
+    assert(frozen.dice_left == 3)
+    assert(dice.dice_left == 6)
+
+    rolled = frozen.roll([3, 3, 3])
+    assert(rolled.faces() == (5, 1, 3, 1, 3, 3))
+    assert(rolled.unfrozen_key == points.pack_dice([3, 3, 3]))
+    assert(rolled.freeze(xrange(6)).all_frozen)
+
+
+def test_diceset_round_trip():
+    diceset = game.DiceSet(seed=42)
+    diceset.roll()
+    diceset.freeze_selection([diceset.dice[1]])
+
+    copy = game.DiceSet()
+    copy.unpack(diceset.pack())
+    assert(copy.pack() == diceset.pack())
+    assert([die.frozen for die in copy.dice] ==
+           [die.frozen for die in diceset.dice])
@@ -0,0 +1,119 @@
+import collections
+import itertools
+import os
+
+import pytest
+
+from .. import constants
+from .. import game
+from .. import keeps
+from .. import points
+from .. import ruleset
+from .. import utils
+
+
+def test_score_table_size():
+    # Every multiset of up to NUM_DICE dice, including no dice at all
+    assert(len(points.SCORE_TABLE) == 924)
+
+
+def test_precompiled_score_table(tmpdir):
+    # Fails when the shipped table is stale, run python -m farkelbot.points
+    shipped = os.path.join(os.path.dirname(points.__file__),
+                           points.TABLE_MODULE + '.py')
+    path = tmpdir.join('score_table_data.py')
+    points.write_score_table(str(path))
+    with open(shipped) as shipped_file:
+        assert(path.read() == shipped_file.read())
+    assert(points.SCORE_TABLE ==
+           points.build_score_table(points.ALL_POINTS_SORTED))
+
+
+def test_pack_round_trip():
+    key = points.pack_dice([1, 1, 5, 6])
+    assert(points.unpack_counts(key) == (2, 0, 0, 0, 1, 1))
+    assert(points.pack_counts((2, 0, 0, 0, 1, 1)) == key)
+    assert(points.key_to_counter(key) ==
+           collections.Counter([1, 1, 5, 6]))
+    assert(points.counter_to_key(collections.Counter([1, 1, 5, 6])) == key)
+
+
+def test_pack_unrolled_die():
+    with pytest.raises(utils.DieException):
+        points.pack_dice([1, None, 5])
+
+
+def test_score_counts():
+    assert(points.score_counts(points.pack_dice([1, 2, 3, 4, 5, 6])) ==
+           (constants.STRAIGHT_POINTS, 0))
+    assert(points.score_counts(points.pack_dice([2, 3, 4, 6, 2, 3])) ==
+           (0, points.pack_dice([2, 3, 4, 6, 2, 3])))
+    assert(points.score_counts(points.pack_dice([1, 5, 2])) ==
+           (constants.SINGLE_ONE_POINTS + constants.SINGLE_FIVE_POINTS,
+            points.pack_dice([2])))
+
+
+def best_split(counter, splits):
+    """Brute force the best (score, leftover dice) of every way to take
+    patterns out of counter, highest score first, then fewest dice left"""
+    key = tuple(sorted(counter.elements()))
+    if key not in splits:
+        best = (0, counter)
+        for scoring_values, pattern_points in points.ALL_POINTS_SORTED:
+            if not scoring_values - counter:
+                score, remaining = best_split(counter - scoring_values,
+                                              splits)
+                if ((score + pattern_points, -sum(remaining.values())) >
+                        (best[0], -sum(best[1].values()))):
+                    best = (score + pattern_points, remaining)
+        splits[key] = best
+    return splits[key]
+
+
+def test_score_dice_matches_brute_force():
+    splits = {}
+    for num_dice in xrange(1, constants.NUM_DICE + 1):
+        for dice in itertools.combinations_with_replacement(
+                points.FACES, num_dice):
+            counter = collections.Counter(dice)
+            score, remaining = best_split(counter, splits)
+            if not score:
+                expected = (0, counter)
+            else:
+                expected = (score, remaining or None)
+            assert(points.score_dice(counter) == expected)
+
+
+def test_best_split_beats_greedy():
+    # Greedily taking two triplets first would score 700 rather than 800
+    rules = ruleset.RuleSet(TWO_TRIPLETS_POINTS=700)
+    assert(rules.score_counts(points.pack_dice([1, 1, 1, 5, 5, 5])) ==
+           (800, 0))
+    # The quads alone score more than quads and a pair, leaving the pair
+    rules = ruleset.RuleSet(QUADS_PAIRS_POINTS=900)
+    quads_pair = points.pack_dice([1, 1, 1, 1, 2, 2])
+    assert(rules.score_counts(quads_pair) ==
+           (1000, points.pack_dice([2, 2])))
+    # but frozen together every die has to score
+    assert(rules.full_score_table[quads_pair] == 900)
+
+
+def test_full_score_table():
+    rules = ruleset.RuleSet(THREE_PAIRS_POINTS=150)
+    three_pairs = points.pack_dice([1, 1, 5, 5, 3, 3])
+    assert(rules.score_counts(three_pairs) ==
+           (300, points.pack_dice([3, 3])))
+    assert(rules.full_score_table[three_pairs] == 150)
+    assert(points.pack_dice([2, 3]) not in rules.full_score_table)
+    assert(keeps.Keep(three_pairs, 150, 0) in
+           keeps.legal_keeps(three_pairs, rules))
+    diceset = game.DiceSet(seed=1, rules=rules)
+    for die, value in zip(diceset.dice, [1, 1, 5, 5, 3, 3]):
+        die.value = value
+    diceset.roll_ok = False
+    diceset.freeze_selection(diceset.dice)
+    assert(diceset.points == 150)
+    # With the default rules, only splits leaving no dice are in the table
+    assert(points.FULL_SCORE_TABLE ==
+           dict((key, score) for key, (score, remaining_key)
+                in points.SCORE_TABLE.items() if not remaining_key))
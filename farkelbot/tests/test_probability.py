@@ -0,0 +1,42 @@
+import os
+
+from .. import constants
+from .. import probability
+
+
+def test_roll_distribution(tmpdir):
+    cache_dir = str(tmpdir)
+    for num_dice in xrange(1, constants.NUM_DICE + 1):
+        total = sum(weight for _, weight
+                    in probability.roll_distribution(num_dice, cache_dir))
+        assert(abs(total - 1.0) < 1e-12)
+
+
+def test_farkel_probability(tmpdir):
+    cache_dir = str(tmpdir)
+    # Only a one or a five scores with a single die
+    assert(probability.farkel_probability(1, cache_dir) == 4 / 6.0)
+    # Six dice farkel on 1080 of the 46656 ordered rolls
+    assert(abs(probability.farkel_probability(6, cache_dir) -
+               1080 / 46656.0) < 1e-12)
+    assert(probability.score_distribution(1, cache_dir) ==
+           {0: 4 / 6.0, constants.SINGLE_ONE_POINTS: 1 / 6.0,
+            constants.SINGLE_FIVE_POINTS: 1 / 6.0})
+    assert(abs(probability.expected_score(1, cache_dir) - 25) < 1e-9)
+
+
+def test_tables_are_cached_on_disk(tmpdir):
+    cache_dir = str(tmpdir.join('cache'))
+    tables = probability.load_tables(cache_dir)
+    path = probability._cache_path(cache_dir)
+    assert(os.path.exists(path))
+    assert(probability._read_cache(path) == tables)
+
+
+def test_tables_kept_in_memory_by_default(monkeypatch):
+    def write_cache(path, tables):
+        raise AssertionError("wrote {}".format(path))
+    monkeypatch.setattr(probability, '_write_cache', write_cache)
+    monkeypatch.setattr(probability, '_tables', {})
+    monkeypatch.setattr(probability, 'DEFAULT_CACHE_DIR', None)
+    assert(probability.farkel_probability(1) == 4 / 6.0)
@@ -0,0 +1,52 @@
+import random
+
+import pytest
+
+from .. import constants
+from .. import game
+from .. import random_source
+from .. import strategy
+from .. import utils
+
+
+def test_seeded_source_matches_global_random():
+    random.seed(42)
+    expected = [random.randint(constants.DICE_LOW_VAL,
+                               constants.DICE_HIGH_VAL) for _ in xrange(12)]
+    source = random_source.RandomSource(42)
+    assert(source.roll(6) + source.roll(6) == expected)
+
+
+@pytest.mark.parametrize('source_class', [random_source.FastRandomSource,
+                                          random_source.NumpyRandomSource])
+def test_bulk_sources(source_class):
+    faces = source_class(3).roll(600)
+    assert(faces == source_class(3).roll(600))
+    assert(set(faces) == set(xrange(constants.DICE_LOW_VAL,
+                                    constants.DICE_HIGH_VAL + 1)))
+
+
+def test_record_and_replay():
+    recording = random_source.RecordingSource(random_source.RandomSource(9))
+    diceset = game.DiceSet(rng=recording)
+    diceset.roll()
+    assert([die.value for die in diceset.dice] == recording.faces)
+
+    replayed = game.DiceSet(rng=random_source.ReplaySource(recording.faces))
+    replayed.roll()
+    assert([die.value for die in replayed.dice] == recording.faces)
+    with pytest.raises(utils.DieException):
+        replayed.rng.roll(1)
+
+
+def test_replayed_game():
+    strategies = [strategy.ThresholdStrategy()] * 2
+    recording = random_source.RecordingSource(random_source.RandomSource(4))
+    original = game.Game(2, strategies=strategies, rng=recording)
+    original.start()
+
+    replay = random_source.ReplaySource(recording.faces, recording.choices)
+    replayed = game.Game(2, strategies=strategies, rng=replay)
+    replayed.start()
+    assert([p.score for p in replayed.players] ==
+           [p.score for p in original.players])
@@ -0,0 +1,92 @@
+import multiprocessing
+import os
+
+import numpy as np
+
+from .. import game
+from .. import rl
+from .. import ruleset
+from .. import strategy
+
+RULES = ruleset.RuleSet(WIN_CONDITION=1000)
+
+
+def test_value_function_learns(tmpdir):
+    rng = np.random.RandomState(0)
+    features = rng.uniform(-1, 1, (512, rl.NUM_FEATURES))
+    outcomes = (features[:, 0] > features[:, 1]).astype(float)
+    value_function = rl.ValueFunction(hidden=8)
+    losses = [value_function.train(features, outcomes, learning_rate=0.5)
+              for _ in xrange(200)]
+    assert(losses[-1] < losses[0] / 2)
+    path = str(tmpdir.join('value.npz'))
+    value_function.save(path)
+    loaded = rl.ValueFunction.load(path)
+    assert(np.allclose(loaded.predict(features),
+                       value_function.predict(features)))
+
+
+def _fill(buffer, value):
+    buffer.add(np.full((3, rl.NUM_FEATURES), value), np.full(3, value))
+
+
+def test_replay_buffer_shared():
+    buffer = rl.ReplayBuffer(4)
+    _fill(buffer, 1.0)
+    assert(len(buffer) == 3)
+    # Rows written by another process land in the same memory
+    process = multiprocessing.Process(target=_fill, args=(buffer, 2.0))
+    process.start()
+    process.join()
+    assert(len(buffer) == 4)
+    assert(list(buffer.rows[:, -1]) == [2.0, 2.0, 1.0, 2.0])
+    features, outcomes = buffer.sample(10, np.random.RandomState(0))
+    assert(features.shape == (10, rl.NUM_FEATURES))
+    assert(set(outcomes) <= set([1.0, 2.0]))
+
+
+def test_strategy_plays():
+    value_function = rl.ValueFunction()
+    rows, outcomes = rl.play_games(value_function, 3, 3, 0.1, 1, RULES)
+    assert(rows.shape == (len(outcomes), rl.NUM_FEATURES))
+    assert(set(outcomes) == set([0.0, 1.0]))
+    g = game.Game(4, strategies=[rl.RLStrategy(value_function)] +
+                  [strategy.ThresholdStrategy() for _ in xrange(3)],
+                  seed=1, rules=RULES)
+    assert(g.start() is not None)
+
+
+def test_train(tmpdir):
+    directory = str(tmpdir)
+    history = rl.train(directory, iterations=2, games_per_iteration=4,
+                       num_players=(2, 3), steps_per_iteration=5,
+                       checkpoint_every=1, eval_games=4, processes=2,
+                       shard_size=2, rules=RULES)
+    assert([entry['iteration'] for entry in history] == [1, 2])
+    assert(sorted(history[-1]['win_rates']) == [2, 3])
+    assert(history[-1]['positions'] > history[0]['positions'] > 0)
+    assert(os.path.exists(history[-1]['checkpoint']))
+    rl.ValueFunction.load(history[-1]['checkpoint'])
+
+
+def test_bank_leaves_what_engine_offers():
+    g = game.Game(2, strategies=[None, None], seed=1, rules=RULES)
+    player, following = g.players
+    player.qualified = following.qualified = True
+    player.diceset.points = 300
+    bot = rl.RLStrategy(rl.ValueFunction(), epsilon=1.0,
+                        rng=np.random.RandomState(0))
+    left = rl.FEATURES.index('left_points')
+    for score, offered in ((0, True), (-300, False)):
+        player.score = score
+        bot.positions = []
+        while not bot.choose_bank(g, player):
+            bot.positions = []
+        assert(bool(bot.positions[-1][left]) == offered)
+    # Nothing is left to an unqualified player
+    following.qualified = False
+    player.score = 0
+    bot.positions = []
+    while not bot.choose_bank(g, player):
+        bot.positions = []
+    assert(not bot.positions[-1][left])
@@ -0,0 +1,49 @@
+import pytest
+
+from .. import constants
+from .. import game
+from .. import points
+from .. import ruleset
+from .. import strategy
+
+
+def test_default_rules():
+    assert(ruleset.RuleSet() == ruleset.DEFAULT)
+    assert(ruleset.DEFAULT.WIN_CONDITION == constants.WIN_CONDITION)
+    assert(ruleset.DEFAULT.score_table is points.SCORE_TABLE)
+
+    with pytest.raises(ValueError):
+        ruleset.RuleSet(NOT_A_RULE=1)
+
+
+def test_tables_are_shared_by_equal_rules():
+    rules = ruleset.RuleSet(THREE_PAIRS_POINTS=750)
+    same_rules = ruleset.RuleSet(THREE_PAIRS_POINTS=750)
+    assert(rules == same_rules and hash(rules) == hash(same_rules))
+    assert(rules != ruleset.DEFAULT)
+    assert(rules.score_table is same_rules.score_table)
+
+    three_pairs = points.pack_dice([2, 2, 3, 3, 4, 4])
+    assert(rules.score_counts(three_pairs) == (750, 0))
+    assert(ruleset.DEFAULT.score_counts(three_pairs) ==
+           (constants.THREE_PAIRS_POINTS, 0))
+
+
+def test_variants_side_by_side():
+    strategies = [strategy.ThresholdStrategy()] * 2
+    short = game.Game(2, strategies=strategies, seed=3,
+                      rules=ruleset.RuleSet(WIN_CONDITION=2000,
+                                            FARKEL_LIMIT=1))
+    normal = game.Game(2, strategies=strategies, seed=3)
+
+    short_winner = short.start()
+    normal_winner = normal.start()
+    assert(2000 <= short_winner.score < constants.WIN_CONDITION)
+    assert(normal_winner.score >= constants.WIN_CONDITION)
+
+    player = game.Player(rules=ruleset.RuleSet(SINGLE_FIVE_POINTS=75))
+    for die, value in zip(player.diceset.dice, [5, 2, 3, 4, 6, 6]):
+        die.value = value
+    player.diceset.roll_ok = False
+    player.diceset.freeze_selection([player.diceset.dice[0]])
+    assert(player.diceset.points == 75)
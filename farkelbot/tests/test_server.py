@@ -0,0 +1,163 @@
+import socket
+import threading
+import time
+
+import pytest
+
+from .. import batch
+from .. import keeps
+from .. import points
+from .. import server
+from .. import strategy
+
+
+@pytest.fixture
+def running_server():
+    game_server = server.Server(move_timeout=5.0)
+    thread = threading.Thread(target=game_server.serve_forever,
+                              kwargs={'tick': 0.01})
+    yield game_server, thread
+    game_server.stop()
+    thread.join()
+    game_server.close()
+
+
+def keep_all(dice_line):
+    """Answer a FREEZE prompt by keeping every scoring die"""
+    faces = [int(face) for face in dice_line.split(',')]
+    roll_key = points.pack_dice(face for face in faces if face)
+    best = max(keeps.legal_keeps(roll_key), key=lambda keep: keep.points)
+    needed = list(points.unpack_counts(best.key))
+    indices = []
+    for index, face in enumerate(faces):
+        if face and needed[face - 1]:
+            needed[face - 1] -= 1
+            indices.append(str(index))
+    return ','.join(indices)
+
+
+def play(connection, table, answer=True):
+    lines = connection.makefile()
+    connection.sendall('JOIN {} 2 1\n'.format(table))
+    prompts = []
+    for line in lines:
+        words = line.split()
+        prompts.append(words[0])
+        if words[0] == 'OVER':
+            return prompts
+        if not answer:
+            continue
+        if words[0] == 'FREEZE':
+            connection.sendall(keep_all(words[1]) + '\n')
+        elif words[0] == 'BANK':
+            connection.sendall('b\n' if int(words[1]) >= 300 else 'r\n')
+        elif words[0] == 'INHERIT':
+            connection.sendall('n\n')
+
+
+def test_concurrent_tables(running_server):
+    game_server, thread = running_server
+    address = game_server.listen_tcp()
+    thread.start()
+    clients = [socket.create_connection(address) for _ in xrange(2)]
+    results = []
+    players = [threading.Thread(target=lambda client, table: results.append(
+        play(client, table)), args=(client, 'table{}'.format(index)))
+        for index, client in enumerate(clients)]
+    for player in players:
+        player.start()
+    for player in players:
+        player.join()
+    assert(len(results) == 2)
+    for prompts in results:
+        assert(prompts[0] == 'SEATED')
+        assert('TIMEOUT' not in prompts)
+
+
+def test_batched_bots(running_server):
+    game_server, thread = running_server
+    game_server.batch_strategy = batch.BatchThresholdStrategy()
+    address = game_server.listen_tcp()
+    thread.start()
+    prompts = play(socket.create_connection(address), 'batched')
+    assert('EVENT' in prompts and 'TIMEOUT' not in prompts)
+    assert(game_server.games_finished == 1)
+
+
+def test_invalid_moves_and_timeouts(running_server, tmpdir):
+    game_server, thread = running_server
+    game_server.move_timeout = 0.01
+    path = game_server.listen_unix(str(tmpdir.join('server.sock')))
+    thread.start()
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    client.connect(path)
+    client.sendall('HELLO\n')
+    assert(client.makefile().readline().startswith('ERROR'))
+    # The fallback strategy plays every move once the client goes quiet
+    prompts = play(client, 'quiet', answer=False)
+    assert('TIMEOUT' in prompts)
+    assert(game_server.games_finished == 1)
+
+
+class FreezeNothing(strategy.ThresholdStrategy):
+    """Banks like ThresholdStrategy but never freezes anything legal"""
+
+    def choose_freeze(self, game, player):
+        return []
+
+
+def test_illegal_fallback_freezes(running_server):
+    game_server, thread = running_server
+    game_server.move_timeout = 0.01
+    game_server.bot_factory = FreezeNothing
+    game_server.fallback = FreezeNothing()
+    address = game_server.listen_tcp()
+    thread.start()
+    # Both the bot and the fallback for the quiet client freeze illegally
+    prompts = play(socket.create_connection(address), 'illegal',
+                   answer=False)
+    assert(prompts[-1] == 'OVER')
+    assert(game_server.games_finished == 1)
+
+
+def test_invalid_moves_keep_deadline(running_server):
+    game_server, thread = running_server
+    game_server.move_timeout = 0.2
+    address = game_server.listen_tcp()
+    thread.start()
+    client = socket.create_connection(address)
+    # Fail rather than hang if the move never times out
+    client.settimeout(5.0)
+    lines = client.makefile()
+    client.sendall('JOIN garbage 2 1\n')
+    # Answering every prompt with garbage still times out the move
+    prompted = None
+    errors = 0
+    timed_out = False
+    for line in lines:
+        words = line.split()
+        if words[0] == 'TIMEOUT':
+            timed_out = True
+            break
+        if line.strip() == 'ERROR invalid move':
+            errors += 1
+        elif words[0] in ('INHERIT', 'FREEZE', 'BANK'):
+            if prompted is None:
+                prompted = time.time()
+            client.sendall('garbage\n')
+    elapsed = time.time() - prompted
+    client.close()
+    assert(timed_out)
+    assert(errors > 0)
+    # Timed from when the prompt arrived, so a little under is fine
+    assert(game_server.move_timeout - 0.05 < elapsed <
+           game_server.move_timeout + 1.0)
+
+
+def test_parse_action():
+    assert(server.parse_action('freeze', '0, 2') ==
+           server.engine.freeze([0, 2]))
+    assert(server.parse_action('freeze', 'x') is None)
+    assert(server.parse_action('bank_or_roll', 'b') ==
+           server.engine.BANK)
+    assert(server.parse_action('inherit', 'maybe') is None)
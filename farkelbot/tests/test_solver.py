@@ -0,0 +1,77 @@
+import pytest
+
+from .. import constants
+from .. import game
+from .. import points
+from .. import probability
+from .. import ruleset
+from .. import solver
+
+
+@pytest.fixture(scope='module')
+def policy():
+    return solver.TurnPolicy(max_turn_points=2000)
+
+
+def test_expected_values(policy):
+    assert(policy.expected_value() > 0)
+    # A farkel at the limit costs points, so the turn is worth less
+    assert(policy.expected_value(constants.FARKEL_LIMIT - 1) <
+           policy.expected_value())
+    assert(0 < policy.qualify_probability() < 1)
+
+
+def test_choose_keep(policy):
+    # Farkels have nothing to keep
+    assert(policy.choose_keep(points.pack_dice([2, 3, 4, 6, 2, 3]), 0)
+           is None)
+
+    # A straight is kept whole
+    straight = points.pack_dice([1, 2, 3, 4, 5, 6])
+    assert(policy.choose_keep(straight, 0) == straight)
+
+    # Keeping a single one to roll five dice beats keeping the five too
+    roll = points.pack_dice([1, 5, 2, 2, 4, 6])
+    assert(policy.choose_keep(roll, 0) == points.pack_dice([1]))
+
+
+def test_should_bank(policy):
+    # Hot dice are always re-rolled
+    assert(not policy.should_bank(0, 1500))
+    assert(not policy.should_bank(6, 0))
+    assert(policy.should_bank(1, 1500))
+
+
+def test_turn_table(policy, tmpdir):
+    path = str(tmpdir.join('turn.table'))
+    policy.save(path)
+    table = solver.TurnTable(path)
+    assert(abs(table.expected_value() - policy.expected_value()) < 1e-3)
+    assert(abs(table.qualify_probability() -
+               policy.qualify_probability()) < 1e-6)
+    for roll_key, _ in probability.roll_distribution(constants.NUM_DICE):
+        for turn_points in (0, 300, 1000):
+            assert(table.choose_keep(roll_key, turn_points) ==
+                   policy.choose_keep(roll_key, turn_points))
+    for dice_left in xrange(constants.NUM_DICE + 1):
+        for turn_points in xrange(0, 2000, 50):
+            assert(table.should_bank(dice_left, turn_points) ==
+                   policy.should_bank(dice_left, turn_points))
+
+
+def test_rules(tmpdir):
+    rules = ruleset.RuleSet(SINGLE_FIVE_POINTS=25, FARKEL_LIMIT=2)
+    assert(solver.point_step(rules) == 25)
+    policy = solver.TurnPolicy(max_turn_points=500, rules=rules)
+    assert(policy.max_index == 20 and policy.farkel_states == 2)
+    path = str(tmpdir.join('turn.table'))
+    policy.save(path)
+    with pytest.raises(ValueError):
+        solver.TurnTable(path)
+    table = solver.TurnTable(path, rules)
+    player = game.Player(seed=1)
+    with pytest.raises(ValueError):
+        table.value(player)
+    with pytest.raises(ValueError):
+        policy.check_rules(player.diceset.rules)
+    table.value(game.Player(seed=1, rules=rules))
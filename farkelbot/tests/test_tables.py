@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+
+from .. import ruleset
+from .. import tables
+
+
+def test_round_trip(tmpdir):
+    path = str(tmpdir.join('values.table'))
+    array = np.arange(24, dtype=np.float32).reshape(2, 3, 4)
+    tables.save(path, array, ruleset.DEFAULT.digest)
+    assert(tables.read_header(path) ==
+           ((2, 3, 4), np.dtype(np.float32), ruleset.DEFAULT.digest))
+    loaded = tables.load(path, ruleset.DEFAULT.digest)
+    assert(np.array_equal(loaded, array))
+    # The data starts on an aligned boundary
+    assert(loaded.offset % tables.ALIGNMENT == 0)
+
+
+def test_rules_must_match(tmpdir):
+    path = str(tmpdir.join('values.table'))
+    tables.save(path, np.zeros(3), ruleset.DEFAULT.digest)
+    with pytest.raises(ValueError):
+        tables.load(path, ruleset.RuleSet(WIN_CONDITION=5000).digest)
+
+    not_a_table = tmpdir.join('other')
+    not_a_table.write('hello')
+    with pytest.raises(ValueError):
+        tables.load(str(not_a_table))
+
+
+def test_rewrite_while_mapped(tmpdir):
+    path = str(tmpdir.join('values.table'))
+    tables.save(path, np.arange(1024, dtype=np.float32),
+                ruleset.DEFAULT.digest)
+    old = tables.load(path, ruleset.DEFAULT.digest)
+    tables.save(path, np.zeros(16, dtype=np.float32),
+                ruleset.DEFAULT.digest)
+    # The earlier mapping still reads the whole old table
+    assert(np.array_equal(old, np.arange(1024, dtype=np.float32)))
+    assert(np.array_equal(tables.load(path), np.zeros(16)))
+
+    tables.create(path, (4,), ruleset.DEFAULT.digest)
+    assert(np.array_equal(old, np.arange(1024, dtype=np.float32)))
+    assert(tmpdir.listdir() == [tmpdir.join('values.table')])
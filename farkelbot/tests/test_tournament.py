@@ -0,0 +1,47 @@
+from .. import strategy
+from .. import tournament
+
+
+ENTRANTS = [
+    tournament.Entrant('cautious', strategy.ThresholdStrategy,
+                       {'bank_threshold': 300}),
+    tournament.Entrant('greedy', strategy.ThresholdStrategy,
+                       {'bank_threshold': 1000}),
+    tournament.Entrant('reckless', strategy.ThresholdStrategy,
+                       {'bank_threshold': 3000}),
+]
+
+
+def test_wilson_interval():
+    low, high = tournament.wilson_interval(50, 100)
+    assert(low < 0.5 < high)
+    assert(abs((0.5 - low) - (high - 0.5)) < 1e-9)
+    assert(tournament.wilson_interval(0, 0) == (0.0, 1.0))
+
+
+def test_shard_seeds_are_independent():
+    seeds = set(tournament.shard_seed(1, 0, 1, shard) for shard in xrange(10))
+    assert(len(seeds) == 10)
+    assert(tournament.shard_seed(1, 0, 1, 0) ==
+           tournament.shard_seed(1, 0, 1, 0))
+    assert(tournament.shard_seed(1, 0, 1, 0) !=
+           tournament.shard_seed(2, 0, 1, 0))
+
+
+def test_round_robin_is_reproducible_across_processes():
+    inline = tournament.round_robin(ENTRANTS, 20, processes=1,
+                                    master_seed=5, shard_size=7)
+    pooled = tournament.round_robin(ENTRANTS, 20, processes=2,
+                                    master_seed=5, shard_size=7)
+    assert(inline == pooled)
+    assert(sum(result['games'] for result in inline['entrants'].values()) ==
+           2 * 20 * 3)
+    assert(len(inline['pairings']) == 3)
+
+
+def test_games_without_a_winner_count():
+    # Two of the ten games ended with nobody scoring
+    summary = tournament._summarize(ENTRANTS[:2], [(0, 1, [5, 3], 10)])
+    assert(summary['entrants']['cautious']['games'] == 10)
+    assert(summary['entrants']['cautious']['win_rate'] == 0.5)
+    assert(summary['pairings']['cautious', 'greedy']['games'] == 10)
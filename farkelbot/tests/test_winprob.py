@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+from .. import game
+from .. import ruleset
+from .. import strategy
+from .. import winprob
+
+WIN_CONDITION = 500
+MAX_SCORE = 1000
+
+
+@pytest.fixture(scope='module')
+def tables(tmpdir_factory):
+    return winprob.solve(str(tmpdir_factory.mktemp('winprob')),
+                         win_condition=WIN_CONDITION, max_score=MAX_SCORE)
+
+
+def test_win_probabilities(tables):
+    assert(tables.delta < 1e-5)
+    # Rolling first is an advantage
+    assert(0.5 < tables.turn_start(0, 0, False, False) < 1)
+    assert(tables.turn_start(400, 0) > tables.turn_start(0, 400))
+    assert(tables.turn_start(0, 0, True, False) >
+           tables.turn_start(0, 0, False, True))
+
+
+def test_solve_resumes(tables, tmpdir):
+    directory = str(tmpdir)
+    partial = winprob.solve(directory, win_condition=WIN_CONDITION,
+                            max_score=MAX_SCORE, max_sweeps=2)
+    assert(partial.sweeps == 2)
+    resumed = winprob.solve(directory, win_condition=WIN_CONDITION,
+                            max_score=MAX_SCORE)
+    assert(resumed.sweeps == tables.sweeps)
+    for name in winprob.ARRAYS:
+        assert(np.array_equal(getattr(resumed, name),
+                              getattr(tables, name)))
+
+
+def test_strategy_plays(tables):
+    rules = ruleset.RuleSet(WIN_CONDITION=WIN_CONDITION)
+    for seed in xrange(5):
+        g = game.Game(2, strategies=[
+            strategy.WinProbabilityStrategy(tables),
+            strategy.ThresholdStrategy()], seed=seed + 1, rules=rules)
+        assert(g.start() is not None)
+
+
+def test_rules_must_match(tables):
+    rules = ruleset.RuleSet(WIN_CONDITION=WIN_CONDITION)
+    tables.check_rules(rules)
+    other = ruleset.RuleSet(WIN_CONDITION=WIN_CONDITION,
+                            THREE_PAIRS_POINTS=750)
+    g = game.Game(2, strategies=[strategy.WinProbabilityStrategy(tables),
+                                 strategy.ThresholdStrategy()],
+                  seed=1, rules=other)
+    player, last_player = g.players
+    with pytest.raises(ValueError):
+        tables.should_bank(g, player)
+    with pytest.raises(ValueError):
+        tables.should_inherit(g, player, last_player)
+    with pytest.raises(ValueError):
+        g.start()
@@ -0,0 +1,126 @@
+import collections
+import hashlib
+import itertools
+import math
+import multiprocessing
+
+from . import game
+from . import random_source
+
+# A named strategy, built in each worker by calling factory(**kwargs) so
+# only the recipe has to be pickled
+Entrant = collections.namedtuple('Entrant', ['name', 'factory', 'kwargs'])
+
+# Strategies built by the current worker, indexed like the entrants
+_strategies = None
+
+
+def shard_seed(master_seed, *path):
+    """Derive an independent seed for a shard of games from a master seed"""
+    digest = hashlib.sha256(':'.join(
+        str(part) for part in (master_seed,) + path)).hexdigest()
+    return int(digest[:16], 16)
+
+
+def wilson_interval(wins, games, z=1.96):
+    """Return the Wilson score interval of a win rate"""
+    if not games:
+        return 0.0, 1.0
+    rate = float(wins) / games
+    denominator = 1 + z * z / games
+    centre = rate + z * z / (2 * games)
+    spread = z * math.sqrt(rate * (1 - rate) / games +
+                           z * z / (4 * games * games))
+    return ((centre - spread) / denominator,
+            (centre + spread) / denominator)
+
+
+def _init_worker(entrants):
+    global _strategies
+    _strategies = [entrant.factory(**(entrant.kwargs or {}))
+                   for entrant in entrants]
+
+
+def play_shard(task):
+    """Play a shard of two-player games, alternating who sits first
+
+    Returns the indices of both entrants, how many games each won and how
+    many games were played, including any that nobody won.
+    """
+    first, second, num_games, seed = task
+    rng = random_source.RandomSource(seed)
+    wins = [0, 0]
+    for game_index in xrange(num_games):
+        seats = [0, 1] if game_index % 2 == 0 else [1, 0]
+        entrants = [(first, second)[seat] for seat in seats]
+        g = game.Game(2, strategies=[_strategies[entrant]
+                                     for entrant in entrants], rng=rng)
+        winner = g.start()
+        if winner is not None:
+            wins[seats[g.players.index(winner)]] += 1
+    return first, second, wins, num_games
+
+
+def _tasks(num_entrants, games_per_pair, shard_size, master_seed):
+    for first, second in itertools.combinations(xrange(num_entrants), 2):
+        for shard, start in enumerate(xrange(0, games_per_pair, shard_size)):
+            yield (first, second, min(shard_size, games_per_pair - start),
+                   shard_seed(master_seed, first, second, shard))
+
+
+def round_robin(entrants, games_per_pair, processes=None, master_seed=0,
+                shard_size=100):
+    """Play every pair of entrants against each other across processes
+
+    Games are split into shards with seeds derived from master_seed, so
+    results don't depend on the number of processes. Returns a dict with
+    per-entrant and per-pairing win rates and confidence intervals.
+    """
+    tasks = _tasks(len(entrants), games_per_pair, shard_size, master_seed)
+    if processes == 1:
+        _init_worker(entrants)
+        shards = [play_shard(task) for task in tasks]
+    else:
+        pool = multiprocessing.Pool(processes, _init_worker, (entrants,))
+        try:
+            shards = pool.map(play_shard, list(tasks), chunksize=1)
+        finally:
+            pool.close()
+            pool.join()
+    return _summarize(entrants, shards)
+
+
+def _summarize(entrants, shards):
+    wins = [0] * len(entrants)
+    games = [0] * len(entrants)
+    pairings = collections.defaultdict(lambda: [0, 0, 0])
+    for first, second, shard_wins, shard_games in shards:
+        pairings[first, second][0] += shard_wins[0]
+        pairings[first, second][1] += shard_wins[1]
+        pairings[first, second][2] += shard_games
+    for (first, second), (first_wins, second_wins,
+                          pair_games) in pairings.items():
+        wins[first] += first_wins
+        wins[second] += second_wins
+        games[first] += pair_games
+        games[second] += pair_games
+
+    def rate(entrant_wins, entrant_games):
+        low, high = wilson_interval(entrant_wins, entrant_games)
+        return {
+            'wins': entrant_wins,
+            'games': entrant_games,
+            'win_rate': (float(entrant_wins) / entrant_games
+                         if entrant_games else 0.0),
+            'low': low,
+            'high': high,
+        }
+
+    return {
+        'entrants': dict((entrant.name, rate(wins[index], games[index]))
+                         for index, entrant in enumerate(entrants)),
+        'pairings': dict(((entrants[first].name, entrants[second].name),
+                          rate(first_wins, pair_games))
+                         for (first, second), (first_wins, _, pair_games)
+                         in pairings.items()),
+    }
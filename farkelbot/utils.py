@@ -14,9 +14,5 @@ class PlayerException (Exception):
     pass
 
 
-def remove_duplicates(items):
-    seen = []
-    for value in items:
-        if value not in seen:
-            seen.append(value)
-    return tuple(seen)
+class GameException(Exception):
+    pass
@@ -0,0 +1,517 @@
+import json
+import os
+import tempfile
+
+import numpy as np
+
+from . import constants
+from . import keeps
+from . import ruleset
+from . import solver
+from . import tables
+
+# Scores and turn points are tracked in multiples of this
+STEP = solver.POINT_STEP
+
+# Bump when the layout of the saved tables changes
+TABLES_VERSION = 2
+
+STATE_FILE = 'state.json'
+
+# Win probabilities of the player to roll, each saved as a table file:
+#   reach[need, dice]: making at least need more points this turn
+#   responder[target - win, total, dice]: beating a player who reached the
+#       win condition with target points, on the last turn
+#   both_unqualified[turn, dice]: neither player has qualified
+#   unqualified[opponent, turn, dice]: the player hasn't qualified
+#   opponent_unqualified[score, total, dice]: the opponent hasn't qualified
+#   qualified[total, dice, score, opponent]: both players have qualified
+# where total is banked score plus turn points, all in STEPs
+ARRAYS = ('reach', 'responder', 'both_unqualified', 'unqualified',
+          'opponent_unqualified', 'qualified')
+
+NUM_DICE = constants.NUM_DICE
+
+
+class _Tables(object):
+    """Win probability arrays and the transitions between them"""
+
+    def __init__(self, arrays, win_condition, max_score):
+        self.arrays = arrays
+        for name in ARRAYS:
+            setattr(self, name, arrays[name])
+        self.win_condition = win_condition
+        self.max_score = max_score
+        self.num_scores = win_condition // STEP
+        self.max_index = max_score // STEP
+        self.qualify_index = -(-constants.QUALIFICATION_POINTS // STEP)
+
+    def _reply(self, target, total, dice_left):
+        # The player who reached the win condition gets one more turn to
+        # beat the responder, and may inherit the dice they left
+        need = np.clip(total - target + 1, 0, self.max_index)
+        return np.maximum(self.reach[need, NUM_DICE],
+                          self.reach[0, dice_left])
+
+    def _responder_bank(self, target, total, dice_left):
+        return np.where(total > target,
+                        1 - self._reply(target, total, dice_left), 0.0)
+
+    def _responder_after(self, target, total, dice_left):
+        if total >= self.max_index:
+            return self._responder_bank(target, self.max_index,
+                                        dice_left or NUM_DICE)
+        roll = self.responder[target - self.num_scores, total,
+                              dice_left or NUM_DICE]
+        if not dice_left:
+            return roll
+        # Players behind on the last turn have to roll
+        return np.where(total > target, np.maximum(
+            self._responder_bank(target, total, dice_left), roll), roll)
+
+    def _qualified_bank(self, score, opponent, total, dice_left):
+        # The opponent starts their turn, and may inherit the dice left
+        inherit = np.clip(opponent + total - score, 0, self.max_index)
+        if total < self.num_scores:
+            start = np.maximum(
+                self.qualified[opponent, NUM_DICE, opponent, total],
+                self.qualified[inherit, dice_left, opponent, total])
+        else:
+            responder = self.responder[total - self.num_scores]
+            start = np.maximum(responder[opponent, NUM_DICE],
+                               responder[inherit, dice_left])
+        return 1 - start
+
+    def _qualified_after(self, score, opponent, total, dice_left):
+        if total >= self.max_index:
+            return self._qualified_bank(score, opponent, self.max_index,
+                                        dice_left or NUM_DICE)
+        roll = self.qualified[total, dice_left or NUM_DICE, score, opponent]
+        if not dice_left:
+            return roll
+        return np.maximum(
+            self._qualified_bank(score, opponent, total, dice_left), roll)
+
+    def _qualified_farkel(self, score, opponent):
+        return 1 - self.qualified[opponent, NUM_DICE, opponent, score]
+
+    def _opponent_unqualified_bank(self, total):
+        if total >= self.num_scores:
+            # Unqualified players can't win the last turn
+            return 1.0
+        return 1 - self.unqualified[total, 0, NUM_DICE]
+
+    def _opponent_unqualified_after(self, score, total, dice_left):
+        if total >= self.max_index:
+            return self._opponent_unqualified_bank(self.max_index)
+        roll = self.opponent_unqualified[score, total, dice_left or NUM_DICE]
+        if not dice_left:
+            return roll
+        return np.maximum(self._opponent_unqualified_bank(total), roll)
+
+    def _opponent_unqualified_farkel(self, score):
+        return 1 - self.unqualified[score, 0, NUM_DICE]
+
+    def _unqualified_after(self, opponent, turn, dice_left):
+        if turn >= self.qualify_index:
+            # Qualifying banks nothing and ends the turn
+            return 1 - self.qualified[opponent, NUM_DICE, opponent, 0]
+        return self.unqualified[opponent, turn, dice_left or NUM_DICE]
+
+    def _unqualified_farkel(self, opponent):
+        return 1 - self.opponent_unqualified[opponent, opponent, NUM_DICE]
+
+    def _both_unqualified_after(self, turn, dice_left):
+        if turn >= self.qualify_index:
+            return 1 - self.unqualified[0, 0, NUM_DICE]
+        return self.both_unqualified[turn, dice_left or NUM_DICE]
+
+    def _both_unqualified_farkel(self):
+        return 1 - self.both_unqualified[0, NUM_DICE]
+
+    def _reach_after(self, need, dice_left):
+        if need <= 0:
+            return 1.0
+        return self.reach[min(need, self.max_index), dice_left or NUM_DICE]
+
+
+class _Solver(_Tables):
+    """Fills in the arrays by value iteration
+
+    Points only grow during a turn, so each sweep works backwards from the
+    highest totals and every state within a turn is exact given the values
+    of the turns that follow. Turns lead into each other through farkels,
+    so sweeps repeat until the values stop changing.
+    """
+
+    def __init__(self, arrays, win_condition, max_score):
+        super(_Solver, self).__init__(arrays, win_condition, max_score)
+        outcomes, _ = solver.roll_outcomes()
+        self.farkel_weights = {}
+        self.groups = {}
+        for num_dice, grouped in outcomes.items():
+            self.farkel_weights[num_dice] = dict(grouped).get((), 0.0)
+            self.groups[num_dice] = [(weight, options)
+                                     for options, weight in grouped
+                                     if options]
+        self.max_steps = max(steps for grouped in self.groups.values()
+                             for _, options in grouped
+                             for _, steps in options)
+        num_scores = self.num_scores
+        self.scores, self.opponents = np.indices((num_scores, num_scores))
+        self.diagonal = np.arange(num_scores)
+
+    def _roll(self, after, num_dice, farkel_value):
+        """Value of rolling num_dice, given after(dice_left, steps)"""
+        total = self.farkel_weights[num_dice] * farkel_value
+        for weight, options in self.groups[num_dice]:
+            best = None
+            for num_kept, steps in options:
+                value = after(num_dice - num_kept, steps)
+                best = value if best is None else np.maximum(best, value)
+            total = total + weight * best
+        return total
+
+    def solve_last_turn(self):
+        """Fill in reach and responder, which don't depend on other turns"""
+        for need in xrange(self.max_index + 1):
+            for num_dice in xrange(1, NUM_DICE + 1):
+                self.reach[need, num_dice] = self._roll(
+                    lambda dice_left, steps: self._reach_after(
+                        need - steps, dice_left), num_dice, 0.0)
+
+        targets = np.arange(self.num_scores, self.max_index + 1)
+        after = np.zeros((self.max_index + 1, NUM_DICE + 1, len(targets)))
+        for total in xrange(self.max_index, -1, -1):
+            for num_dice in xrange(1, NUM_DICE + 1):
+                if total == self.max_index:
+                    value = self._responder_after(targets, total, num_dice)
+                else:
+                    value = self._roll(
+                        lambda dice_left, steps: after[
+                            min(total + steps, self.max_index), dice_left],
+                        num_dice, 0.0)
+                self.responder[:, total, num_dice] = value
+            for dice_left in xrange(NUM_DICE + 1):
+                after[total, dice_left] = self._responder_after(
+                    targets, total, dice_left)
+
+    def _sweep_unqualified(self):
+        delta = 0.0
+        for turn in xrange(self.qualify_index - 1, -1, -1):
+            for num_dice in xrange(1, NUM_DICE + 1):
+                value = self._roll(
+                    lambda dice_left, steps: self._both_unqualified_after(
+                        turn + steps, dice_left),
+                    num_dice, self._both_unqualified_farkel())
+                delta = max(delta, abs(
+                    value - self.both_unqualified[turn, num_dice]))
+                self.both_unqualified[turn, num_dice] = value
+
+        opponents = self.diagonal
+        farkel = self._unqualified_farkel(opponents)
+        for turn in xrange(self.qualify_index - 1, -1, -1):
+            for num_dice in xrange(1, NUM_DICE + 1):
+                value = self._roll(
+                    lambda dice_left, steps: self._unqualified_after(
+                        opponents, turn + steps, dice_left),
+                    num_dice, farkel)
+                delta = max(delta, np.abs(
+                    value - self.unqualified[:, turn, num_dice]).max())
+                self.unqualified[:, turn, num_dice] = value
+
+        scores = self.diagonal
+        farkel = self._opponent_unqualified_farkel(scores)
+        after = np.zeros((self.max_index + 1, NUM_DICE + 1, len(scores)))
+        for total in xrange(self.max_index, -1, -1):
+            for num_dice in xrange(1, NUM_DICE + 1):
+                if total == self.max_index:
+                    value = self._opponent_unqualified_after(
+                        scores, total, num_dice)
+                else:
+                    value = self._roll(
+                        lambda dice_left, steps: after[
+                            min(total + steps, self.max_index), dice_left],
+                        num_dice, farkel)
+                delta = max(delta, np.abs(
+                    value -
+                    self.opponent_unqualified[:, total, num_dice]).max())
+                self.opponent_unqualified[:, total, num_dice] = value
+            for dice_left in xrange(NUM_DICE + 1):
+                after[total, dice_left] = self._opponent_unqualified_after(
+                    scores, total, dice_left)
+        return delta
+
+    def _sweep_qualified(self):
+        delta = 0.0
+        scores, opponents = self.scores, self.opponents
+        farkel = self._qualified_farkel(scores, opponents)
+        # Values after keeping dice, only for totals a roll can still reach
+        after = {}
+        for total in xrange(self.max_index, -1, -1):
+            for num_dice in xrange(1, NUM_DICE + 1):
+                if total == self.max_index:
+                    value = self._qualified_after(
+                        scores, opponents, total, num_dice)
+                else:
+                    value = self._roll(
+                        lambda dice_left, steps: after[
+                            min(total + steps, self.max_index)][dice_left],
+                        num_dice, farkel)
+                delta = max(delta, np.abs(
+                    value - self.qualified[total, num_dice]).max())
+                self.qualified[total, num_dice] = value
+            after[total] = [self._qualified_after(scores, opponents, total,
+                                                  dice_left)
+                            for dice_left in xrange(NUM_DICE + 1)]
+            after.pop(total + self.max_steps + 1, None)
+        return delta
+
+    def sweep(self):
+        """Update every array once, returning the largest change"""
+        return max(self._sweep_unqualified(), self._sweep_qualified())
+
+
+def _shapes(win_condition, max_score):
+    num_scores = win_condition // STEP
+    max_index = max_score // STEP
+    qualify_index = -(-constants.QUALIFICATION_POINTS // STEP)
+    dice = NUM_DICE + 1
+    return {
+        'reach': (max_index + 1, dice),
+        'responder': (max_index - num_scores + 1, max_index + 1, dice),
+        'both_unqualified': (qualify_index, dice),
+        'unqualified': (num_scores, qualify_index, dice),
+        'opponent_unqualified': (num_scores, max_index + 1, dice),
+        'qualified': (max_index + 1, dice, num_scores, num_scores),
+    }
+
+
+def _array_path(directory, name):
+    return os.path.join(directory, name + '.table')
+
+
+def _rules_digest(win_condition):
+    return ruleset.RuleSet(WIN_CONDITION=win_condition).digest
+
+
+def _read_state(directory):
+    try:
+        with open(os.path.join(directory, STATE_FILE)) as state_file:
+            return json.load(state_file)
+    except (IOError, OSError, ValueError):
+        return None
+
+
+def _write_state(directory, state):
+    handle, temp_path = tempfile.mkstemp(dir=directory)
+    with os.fdopen(handle, 'w') as state_file:
+        json.dump(state, state_file, indent=2, sort_keys=True)
+    os.rename(temp_path, os.path.join(directory, STATE_FILE))
+
+
+def solve(directory, win_condition=constants.WIN_CONDITION, max_score=None,
+          tolerance=1e-5, max_sweeps=None):
+    """Solve two-player win probabilities into directory
+
+    Totals beyond max_score, which defaults to 2000 points past the win
+    condition, are clamped and banked. Arrays are memory-mapped and flushed
+    to disk after every sweep, along with a state file recording progress,
+    so an interrupted or max_sweeps limited solve resumes where it left off
+    when called again with the same arguments. Any partly updated sweep is
+    just a better starting point for the next one.
+
+    Farkel penalties aren't modelled. Returns a WinProbability for the
+    arrays solved so far.
+    """
+    max_score = max_score or win_condition + 2000
+    params = {
+        'version': TABLES_VERSION,
+        'rules': _rules_digest(win_condition),
+        'win_condition': win_condition,
+        'max_score': max_score,
+    }
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+    state = _read_state(directory)
+    resume = state is not None and all(
+        state.get(name) == value for name, value in params.items())
+    if not resume:
+        state = dict(params, sweeps=0, delta=None, last_turn_solved=False)
+
+    shapes = _shapes(win_condition, max_score)
+    if resume:
+        arrays = dict((name, tables.load(
+            _array_path(directory, name), state['rules'], mode='r+'))
+            for name in ARRAYS)
+    else:
+        arrays = dict((name, tables.create(
+            _array_path(directory, name), shapes[name], state['rules']))
+            for name in ARRAYS)
+
+    def checkpoint():
+        for array in arrays.values():
+            array.flush()
+        _write_state(directory, state)
+
+    if not resume:
+        # Any starting values converge, even odds just get there sooner
+        for array in arrays.values():
+            array[...] = 0.5
+    value_iteration = _Solver(arrays, win_condition, max_score)
+    if not state['last_turn_solved']:
+        value_iteration.solve_last_turn()
+        state['last_turn_solved'] = True
+        checkpoint()
+    sweeps = 0
+    while ((state['delta'] is None or state['delta'] >= tolerance) and
+           (max_sweeps is None or sweeps < max_sweeps)):
+        state['delta'] = float(value_iteration.sweep())
+        state['sweeps'] += 1
+        sweeps += 1
+        checkpoint()
+    return WinProbability(directory)
+
+
+class WinProbability(_Tables):
+    """Memory-mapped solved tables, for looking up decisions in a game
+
+    The tables are solved for the default rules with the win condition
+    changed, and deciding under any other rules raises ValueError.
+    """
+
+    def __init__(self, directory):
+        state = _read_state(directory)
+        if state is None or state.get('version') != TABLES_VERSION:
+            raise ValueError("No solved tables in {}".format(directory))
+        self.rules_digest = state['rules']
+        self.sweeps = state['sweeps']
+        self.delta = state['delta']
+        arrays = dict((name, tables.load(_array_path(directory, name),
+                                         self.rules_digest))
+                      for name in ARRAYS)
+        super(WinProbability, self).__init__(
+            arrays, state['win_condition'], state['max_score'])
+
+    def check_rules(self, rules):
+        """Raise ValueError unless the tables were solved for rules"""
+        if rules.digest != self.rules_digest:
+            raise ValueError("Win probabilities were solved for different "
+                             "rules")
+
+    def _index(self, points):
+        return max(0, min(points // STEP, self.max_index))
+
+    def _score_index(self, points):
+        return min(self._index(points), self.num_scores - 1)
+
+    def turn_start(self, score, opponent_score, qualified=True,
+                   opponent_qualified=True):
+        """Probability of winning for a player about to start a turn"""
+        score = self._score_index(score)
+        opponent = self._score_index(opponent_score)
+        if qualified and opponent_qualified:
+            return float(self.qualified[score, NUM_DICE, score, opponent])
+        if qualified:
+            return float(self.opponent_unqualified[score, score, NUM_DICE])
+        if opponent_qualified:
+            return float(self.unqualified[opponent, 0, NUM_DICE])
+        return float(self.both_unqualified[0, NUM_DICE])
+
+    def _situation(self, game, player):
+        if game.num_players != 2:
+            raise ValueError("Win probabilities are for two-player games")
+        opponent = game.players[1 - game.players.index(player)]
+        if game.last_turn:
+            if player.score >= self.win_condition:
+                # Beating the responder is all that's left
+                return ('reply', self._index(game.score_to_beat) -
+                        self._index(player.score) + 1, None)
+            return ('responder', self._index(game.score_to_beat),
+                    self._score_index(player.score))
+        score = self._score_index(player.score)
+        opponent_score = self._score_index(opponent.score)
+        if player.qualified and opponent.qualified:
+            return 'qualified', score, opponent_score
+        if player.qualified:
+            return 'opponent_unqualified', score, None
+        if opponent.qualified:
+            return 'unqualified', opponent_score, None
+        return 'both_unqualified', None, None
+
+    def _after(self, situation, turn_points, dice_left):
+        kind, first, second = situation
+        steps = self._index(turn_points)
+        if kind == 'reply':
+            return self._reach_after(first - steps, dice_left)
+        if kind == 'responder':
+            return self._responder_after(
+                first, min(second + steps, self.max_index), dice_left)
+        if kind == 'qualified':
+            return self._qualified_after(
+                first, second, min(first + steps, self.max_index), dice_left)
+        if kind == 'opponent_unqualified':
+            return self._opponent_unqualified_after(
+                first, min(first + steps, self.max_index), dice_left)
+        if kind == 'unqualified':
+            return self._unqualified_after(first, steps, dice_left)
+        return self._both_unqualified_after(steps, dice_left)
+
+    def _roll_value(self, situation, turn_points, dice_left):
+        # Rolling is keeping nothing with the same dice left, except that
+        # hot dice are rolled whole
+        kind, first, second = situation
+        steps = self._index(turn_points)
+        dice = dice_left or NUM_DICE
+        if kind == 'reply':
+            return self.reach[min(max(first - steps, 0), self.max_index),
+                              dice]
+        if kind == 'responder':
+            return self.responder[first - self.num_scores,
+                                  min(second + steps, self.max_index), dice]
+        if kind == 'qualified':
+            return self.qualified[min(first + steps, self.max_index), dice,
+                                  first, second]
+        if kind == 'opponent_unqualified':
+            return self.opponent_unqualified[
+                first, min(first + steps, self.max_index), dice]
+        if kind == 'unqualified':
+            return self.unqualified[first, min(steps, self.qualify_index - 1),
+                                    dice]
+        return self.both_unqualified[min(steps, self.qualify_index - 1), dice]
+
+    def choose_keep(self, game, player):
+        """Return the packed dice to keep that give the best chance to win"""
+        diceset = player.diceset
+        self.check_rules(diceset.rules)
+        roll_key = diceset.unfrozen_key
+        situation = self._situation(game, player)
+        best_value = None
+        best_key = None
+        for keep in keeps.legal_keeps(roll_key, diceset.rules):
+            value = self._after(situation, diceset.points + keep.points,
+                                keep.dice_left)
+            if best_value is None or value > best_value:
+                best_value = value
+                best_key = keep.key
+        return best_key
+
+    def should_bank(self, game, player):
+        """Return True if banking gives a better chance to win than rolling"""
+        diceset = player.diceset
+        self.check_rules(diceset.rules)
+        dice_left = diceset.dice_left
+        situation = self._situation(game, player)
+        if situation[0] == 'reply':
+            return True
+        return (self._after(situation, diceset.points, dice_left) >
+                self._roll_value(situation, diceset.points, dice_left))
+
+    def should_inherit(self, game, player, last_player):
+        """Return True if inheriting gives a better chance to win"""
+        self.check_rules(player.diceset.rules)
+        situation = self._situation(game, player)
+        dice_left = last_player.diceset.dice_left
+        return (self._roll_value(situation, last_player.diceset.points,
+                                 dice_left) >
+                self._roll_value(situation, 0, NUM_DICE))